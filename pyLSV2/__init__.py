@@ -5,6 +5,7 @@
 from .client import *
 from .const import *
 from .dat_cls import *
+from .low_level_com import *
 from .table_reader import *
 from .translate_messages import *
 from .err import *
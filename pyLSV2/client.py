@@ -10,18 +10,23 @@ file manipulation is blocked by a lockout parameter. Use at your own risk!
 TODO: research and implement support for `self._sys_par.turbo_mode_active`
 TODO: research and implement support for `self._sys_par.dnc_mode_allowed`
 TODO: fix unknown parameter type warnings in scope function `real_time_readings`
-TODO: add serial mode to low level com
+TODO: add ISO 1745 block protocol for serial connections to low level com
 
 """
 
+import contextlib
+import functools
+import inspect
+import io
 import logging
 import math
 import pathlib
 import re
 import struct
+import threading
 from datetime import datetime
 from types import TracebackType
-from typing import List, Union, Optional, Type, Dict
+from typing import Any, BinaryIO, List, Union, Optional, Type, Dict, Generator
 import time
 
 from . import const as lc
@@ -29,7 +34,8 @@ from . import dat_cls as ld
 from . import misc as lm
 from . import misc_scope as lms
 from . import translate_messages as lt
-from .low_level_com import LSV2TCP
+from .low_level_com import LSV2TCP, LSV2Response, LSV2Transport, RTTEstimator, TCPOptions
+from .table_reader import NCTable
 from .err import (
     LSV2DataException,
     LSV2InputException,
@@ -38,10 +44,54 @@ from .err import (
 )
 
 
+def _serialized(method):
+    """run a method while holding the lock of the connection, so the telegrams of one operation
+    are not interleaved with telegrams of other threads. Generators hold the lock from the first
+    item until they are exhausted or closed, since the control expects the transfer to be continued
+    without other telegrams in between. They have to be consumed and closed by the thread which started them"""
+    if inspect.isgeneratorfunction(method):
+
+        @functools.wraps(method)
+        def generator_wrapper(self, *args, **kwargs):
+            with self._lock:
+                yield from method(self, *args, **kwargs)
+
+        return generator_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
 class LSV2:
     """implements functions for communicating with CNC controls via LSV2"""
 
-    def __init__(self, hostname: str, port: int = 0, timeout: float = 15.0, safe_mode: bool = True, compatibility_mode: bool = False):
+    RECONNECT_ATTEMPTS = 5
+    # number of attempts to restore a lost connection if auto reconnect is enabled
+
+    RECONNECT_DELAY = 0.5
+    # seconds to wait before the second attempt, doubled for each further attempt
+
+    RECONNECT_MAX_DELAY = 10.0
+    # upper limit for the time between two attempts
+
+    def __init__(
+        self,
+        hostname: str = "",
+        port: int = 0,
+        timeout: float = 15.0,
+        safe_mode: bool = True,
+        compatibility_mode: bool = False,
+        transport: Optional[LSV2Transport] = None,
+        connect_timeout: Optional[float] = None,
+        adaptive_timeout: bool = False,
+        auto_reconnect: bool = False,
+        tcp_options: Optional[TCPOptions] = None,
+        thread_safe: bool = False,
+    ):
         """
         Implementation of the LSV2 protocol used to communicate with certain CNC controls
 
@@ -50,12 +100,38 @@ class LSV2:
         :param timeout: number of seconds waited for a response
         :param safe_mode: switch to disable safety functions that might influence the control
         :param compatibility_mode: switch to connect using the least amount of features, for example the buffer size
+        :param transport: transport used to exchange telegrams with the control, for example
+                          :py:class:`~pyLSV2.low_level_com.LSV2SSH` or :py:class:`~pyLSV2.low_level_com.LSV2SerialGateway`.
+                          If not set, a TCP connection to hostname and port is used
+        :param connect_timeout: number of seconds to wait while establishing the TCP connection, defaults to ``timeout``
+        :param adaptive_timeout: adjust the timeout for each response to the measured round trip times of the TCP
+                                 connection, ``timeout`` is used as upper limit
+        :param auto_reconnect: restore a lost connection including the active logins and repeat read commands
+                               which were interrupted. Passwords of logins are kept in memory for this
+        :param tcp_options: socket options for the TCP connection, see :py:class:`~pyLSV2.low_level_com.TCPOptions`
+        :param thread_safe: allow several threads to share the connection. Each telegram and each operation which
+                            consists of several telegrams, like a file transfer, is executed exclusively.
+                            :py:attr:`last_error` always refers to the last telegram of the calling thread.
+                            Generators like :py:meth:`real_time_readings` and :py:meth:`iter_directory_content`
+                            hold the connection until they are exhausted or closed
         """
         self._logger = logging.getLogger("LSV2 Client")
+        self._lock = threading.RLock() if thread_safe else contextlib.nullcontext()
 
-        self._llcom = LSV2TCP(hostname, port, timeout)
+        if transport is None:
+            self._llcom: LSV2Transport = LSV2TCP(hostname, port, timeout, connect_timeout, adaptive_timeout, tcp_options)
+        else:
+            self._llcom = transport
 
         self._active_logins = []
+        self._login_passwords: Dict[lc.Login, str] = {}
+
+        self._auto_reconnect = auto_reconnect
+        if auto_reconnect and hasattr(self._llcom, "close_on_timeout"):
+            # a fresh connection is the safe way to get rid of a late response
+            self._llcom.close_on_timeout = True
+        self._session_active = False
+        self._reconnecting = False
 
         self.switch_safe_mode(safe_mode)
 
@@ -77,16 +153,25 @@ class LSV2:
 
     @property
     def last_error(self) -> ld.LSV2Error:
-        """type and code of the last transmission error"""
+        """type and code of the last transmission error of the calling thread"""
         return self._llcom.last_error
 
+    @property
+    def rtt_stats(self) -> Dict[str, RTTEstimator]:
+        """round trip time estimation for each class of telegrams, empty if the transport does not measure them"""
+        return getattr(self._llcom, "rtt_stats", {})
+
+    @_serialized
     def connect(self):
         """connect to control"""
         self._llcom.connect()
         self._configure_connection()
+        self._session_active = True
 
+    @_serialized
     def disconnect(self):
         """logout of all open logins and close connection"""
+        self._session_active = False
         self.logout(login=None)
 
         self._versions = ld.VersionInfo()
@@ -138,16 +223,101 @@ class LSV2:
                 lc.ParCCC.SCREENDUMP,
             )
 
+    @_serialized
+    def _telegram(
+        self,
+        command: Union[lc.CMD, lc.RSP],
+        payload: Union[bytes, bytearray, None] = None,
+        wait_for_response: bool = True,
+    ) -> LSV2Response:
+        """
+        Send a telegram via the transport and return the response. If auto reconnect is enabled, a lost
+        connection is restored and read commands are repeated.
+
+        :param command: valid LSV2 command to send
+        :param payload: data to send along with the command
+        :param wait_for_response: switch for waiting for response from control.
+        """
+        idempotent = isinstance(command, lc.CMD) and command.startswith("R_")
+        return self._recover_connection(idempotent, self._llcom.request, command, payload, wait_for_response)
+
+    def _recover_connection(self, idempotent: bool, function, *args):
+        """
+        Call a function of the transport. If auto reconnect is enabled and the connection was lost, the
+        connection is restored and the call is repeated if it only reads data.
+
+        :param idempotent: ``True`` if the call can be repeated without side effects
+        :param function: function of the transport to call
+
+        :raises LSV2StateException: if the connection could not be restored or the interrupted call
+                                    was not repeated
+        """
+        if not self._auto_reconnect or not self._session_active or self._reconnecting:
+            return function(*args)
+
+        try:
+            result = function(*args)
+            if getattr(self._llcom, "is_connected", True):
+                return result
+            error: Exception = ConnectionAbortedError("connection was closed by the control")
+        except (OSError, LSV2ProtocolException) as ex:
+            if isinstance(ex, LSV2ProtocolException) and getattr(self._llcom, "is_connected", True):
+                raise
+            error = ex
+
+        self._logger.warning("connection lost: %s", error)
+        self._reconnect()
+        if not idempotent:
+            raise LSV2StateException("connection was lost and restored, the interrupted command was not repeated") from error
+        self._logger.info("repeat interrupted command after reconnect")
+        return function(*args)
+
+    def _reconnect(self):
+        """
+        Restore a lost connection with increasing delay between the attempts. The connection is configured
+        again and all logins which were active before are restored.
+
+        :raises LSV2StateException: if the connection could not be restored
+        """
+        logins = list(self._active_logins)
+        delay = self.RECONNECT_DELAY
+        last_error: Union[Exception, None] = None
+        self._reconnecting = True
+        try:
+            for attempt in range(1, self.RECONNECT_ATTEMPTS + 1):
+                if attempt > 1:
+                    time.sleep(delay)
+                    delay = min(delay * 2, self.RECONNECT_MAX_DELAY)
+                try:
+                    self._llcom.disconnect()
+                except OSError:
+                    pass
+                self._active_logins = []
+                try:
+                    self._llcom.connect()
+                    self._configure_connection()
+                    for login in logins:
+                        if not self.login(login, self._login_passwords.get(login, "")):
+                            raise LSV2StateException("could not restore login %s" % login.value)
+                except (OSError, LSV2ProtocolException, LSV2StateException) as ex:
+                    self._logger.warning("attempt %d of %d to restore the connection failed: %s", attempt, self.RECONNECT_ATTEMPTS, ex)
+                    last_error = ex
+                    continue
+                self._logger.info("connection restored after %d attempts", attempt)
+                return
+        finally:
+            self._reconnecting = False
+        raise LSV2StateException("could not restore the connection after %d attempts" % self.RECONNECT_ATTEMPTS) from last_error
+
     def _send_recive(
         self,
         command: Union[lc.CMD, lc.RSP],
         payload: Union[bytes, bytearray, None] = None,
         expected_response: lc.RSP = lc.RSP.NONE,
-    ) -> Union[bool, bytearray]:
+    ) -> Union[LSV2Response, None]:
         """
         Takes a command and optional payload, sends it to the control and checks if the next telegram contains the
-        expected response. If the correct response is received, returns response content if available, or ``True`` if
-        no content was received. Otherwiese returns ``False`` on error.
+        expected response. If the correct response is received, returns the response. Otherwiese returns ``None`` on error.
 
         Use :py:attr:`~pyLSV2.LSV2.last_error` to check the cause of the last error.
 
@@ -159,65 +329,63 @@ class LSV2:
         """
 
         if payload is None:
-            bytes_to_send = bytearray()
-        elif isinstance(payload, (bytearray,)):
-            bytes_to_send = payload
+            bytes_to_send = b""
         else:
-            bytes_to_send = bytearray(payload)
+            bytes_to_send = payload
 
         if command is lc.CMD.C_CC:
             if len(bytes_to_send) < 2:
                 self._logger.warning("system command requires a payload of at exactly 2 bytes")
-                return False
+                return None
 
             c_cc_command = struct.unpack("!H", bytes_to_send[0:2])[0]
             if c_cc_command not in self._known_sys_cmd:
                 self._logger.debug("unknown or unsupported system command %s", bytes_to_send)
-                return False
+                return None
 
         wait_for_response = bool(expected_response is not lc.RSP.NONE)
-        lsv_content = self._llcom.telegram(command, bytes_to_send, wait_for_response)
+        response = self._telegram(command, bytes_to_send, wait_for_response)
 
-        if self._llcom.last_response is lc.RSP.UNKNOWN:
+        if response.response is lc.RSP.UNKNOWN:
             self._logger.error("unknown response received")
             raise LSV2ProtocolException("unknown response received")
 
-        if self._llcom.last_response is lc.RSP.T_ER:
-            if self.last_error.e_code is lc.LSV2StatusCode.T_ER_NO_NEXT_ERROR:
+        if response.response is lc.RSP.T_ER:
+            if response.error.e_code is lc.LSV2StatusCode.T_ER_NO_NEXT_ERROR:
                 # workaround since querying for error messages will also return an error state
-                return True
+                return response
 
             self._logger.info(
                 "an error was received after the last transmission, %s '%s'",
-                self.last_error,
-                lt.get_error_text(self.last_error),
+                response.error,
+                lt.get_error_text(response.error),
             )
-            return False
+            return None
 
-        if self._llcom.last_response is expected_response:
+        if response.response is expected_response:
             # expected response received
-            self._logger.debug("expected response received: %s", self._llcom.last_response)
-            if len(lsv_content) > 0:
-                return lsv_content
-            return True
+            self._logger.debug("expected response received: %s", response.response)
+            return response
 
         if expected_response is lc.RSP.NONE:
             self._logger.debug("no response expected")
-            return False
+            return None
 
-        self._logger.info("received unexpected response %s", self._llcom.last_response)
-        return False
+        self._logger.info("received unexpected response %s", response.response)
+        return None
 
+    @_serialized
     def _send_recive_block(
         self,
         command: Union[lc.CMD, lc.RSP],
         payload: bytearray,
         expected_response: lc.RSP = lc.RSP.NONE,
-    ) -> Union[bool, List[bytearray]]:
+    ) -> Union[List[LSV2Response], None]:
         """
         Takes a command and optional payload, sends it to the control and continues reading telegrams until a
         telegram contains the expected response or an error response. If the correct response is received, returns
-        the accumulated response content. Otherwiese returns ``False`` on error.
+        the accumulated responses. Otherwiese returns ``None`` on error.
+        See :py:meth:`_iter_recive_block` to process each response as it arrives.
 
         Use :py:attr:`~pyLSV2.LSV2.last_error` to check the cause of the last error.
 
@@ -225,48 +393,82 @@ class LSV2:
         :param payload: data to send along with the command
         :param expected_response: expected response telegram from the control to signal success
         """
+        blocks = self._iter_recive_block(command, payload, expected_response)
+        response_buffer: List[LSV2Response] = []
+        while True:
+            try:
+                response_buffer.append(next(blocks))
+            except StopIteration as finished:
+                if finished.value:
+                    return response_buffer
+                return None
+
+    @_serialized
+    def _iter_recive_block(
+        self,
+        command: Union[lc.CMD, lc.RSP],
+        payload: Union[bytearray, None],
+        expected_response: lc.RSP = lc.RSP.NONE,
+    ) -> Generator[LSV2Response, None, bool]:
+        """
+        Takes a command and optional payload, sends it to the control and yields each telegram with the expected
+        response as soon as it arrives. The next telegram is only requested after the previous one was processed.
+        Returns ``True`` via ``StopIteration`` if the transfer was finished by the control, ``False`` on error.
 
-        bytes_to_send = payload
+        If the generator is closed before the transfer is finished, the remaining telegrams are read and discarded
+        so the connection can be used for the next command. No other telegrams may be sent while iterating.
 
-        lsv_content = self._llcom.telegram(command, bytes_to_send)
+        :param command: valid LSV2 command to send
+        :param payload: data to send along with the command
+        :param expected_response: expected response telegram from the control to signal success
+        """
+        response = self._telegram(command, payload)
 
-        if self._llcom.last_response is lc.RSP.UNKNOWN:
+        if response.response is lc.RSP.UNKNOWN:
             self._logger.info("unknown response received, abort")
             return False
 
-        if self._llcom.last_response is lc.RSP.T_ER:
+        if response.response is lc.RSP.T_ER:
             self._logger.warning(
                 "error received, %s '%s'",
-                self.last_error,
-                lt.get_error_text(self.last_error),
+                response.error,
+                lt.get_error_text(response.error),
             )
             return False
 
-        if self._llcom.last_response in lc.RSP.T_FD:
-            if len(lsv_content) > 0:
+        if response.response in lc.RSP.T_FD:
+            if len(response.content) > 0:
                 self._logger.error(
                     "transfer should have finished without content but data received: %s",
-                    lsv_content,
+                    response.content,
                 )
             else:
                 self._logger.debug("transfer finished without content")
             return False
 
-        response_buffer: List[bytearray] = []
-        if self._llcom.last_response is expected_response:
-            # expected response received
-            self._logger.debug("expected response received: %s", self._llcom.last_response)
-            while self._llcom.last_response is expected_response:
-                response_buffer.append(lsv_content)
-                lsv_content = self._llcom.telegram(command=lc.RSP.T_OK)
-            return response_buffer
+        if response.response is not expected_response:
+            self._logger.info(
+                "received unexpected response %s, with data %s",
+                response.response,
+                response.content,
+            )
+            return False
 
-        self._logger.info(
-            "received unexpected response %s, with data %s",
-            self._llcom.last_response,
-            lsv_content,
-        )
-        return False
+        # expected response received
+        self._logger.debug("expected response received: %s", response.response)
+        try:
+            while response.response is expected_response:
+                yield response
+                response = self._telegram(command=lc.RSP.T_OK)
+        except GeneratorExit:
+            self._logger.debug("transfer was stopped early, discard the remaining telegrams")
+            while response.response is expected_response:
+                response = self._telegram(command=lc.RSP.T_OK)
+            raise
+
+        if response.response not in lc.RSP.T_FD:
+            self._logger.warning("transfer was interrupted by response %s", response.response)
+        return True
 
     def _configure_connection(self):
         """
@@ -343,6 +545,7 @@ class LSV2:
 
         self._logger.info("successfully configured connection parameters and basic logins")
 
+    @_serialized
     def login(self, login: lc.Login, password: str = "") -> bool:
         """
         Request additional access rights. To elevate this level a logon has to be performed.
@@ -369,11 +572,14 @@ class LSV2:
         if self._send_recive(lc.CMD.A_LG, payload, lc.RSP.T_OK):
             self._logger.debug("login executed successfully for login %s", login.value)
             self._active_logins.append(login)
+            if self._auto_reconnect and len(password) > 0:
+                self._login_passwords[login] = password
             return True
 
         self._logger.warning("error logging in as %s", login.value)
         return False
 
+    @_serialized
     def logout(self, login: Union[lc.Login, None] = None) -> bool:
         """
         Drop one or all access right. If no login is supplied all active access rights are dropped.
@@ -394,8 +600,10 @@ class LSV2:
             self._logger.info("logout executed successfully for login %s", login)
             if login is None:
                 self._active_logins: List[lc.Login] = []
+                self._login_passwords.clear()
             else:
                 self._active_logins.remove(login)
+                self._login_passwords.pop(login, None)
             return True
         return False
 
@@ -410,15 +618,15 @@ class LSV2:
             self._logger.debug("system parameters already in memory, return previous values")
         else:
             result = self._send_recive(lc.CMD.R_PR, None, lc.RSP.S_PR)
-            if isinstance(result, (bytearray,)):
-                self._sys_par = lm.decode_system_parameters(result)
+            if result is not None and len(result.content) > 0:
+                self._sys_par = lm.decode_system_parameters(result.content)
             else:
                 self._logger.warning("an error occurred while querying system parameters")
 
             payload = struct.pack("!L", lc.ParRCI.TURBO_MODE)
             result = self._send_recive(lc.CMD.R_CI, payload, lc.RSP.S_CI)
-            if isinstance(result, (bytearray,)) and len(result) > 0:
-                data = lm.decode_system_information(result)
+            if result is not None and len(result.content) > 0:
+                data = lm.decode_system_information(result.content)
                 if not isinstance(data, bool):
                     raise LSV2DataException("expected boolean")
                 self._sys_par.turbo_mode_active = data
@@ -427,8 +635,8 @@ class LSV2:
 
             payload = struct.pack("!L", lc.ParRCI.DNC_ALLOWED)
             result = self._send_recive(lc.CMD.R_CI, payload, lc.RSP.S_CI)
-            if isinstance(result, (bytearray,)) and len(result) > 0:
-                data = lm.decode_system_information(result)
+            if result is not None and len(result.content) > 0:
+                data = lm.decode_system_information(result.content)
                 if not isinstance(data, bool):
                     raise LSV2DataException("expected boolean")
                 self._sys_par.dnc_mode_allowed = data
@@ -437,8 +645,8 @@ class LSV2:
 
             payload = struct.pack("!L", lc.ParRCI.AXES_SAMPLING_RATE)
             result = self._send_recive(lc.CMD.R_CI, payload, lc.RSP.S_CI)
-            if isinstance(result, (bytearray,)) and len(result) > 0:
-                self._sys_par.axes_sampling_rate = lm.decode_system_information(result)
+            if result is not None and len(result.content) > 0:
+                self._sys_par.axes_sampling_rate = lm.decode_system_information(result.content)
             else:
                 self._logger.debug("could not read system information on axes sampling rate")
         return self._sys_par
@@ -458,8 +666,8 @@ class LSV2:
             info_data = ld.VersionInfo()
 
             result = self._send_recive(lc.CMD.R_VR, None, lc.RSP.S_VR)
-            if isinstance(result, (bytearray,)) and len(result) > 0:
-                result_parts = result.rstrip(b"\x00").split(b"\x00")
+            if result is not None and len(result.content) > 0:
+                result_parts = result.content.rstrip(b"\x00").split(b"\x00")
                 if len(result_parts) == 4:
                     info_data.control = lm.ba_to_ustr(result_parts[0])
                     info_data.nc_sw = lm.ba_to_ustr(result_parts[1])
@@ -475,7 +683,7 @@ class LSV2:
                 else:
                     raise NotImplementedError(
                         "Version info could not be parsed from bytes '%s' because of unsupported length %d %s",
-                        result,
+                        result.content,
                         len(result_parts),
                         result_parts,
                     )
@@ -488,8 +696,8 @@ class LSV2:
                 struct.pack("!B", lc.ParRVR.ID),
                 lc.RSP.S_VR,
             )
-            if isinstance(result, (bytearray,)) and len(result) > 0:
-                info_data.id_number = lm.ba_to_ustr(result)
+            if result is not None and len(result.content) > 0:
+                info_data.id_number = lm.ba_to_ustr(result.content)
             else:
                 info_data.id_number = "not supported"
 
@@ -501,8 +709,8 @@ class LSV2:
                     struct.pack("!B", lc.ParRVR.RELEASE_TYPE),
                     lc.RSP.S_VR,
                 )
-                if isinstance(result, (bytearray,)) and len(result) > 0:
-                    info_data.release = lm.ba_to_ustr(result)
+                if result is not None and len(result.content) > 0:
+                    info_data.release = lm.ba_to_ustr(result.content)
                 else:
                     info_data.release = "not supported"
 
@@ -511,8 +719,8 @@ class LSV2:
                 struct.pack("!B", lc.ParRVR.SPLC_VERSION),
                 lc.RSP.S_VR,
             )
-            if isinstance(result, (bytearray,)) and len(result) > 0:
-                info_data.splc = lm.ba_to_ustr(result)
+            if result is not None and len(result.content) > 0:
+                info_data.splc = lm.ba_to_ustr(result.content)
             else:
                 info_data.splc = "not supported"
 
@@ -533,12 +741,12 @@ class LSV2:
 
         payload = struct.pack("!H", lc.ParRRI.PGM_STATE)
         result = self._send_recive(lc.CMD.R_RI, payload, lc.RSP.S_RI)
-        if isinstance(result, (bytearray,)):
+        if result is not None and len(result.content) > 0:
             self._logger.debug(
                 "successfully read state of active program: %s",
-                struct.unpack("!H", result)[0],
+                struct.unpack("!H", result.content)[0],
             )
-            return lc.PgmState(struct.unpack("!H", result)[0])
+            return lc.PgmState(struct.unpack("!H", result.content)[0])
         self._logger.warning("an error occurred while querying program state")
         return lc.PgmState.UNDEFINED
 
@@ -554,8 +762,8 @@ class LSV2:
 
         payload = struct.pack("!H", lc.ParRRI.SELECTED_PGM)
         result = self._send_recive(lc.CMD.R_RI, payload, lc.RSP.S_RI)
-        if isinstance(result, (bytearray,)) and len(result) > 0:
-            stack_info = lm.decode_stack_info(result)
+        if result is not None and len(result.content) > 0:
+            stack_info = lm.decode_stack_info(result.content)
             self._logger.debug("successfully read active program stack: %s", stack_info)
             return stack_info
         self._logger.warning("an error occurred while querying active program state")
@@ -575,9 +783,9 @@ class LSV2:
         payload = struct.pack("!H", lc.ParRRI.EXEC_STATE)
 
         result = self._send_recive(lc.CMD.R_RI, payload, lc.RSP.S_RI)
-        if isinstance(result, (bytearray,)):
-            self._logger.debug("read execution state %d", struct.unpack("!H", result)[0])
-            return lc.ExecState(struct.unpack("!H", result)[0])
+        if result is not None and len(result.content) > 0:
+            self._logger.debug("read execution state %d", struct.unpack("!H", result.content)[0])
+            return lc.ExecState(struct.unpack("!H", result.content)[0])
         self._logger.warning("an error occurred while querying execution state")
         return lc.ExecState.UNDEFINED
 
@@ -599,14 +807,15 @@ class LSV2:
             )
             return ld.DirectoryEntry()
         result = self._send_recive(lc.CMD.R_DI, None, lc.RSP.S_DI)
-        if isinstance(result, (bytearray,)) and len(result) > 0:
-            dir_info = lm.decode_directory_info(result)
+        if result is not None and len(result.content) > 0:
+            dir_info = lm.decode_directory_info(result.content)
             self._logger.debug("successfully received directory information for %s", dir_info.path)
             return dir_info
         self._logger.warning("an error occurred while querying directory info")
 
         return ld.DirectoryEntry()
 
+    @_serialized
     def change_directory(self, remote_directory: str) -> bool:
         """
         change the current working directory on the control.
@@ -624,7 +833,7 @@ class LSV2:
         payload = lm.ustr_to_ba(dir_path)
 
         result = self._send_recive(lc.CMD.C_DC, payload, lc.RSP.T_OK)
-        if isinstance(result, (bool,)) and result is True:
+        if result is not None:
             self._logger.debug("changed working directory to %s", dir_path)
             return True
 
@@ -653,8 +862,8 @@ class LSV2:
         payload = lm.ustr_to_ba(file_path)
 
         result = self._send_recive(lc.CMD.R_FI, payload, lc.RSP.S_FI)
-        if isinstance(result, (bytearray,)) and len(result) > 0:
-            file_info = lm.decode_file_system_info(result, self._versions.type)
+        if result is not None and len(result.content) > 0:
+            file_info = lm.decode_file_system_info(result.content, self._versions.type)
             self._logger.debug("received file information for %s", file_info.name)
             return file_info
 
@@ -675,26 +884,41 @@ class LSV2:
         fist call :py:func:`~pyLSV2.LSV2.directory_info` or else the attributes won't be correct.
         Requires access level ``FILETRANSFER`` to work.
         """
+        return list(self.iter_directory_content())
+
+    @_serialized
+    def iter_directory_content(self) -> Generator[ld.FileEntry, None, None]:
+        """
+        Query content of current working directory from the control and yield each entry as soon as it was received.
+        Unlike :py:func:`~pyLSV2.LSV2.directory_content` the first entries are available before the whole
+        directory was transferred. No other functions of the connection may be called while iterating. With
+        ``thread_safe`` the connection is held until the generator is exhausted or closed, consume and close it
+        in the thread which started it, for example with :py:func:`contextlib.closing`.
+        Requires access level ``FILETRANSFER`` to work.
+        """
 
         if not self.login(lc.Login.FILETRANSFER):
             self._logger.warning("could not log in as user FILE")
-            return []
+            return
 
-        dir_content: List[ld.FileEntry] = []
         payload = bytearray(struct.pack("!B", lc.ParRDR.SINGLE))
 
-        result = self._send_recive_block(lc.CMD.R_DR, payload, lc.RSP.S_DR)
-        if isinstance(result, (list,)):
-            for entry in result:
-                dir_content.append(lm.decode_file_system_info(entry, self._versions.type))
-
-            self._logger.debug("received %d packages for directory content", len(dir_content))
-        else:
-            self._logger.warning(
-                "an error occurred while directory content info: '%s'",
-                lt.get_error_text(self.last_error),
-            )
-        return dir_content
+        blocks = self._iter_recive_block(lc.CMD.R_DR, payload, lc.RSP.S_DR)
+        entry_count = 0
+        while True:
+            try:
+                block = next(blocks)
+            except StopIteration as finished:
+                if finished.value:
+                    self._logger.debug("received %d packages for directory content", entry_count)
+                else:
+                    self._logger.warning(
+                        "an error occurred while directory content info: '%s'",
+                        lt.get_error_text(self.last_error),
+                    )
+                return
+            entry_count += 1
+            yield lm.decode_file_system_info(block.content, self._versions.type)
 
     def drive_info(self) -> List[ld.DriveEntry]:
         """
@@ -710,14 +934,19 @@ class LSV2:
 
         drives_list: List[ld.DriveEntry] = []
         payload = bytearray(struct.pack("!B", lc.ParRDR.DRIVES))
-        result = self._send_recive_block(lc.CMD.R_DR, payload, lc.RSP.S_DR)
-        if isinstance(result, (list,)):
-            for entry in result:
-                drives_list.extend(lm.decode_drive_info(entry))
-
+        blocks = self._iter_recive_block(lc.CMD.R_DR, payload, lc.RSP.S_DR)
+        block_count = 0
+        while True:
+            try:
+                drives_list.extend(lm.decode_drive_info(next(blocks).content))
+                block_count += 1
+            except StopIteration as finished:
+                success = finished.value
+                break
+        if success:
             self._logger.debug(
                 "successfully received %d packages for drive information %s",
-                len(result),
+                block_count,
                 drives_list,
             )
         else:
@@ -755,7 +984,7 @@ class LSV2:
                 payload = lm.ustr_to_ba(path_to_check)
 
                 result = self._send_recive(lc.CMD.C_DM, payload, lc.RSP.T_OK)
-                if isinstance(result, (bool,)) and result is True:
+                if result is not None:
                     self._logger.debug("Directory created successfully")
                 else:
                     self._logger.warning(
@@ -784,7 +1013,7 @@ class LSV2:
         payload = lm.ustr_to_ba(dir_path)
 
         result = self._send_recive(lc.CMD.C_DD, payload, lc.RSP.T_OK)
-        if isinstance(result, (bool)) and result is True:
+        if result is not None:
             self._logger.debug("successfully deleted directory %s", dir_path)
             return True
 
@@ -835,6 +1064,7 @@ class LSV2:
         )
         return False
 
+    @_serialized
     def copy_remote_file(self, source_path: str, target_path: str) -> bool:
         """
         Copy file on control from one place to another.
@@ -882,6 +1112,7 @@ class LSV2:
         self._logger.warning("an error occurred copying file %s to %s", source_path, target_path)
         return False
 
+    @_serialized
     def move_file(self, source_path: str, target_path: str) -> bool:
         """
         Move file on control from one place to another.
@@ -943,6 +1174,7 @@ class LSV2:
         self._logger.warning("an error occurred moving file %s to %s", source_path, target_path)
         return False
 
+    @_serialized
     def send_file(
         self,
         local_path: Union[str, pathlib.Path],
@@ -978,11 +1210,31 @@ class LSV2:
             self._logger.warning("the supplied path %s did not resolve to a file", local_file)
             raise LSV2StateException("local file does not exist! {}".format(local_file))
 
+        remote_file = self._prepare_remote_file(remote_path, local_file.name, override_file)
+        if remote_file is None:
+            return False
+
+        self._logger.debug("ready to send file from %s to %s", local_file, remote_file)
+
+        with local_file.open("rb") as input_buffer:
+            return self._send_file_content(input_buffer, remote_file, binary_mode or lm.is_file_binary(local_path))
+
+    def _prepare_remote_file(self, remote_path: str, default_name: str, override_file: bool) -> Union[str, None]:
+        """
+        Resolve the destination of an upload, create missing directories and delete an existing file if
+        override is set. Returns the full path of the remote file or ``None`` if the file exists and should not be replaced.
+
+        :param remote_path: path with or without the file name on the control
+        :param default_name: file name used if the remote path does not contain one
+        :param override_file: flag if file should be replaced if it already exists
+
+        :raises LSV2StateException: if destination directory could not be accessed or destination file could not be deleted
+        """
         remote_path = remote_path.replace("/", lc.PATH_SEP)
 
         if lc.PATH_SEP in remote_path:
             if remote_path.endswith(lc.PATH_SEP):  # no filename given
-                remote_file_name = local_file.name
+                remote_file_name = default_name
                 remote_directory = remote_path
             else:
                 remote_file_name = remote_path.split(lc.PATH_SEP)[-1]
@@ -1009,88 +1261,88 @@ class LSV2:
                     )
             else:
                 self._logger.warning("remote file already exists, override was not set")
-                return False
+                return None
 
-        self._logger.debug(
-            "ready to send file from %s to %s",
-            local_file,
-            remote_directory + lc.PATH_SEP + remote_file_name,
-        )
+        return remote_directory + lc.PATH_SEP + remote_file_name
+
+    @_serialized
+    def _send_file_content(self, input_buffer: BinaryIO, remote_file: str, binary_mode: bool) -> bool:
+        """
+        Transfer the content of a stream to a file on the control.
+        Returns ``True`` if completed successfully.
 
-        payload = lm.ustr_to_ba(remote_directory + lc.PATH_SEP + remote_file_name)
-        if binary_mode or lm.is_file_binary(local_path):
+        :param input_buffer: binary stream with the file content
+        :param remote_file: full path of the file on the control
+        :param binary_mode: flag if binary transfer mode should be used
+        """
+        payload = lm.ustr_to_ba(remote_file)
+        if binary_mode:
             payload.append(lc.MODE_BINARY)
             self._logger.debug("selecting binary transfer mode")
         else:
             payload.append(lc.MODE_NON_BIN)
             self._logger.debug("selecting non binary transfer mode")
 
-        self._llcom.telegram(
+        response = self._telegram(
             lc.CMD.C_FL,
             payload,
         )
 
-        if self._llcom.last_response in lc.RSP.T_OK:
-            with local_file.open("rb") as input_buffer:
-                while True:
-                    # use current buffer size but reduce by 10 to make sure it fits together with command and size
-                    buffer = bytearray(input_buffer.read(self._llcom.buffer_size - 8 - 2))
-                    if not buffer:
-                        # finished reading file
-                        break
-
-                    result = self._llcom.telegram(
-                        lc.RSP.S_FL,
-                        buffer,
-                    )
-                    if self._llcom.last_response in lc.RSP.T_OK:
-                        pass
+        if response.response in lc.RSP.T_OK:
+            while True:
+                # use current buffer size but reduce by 10 to make sure it fits together with command and size
+                buffer = bytearray(input_buffer.read(self._llcom.buffer_size - 8 - 2))
+                if not buffer:
+                    # finished reading file
+                    break
+
+                response = self._telegram(
+                    lc.RSP.S_FL,
+                    buffer,
+                )
+                if response.response in lc.RSP.T_OK:
+                    pass
+                else:
+                    if response.is_error():
+                        self._logger.info(
+                            "control returned error '%s' which translates to '%s'",
+                            response.error,
+                            lt.get_error_text(response.error),
+                        )
                     else:
-                        if self._llcom.last_response in [lc.RSP.T_ER, lc.RSP.T_BD]:
-                            self._logger.info(
-                                "control returned error '%s' which translates to '%s'",
-                                self.last_error,
-                                lt.get_error_text(self.last_error),
-                            )
-                        else:
-                            # if len(result) == 2:
-
-                            self._logger.info(
-                                "could not send data, received unexpected response '%s' with data 0x%s",
-                                self._llcom.last_response,
-                                result.hex(),
-                            )
-                        return False
+                        self._logger.info(
+                            "could not send data, received unexpected response '%s' with data 0x%s",
+                            response.response,
+                            response.content.hex(),
+                        )
+                    return False
 
             # signal that no more data is being sent
             if self._secure_file_send:
-                if not self._send_recive(lc.RSP.T_FD, None, lc.RSP.T_OK):
-                    self._logger.warning(
-                        "could not send end of transmission telegram, got response '%s'",
-                        self._llcom.last_response,
-                    )
-                    return False
+                expected_response = lc.RSP.T_OK
             else:
-                if not self._send_recive(lc.RSP.T_FD, None, lc.RSP.NONE):
-                    self._logger.warning(
-                        "could not send end of transmission telegram, got response '%s'",
-                        self._llcom.last_response,
-                    )
-                    return False
+                expected_response = lc.RSP.NONE
+            if self._send_recive(lc.RSP.T_FD, None, expected_response) is None:
+                self._logger.warning(
+                    "could not send end of transmission telegram, got response '%s'",
+                    self._llcom.last_response,
+                )
+                return False
 
         else:
-            if self._llcom.last_response is lc.RSP.T_ER:
+            if response.response is lc.RSP.T_ER:
                 self._logger.warning(
                     "error received, %s '%s'",
-                    self.last_error,
-                    lt.get_error_text(self.last_error),
+                    response.error,
+                    lt.get_error_text(response.error),
                 )
             else:
-                self._logger.warning("could not send file with error %s", self._llcom.last_response)
+                self._logger.warning("could not send file with error %s", response.response)
             return False
 
         return True
 
+    @_serialized
     def recive_file(
         self,
         remote_path: str,
@@ -1135,74 +1387,157 @@ class LSV2:
 
         self._logger.debug("loading file from %s to %s", remote_path, local_file)
 
+        with local_file.open("wb") as out_file:
+            if not self._recive_file_content(remote_path, out_file, binary_mode or lm.is_file_binary(remote_path), binary_mode):
+                return False
+
+        self._logger.info(
+            "received %d bytes transfer complete for file %s to %s",
+            local_file.stat().st_size,
+            remote_path,
+            local_file,
+        )
+
+        return True
+
+    @_serialized
+    def _recive_file_content(self, remote_path: str, out_file: BinaryIO, binary_mode: bool, keep_line_ends: bool = False) -> bool:
+        """
+        Transfer the content of a file on the control to a stream.
+        Returns ``True`` if completed successfully.
+
+        :param remote_path: full path of the file on the control
+        :param out_file: binary stream the file content is written to
+        :param binary_mode: flag if binary transfer mode should be used
+        :param keep_line_ends: flag if the line ends sent by the control should be kept instead of replacing them with ``\\r\\n``
+        """
         payload = lm.ustr_to_ba(remote_path)
 
-        if binary_mode or lm.is_file_binary(remote_path):
+        if binary_mode:
             payload.append(lc.MODE_BINARY)  # force binary transfer
             self._logger.debug("using binary transfer mode")
         else:
             payload.append(lc.MODE_NON_BIN)
             self._logger.debug("using non binary transfer mode")
 
-        content = self._llcom.telegram(
+        response = self._telegram(
             lc.CMD.R_FL,
             payload,
         )
 
-        with local_file.open("wb") as out_file:
-            if self._llcom.last_response in lc.RSP.S_FL:
-                if binary_mode:
-                    out_file.write(content)
-                else:
-                    out_file.write(content.replace(b"\x00", b"\r\n"))
-                self._logger.debug("received first block of file file %s", remote_path)
+        if response.response in lc.RSP.S_FL:
+            if keep_line_ends:
+                out_file.write(response.payload)
+            else:
+                out_file.write(response.content.replace(b"\x00", b"\r\n"))
+            self._logger.debug("received first block of file file %s", remote_path)
 
-                while True:
-                    content = self._llcom.telegram(
-                        lc.RSP.T_OK,
-                    )
-                    if self._llcom.last_response in lc.RSP.S_FL:
-                        if binary_mode:
-                            out_file.write(content)
-                        else:
-                            out_file.write(content.replace(b"\x00", b"\r\n"))
-                        self._logger.debug("received %d more bytes for file", len(content))
-                    elif self._llcom.last_response in lc.RSP.T_FD:
-                        self._logger.info("finished loading file")
-                        break
+            while True:
+                response = self._telegram(
+                    lc.RSP.T_OK,
+                )
+                if response.response in lc.RSP.S_FL:
+                    if keep_line_ends:
+                        out_file.write(response.payload)
                     else:
-                        self._logger.warning(
-                            "something went wrong while receiving file data %s",
-                            remote_path,
-                        )
-                        if self._llcom.last_response is lc.RSP.T_ER or self._llcom.last_response is lc.RSP.T_BD:
-                            self._logger.warning(
-                                "an error occurred while loading the first block of data %s '%s'",
-                                self.last_error,
-                                lt.get_error_text(self.last_error),
-                            )
-                        return False
-            else:
-                if self._llcom.last_response is lc.RSP.T_ER or self._llcom.last_response is lc.RSP.T_BD:
+                        out_file.write(response.content.replace(b"\x00", b"\r\n"))
+                    self._logger.debug("received %d more bytes for file", len(response.content))
+                elif response.response in lc.RSP.T_FD:
+                    self._logger.info("finished loading file")
+                    break
+                else:
                     self._logger.warning(
-                        "an error occurred while loading the first block of data for file %s, %s '%s'",
+                        "something went wrong while receiving file data %s",
                         remote_path,
-                        self.last_error,
-                        lt.get_error_text(self.last_error),
                     )
-                else:
-                    self._logger.warning("could not load file with error %s", self._llcom.last_response)
-                return False
+                    if response.is_error():
+                        self._logger.warning(
+                            "an error occurred while loading the first block of data %s '%s'",
+                            response.error,
+                            lt.get_error_text(response.error),
+                        )
+                    return False
+        else:
+            if response.is_error():
+                self._logger.warning(
+                    "an error occurred while loading the first block of data for file %s, %s '%s'",
+                    remote_path,
+                    response.error,
+                    lt.get_error_text(response.error),
+                )
+            else:
+                self._logger.warning("could not load file with error %s", response.response)
+            return False
+        return True
 
-        self._logger.info(
-            "received %d bytes transfer complete for file %s to %s",
-            local_file.stat().st_size,
-            remote_path,
-            local_file,
-        )
+    @_serialized
+    def read_table(self, remote_path: str, columnar: bool = False, typed: bool = False) -> Union[NCTable, None]:
+        """
+        Load a table file from the control and parse it in memory without a local copy.
+        Requires access level ``FILETRANSFER`` to work.
+        Returns ``None`` if the file could not be loaded.
 
-        return True
+        :param remote_path: path of the table file on the control
+        :param columnar: store the table data as one list per column, see :py:class:`~pyLSV2.NCTable`
+        :param typed: convert all columns to native numbers, see :py:meth:`~pyLSV2.NCTable.get_typed_column`
+        """
+        if not self.login(lc.Login.FILETRANSFER):
+            self._logger.warning("could not log in as user FILE")
+            return None
 
+        remote_path = remote_path.replace("/", lc.PATH_SEP)
+        if not self.file_info(remote_path):
+            self._logger.warning("remote file does not exist: %s", remote_path)
+            return None
+
+        buffer = io.BytesIO()
+        if not self._recive_file_content(remote_path, buffer, binary_mode=False):
+            return None
+        self._logger.debug("received %d bytes of table %s", buffer.tell(), remote_path)
+        buffer.seek(0)
+        return NCTable.parse_table(buffer, columnar=columnar, typed=typed)
+
+    @_serialized
+    def write_table(self, table: NCTable, remote_path: str, override_file: bool = False) -> bool:
+        """
+        Write a table directly to a file on the control without a local copy.
+        Requires access level ``FILETRANSFER`` to work.
+        Returns ``True`` if completed successfully.
+
+        :param table: the table which should be written
+        :param remote_path: path with or without the file name on the control, if no file name is given the
+                            name and suffix of the table are used
+        :param override_file: flag if file should be replaced if it already exists
+
+        :raises LSV2StateException: if destination directory could not be accessed or destination file could not be deleted
+        :raises ValueError: if the table can not be written in the native format
+        """
+        if not self.login(lc.Login.FILETRANSFER):
+            self._logger.warning("could not log in as user FILE")
+            return False
+
+        if table.suffix is None:
+            default_name = str(table.name)
+        else:
+            default_name = "%s.%s" % (table.name, table.suffix)
+
+        # serialize the table before the destination is prepared, so an existing file is not deleted if
+        # the table can not be written in the native format
+        remote_file_name = remote_path.replace("/", lc.PATH_SEP).split(lc.PATH_SEP)[-1]
+        if len(remote_file_name) == 0:
+            remote_file_name = default_name
+        buffer = io.BytesIO()
+        table.dump_native(buffer, file_name=remote_file_name)
+
+        remote_file = self._prepare_remote_file(remote_path, default_name, override_file)
+        if remote_file is None:
+            return False
+
+        self._logger.debug("ready to send %d bytes of table to %s", buffer.tell(), remote_file)
+        buffer.seek(0)
+        return self._send_file_content(buffer, remote_file, lm.is_file_binary(remote_file))
+
+    @_serialized
     def read_plc_memory(
         self, first_element: int, mem_type: lc.MemoryType, number_of_elements: int = 1
     ) -> List[Union[None, int, float, str]]:
@@ -1308,16 +1643,16 @@ class LSV2:
                 payload.extend(struct.pack("!L", address))
                 payload.extend(struct.pack("!B", mem_byte_count))
                 result = self._send_recive(lc.CMD.R_MB, payload, lc.RSP.S_MB)
-                if isinstance(result, (bytearray,)):
+                if result is not None and len(result.content) > 0:
                     logging.debug(
                         "read string %d with length %d",
                         (first_element + i),
-                        len(result),
+                        len(result.content),
                     )
 
-                    unpack_string = "{}s".format(len(result))
+                    unpack_string = "{}s".format(len(result.content))
 
-                    plc_values.append(lm.ba_to_ustr(struct.unpack(unpack_string, result)[0]))
+                    plc_values.append(lm.ba_to_ustr(struct.unpack(unpack_string, result.content)[0]))
                 else:
                     logging.error(
                         "failed to read string %d from address %d",
@@ -1352,14 +1687,14 @@ class LSV2:
                 payload.extend(struct.pack("!L", address))
                 payload.extend(struct.pack("!B", elements_in_group * mem_byte_count))
                 result = self._send_recive(lc.CMD.R_MB, payload, lc.RSP.S_MB)
-                if isinstance(result, (bytearray,)):
+                if result is not None and len(result.content) > 0:
                     logging.debug(
                         "read %d value(s) from address %d",
                         elements_in_group,
                         first_element_in_group,
                     )
-                    for j in range(0, len(result), mem_byte_count):
-                        plc_values.append(struct.unpack(unpack_string, result[j : j + mem_byte_count])[0])
+                    for j in range(0, len(result.content), mem_byte_count):
+                        plc_values.append(struct.unpack(unpack_string, result.content[j : j + mem_byte_count])[0])
                 else:
                     logging.error(
                         "failed to read value from address %d",
@@ -1443,8 +1778,8 @@ class LSV2:
         payload = lm.ustr_to_ba(name)
 
         result = self._send_recive(lc.CMD.R_MC, payload, lc.RSP.S_MC)
-        if isinstance(result, (bytearray,)) and len(result) > 0:
-            value = lm.ba_to_ustr(result)
+        if result is not None and len(result.content) > 0:
+            value = lm.ba_to_ustr(result.content)
             self._logger.debug("machine parameter %s has value %s", name, value)
             return value
 
@@ -1539,8 +1874,8 @@ class LSV2:
         payload.extend(struct.pack("!H", lc.ParRRI.CURRENT_TOOL))
 
         result = self._send_recive(lc.CMD.R_RI, payload, lc.RSP.S_RI)
-        if isinstance(result, (bytearray,)) and len(result) > 0:
-            tool_info = lm.decode_tool_info(result)
+        if result is not None and len(result.content) > 0:
+            tool_info = lm.decode_tool_info(result.content)
             self._logger.debug("successfully read info on current tool: %s", tool_info)
             return tool_info
         self._logger.warning("an error occurred while querying current tool information. This does not work for all control types")
@@ -1559,13 +1894,14 @@ class LSV2:
         payload.extend(struct.pack("!H", lc.ParRRI.OVERRIDE))
 
         result = self._send_recive(lc.CMD.R_RI, payload, lc.RSP.S_RI)
-        if isinstance(result, (bytearray,)) and len(result) > 0:
-            override_info = lm.decode_override_state(result)
+        if result is not None and len(result.content) > 0:
+            override_info = lm.decode_override_state(result.content)
             self._logger.debug("successfully read override info: %s", override_info)
             return override_info
         self._logger.warning("an error occurred while querying current override information. This does not work for all control types")
         return None
 
+    @_serialized
     def get_error_messages(self) -> List[ld.NCErrorMessage]:
         """
         Get information about the first or next error displayed on the control
@@ -1581,15 +1917,15 @@ class LSV2:
         payload.extend(struct.pack("!H", lc.ParRRI.FIRST_ERROR))
 
         result = self._send_recive(lc.CMD.R_RI, payload, lc.RSP.S_RI)
-        if isinstance(result, (bytearray,)) and len(result) > 0:
-            messages.append(lm.decode_error_message(result))
+        if result is not None and len(result.content) > 0:
+            messages.append(lm.decode_error_message(result.content))
             payload = bytearray()
             payload.extend(struct.pack("!H", lc.ParRRI.NEXT_ERROR))
             result = self._send_recive(lc.CMD.R_RI, payload, lc.RSP.S_RI)
             self._logger.debug("successfully read first error but further errors")
 
-            while isinstance(result, (bytearray,)):
-                messages.append(lm.decode_error_message(result))
+            while result is not None and result.response is lc.RSP.S_RI and len(result.content) > 0:
+                messages.append(lm.decode_error_message(result.content))
                 result = self._send_recive(lc.CMD.R_RI, payload, lc.RSP.S_RI)
 
             if self.last_error.e_code is lc.LSV2StatusCode.T_ER_NO_NEXT_ERROR:
@@ -1607,6 +1943,7 @@ class LSV2:
 
         return []
 
+    @_serialized
     def _walk_dir(self, descend: bool = True) -> List[str]:
         """
         helper function to recursively search in directories for files.
@@ -1633,6 +1970,7 @@ class LSV2:
         self.change_directory(current_path)
         return content
 
+    @_serialized
     def get_file_list(self, path: str = "", descend: bool = True, pattern: str = "") -> List[str]:
         """
         Get list of files in directory structure.
@@ -1691,24 +2029,24 @@ class LSV2:
 
         result = self._send_recive(lc.CMD.R_DP, payload, lc.RSP.S_DP)
 
-        if isinstance(result, (bytearray,)) and len(result) > 0:
-            value_type = struct.unpack("!L", result[0:4])[0]
+        if result is not None and len(result.content) > 0:
+            value_type = struct.unpack("!L", result.content[0:4])[0]
             if value_type == 2:
-                data_value = struct.unpack("!h", result[4:6])[0]
+                data_value = struct.unpack("!h", result.content[4:6])[0]
             elif value_type == 3:
-                data_value = struct.unpack("!l", result[4:8])[0]
+                data_value = struct.unpack("!l", result.content[4:8])[0]
             elif value_type == 5:
-                data_value = struct.unpack("<d", result[4:12])[0]
+                data_value = struct.unpack("<d", result.content[4:12])[0]
             elif value_type == 8:
-                data_value = lm.ba_to_ustr(result[4:])
+                data_value = lm.ba_to_ustr(result.content[4:])
             elif value_type == 11:
-                data_value = struct.unpack("!?", result[4:5])[0]
+                data_value = struct.unpack("!?", result.content[4:5])[0]
             elif value_type == 16:
-                data_value = struct.unpack("!b", result[4:5])[0]
+                data_value = struct.unpack("!b", result.content[4:5])[0]
             elif value_type == 17:
-                data_value = struct.unpack("!B", result[4:5])[0]
+                data_value = struct.unpack("!B", result.content[4:5])[0]
             else:
-                raise LSV2ProtocolException("unknown return type: %d for %s" % (value_type, result[4:]))
+                raise LSV2ProtocolException("unknown return type: %d for %s" % (value_type, result.content[4:]))
 
             self._logger.info("successfully read data path: %s and got value '%s'", path, data_value)
             return data_value
@@ -1740,14 +2078,97 @@ class LSV2:
         payload.extend(struct.pack("!H", lc.ParRRI.AXIS_LOCATION))
 
         result = self._send_recive(lc.CMD.R_RI, payload, lc.RSP.S_RI)
-        if isinstance(result, (bytearray,)) and len(result) > 0:
-            axes_values = lm.decode_axis_location(result)
+        if result is not None and len(result.content) > 0:
+            axes_values = lm.decode_axis_location(result.content)
             self._logger.info("successfully read axes values: %s", axes_values)
             return axes_values
 
         self._logger.warning("an error occurred while querying axes position")
         return None
 
+    _RRI_DECODERS = {
+        lc.ParRRI.PGM_STATE: lambda data: lc.PgmState(struct.unpack("!H", data)[0]),
+        lc.ParRRI.EXEC_STATE: lambda data: lc.ExecState(struct.unpack("!H", data)[0]),
+        lc.ParRRI.SELECTED_PGM: lm.decode_stack_info,
+        lc.ParRRI.OVERRIDE: lm.decode_override_state,
+        lc.ParRRI.CURRENT_TOOL: lm.decode_tool_info,
+        lc.ParRRI.AXIS_LOCATION: lm.decode_axis_location,
+    }
+
+    @_serialized
+    def read_many(self, parameters: List[lc.ParRRI], pipelined: bool = False) -> Dict[lc.ParRRI, Any]:
+        """
+        Read several values with the command R_RI at once. The login is only checked once for all values.
+        Returns dictionary with key = parameter, value = decoded result or ``None`` if the value could not be read.
+        Values without known decoding are returned as raw bytes.
+        Requires access level ``DNC`` to work.
+
+        :param parameters: list of values to read
+        :param pipelined: send all queries before reading the first response to save the round trip for each value.
+                          Only use this if the control accepts new telegrams before the previous response was read
+
+        :raises LSV2ProtocolException: if an unknown response was received
+        :raises LSV2DataException: Error during parsing of data values
+        """
+        results: Dict[lc.ParRRI, Any] = dict.fromkeys(parameters)
+        if not self.login(lc.Login.DNC):
+            self._logger.warning("could not log in as user DNC")
+            return results
+
+        requests = [(lc.CMD.R_RI, struct.pack("!H", parameter)) for parameter in results]
+        if pipelined and hasattr(self._llcom, "telegrams"):
+            responses = self._recover_connection(True, self._llcom.telegrams, requests)
+        else:
+            responses = [self._telegram(command, payload) for command, payload in requests]
+
+        for parameter, response in zip(results, responses):
+            if response.response is lc.RSP.UNKNOWN:
+                self._logger.error("unknown response received")
+                raise LSV2ProtocolException("unknown response received")
+            if response.response is lc.RSP.S_RI and len(response.content) > 0:
+                decoder = self._RRI_DECODERS.get(parameter, bytes)
+                results[parameter] = decoder(response.content)
+            elif response.response is lc.RSP.T_ER:
+                self._logger.info(
+                    "an error occurred while reading %s, %s '%s'", parameter.name, response.error, lt.get_error_text(response.error)
+                )
+            else:
+                self._logger.info("received unexpected response %s while reading %s", response.response, parameter.name)
+
+        self._logger.debug("successfully read %d values", len([r for r in results.values() if r is not None]))
+        return results
+
+    def machine_snapshot(self, pipelined: bool = False) -> ld.MachineSnapshot:
+        """
+        Read program status, execution state, program stack, override state, spindle tool and axes location
+        with one batch of queries. Values which could not be read keep their default.
+        Requires access level ``DNC`` to work.
+
+        :param pipelined: send all queries before reading the first response, see :py:meth:`read_many`
+        """
+        snapshot = ld.MachineSnapshot()
+        values = self.read_many(
+            [
+                lc.ParRRI.PGM_STATE,
+                lc.ParRRI.EXEC_STATE,
+                lc.ParRRI.SELECTED_PGM,
+                lc.ParRRI.OVERRIDE,
+                lc.ParRRI.CURRENT_TOOL,
+                lc.ParRRI.AXIS_LOCATION,
+            ],
+            pipelined,
+        )
+        if values[lc.ParRRI.PGM_STATE] is not None:
+            snapshot.program_status = values[lc.ParRRI.PGM_STATE]
+        if values[lc.ParRRI.EXEC_STATE] is not None:
+            snapshot.execution_state = values[lc.ParRRI.EXEC_STATE]
+        snapshot.program_stack = values[lc.ParRRI.SELECTED_PGM]
+        snapshot.override_state = values[lc.ParRRI.OVERRIDE]
+        snapshot.spindle_tool = values[lc.ParRRI.CURRENT_TOOL]
+        snapshot.axes_location = values[lc.ParRRI.AXIS_LOCATION]
+        return snapshot
+
+    @_serialized
     def grab_screen_dump(self, image_path: pathlib.Path) -> bool:
         """
         Create screen_dump of current control screen and save it as bitmap.
@@ -1767,7 +2188,7 @@ class LSV2:
 
         result = self._send_recive(lc.CMD.C_CC, payload, lc.RSP.T_OK)
 
-        if not (isinstance(result, (bool,)) and result is True):
+        if result is None:
             self._logger.warning("screen dump was not created")
             return False
 
@@ -1791,13 +2212,14 @@ class LSV2:
             return datetime.fromtimestamp(0)
 
         result = self._send_recive(lc.CMD.R_DT, None, lc.RSP.S_DT)
-        if isinstance(result, (bytearray,)) and len(result) > 0:
-            ts = lm.decode_timestamp(result)
+        if result is not None and len(result.content) > 0:
+            ts = lm.decode_timestamp(result.content)
             self._logger.debug("Time on Control is %s", ts.isoformat())
         else:
             raise LSV2ProtocolException("something went wrong while reading current time and date")
         return ts
 
+    @_serialized
     def read_scope_signals(self) -> List[ld.ScopeSignal]:
         """
         Read available scope channels and signals. Only works for iTNC 530.
@@ -1814,16 +2236,16 @@ class LSV2:
 
         channel_list: List[ld.ScopeSignal] = []
 
-        content = self._llcom.telegram(lc.CMD.R_OC)
-        if self._llcom.last_response in lc.RSP.S_OC:
-            channel_list.extend(lms.decode_signal_description(content))
+        response = self._telegram(lc.CMD.R_OC)
+        if response.response in lc.RSP.S_OC:
+            channel_list.extend(lms.decode_signal_description(response.content))
 
             while True:
-                content = self._llcom.telegram(lc.RSP.T_OK)
+                response = self._telegram(lc.RSP.T_OK)
 
-                if self._llcom.last_response in lc.RSP.S_OC:
-                    channel_list.extend(lms.decode_signal_description(content))
-                elif self._llcom.last_response in lc.RSP.T_FD:
+                if response.response in lc.RSP.S_OC:
+                    channel_list.extend(lms.decode_signal_description(response.content))
+                elif response.response in lc.RSP.T_FD:
                     self._logger.info("finished loading and parsing data for all scope signals")
                     break
                 else:
@@ -1832,6 +2254,7 @@ class LSV2:
 
         return channel_list
 
+    @_serialized
     def real_time_readings(self, signal_list: List[ld.ScopeSignal], duration: int, interval: int):
         """
         Read signal readings from control in real time. Only works for iTNC 530.
@@ -1842,6 +2265,9 @@ class LSV2:
         :param duration: number of seconds for which data should be read
         :param interval: interval in µs between readings
 
+        With ``thread_safe`` the connection is held until the generator is exhausted or closed, other threads
+        have to wait until then. Consume and close the generator in the thread which started it.
+
         :raises LSV2ProtocolException:
         """
         if not self.versions.is_itnc():
@@ -1868,8 +2294,8 @@ class LSV2:
             payload.extend(signal.to_ba())
 
         result = self._send_recive(lc.CMD.R_OP, payload, lc.RSP.S_OP)
-        if isinstance(result, (bytearray,)) and len(result) > 0:
-            signal_list = lms.decode_signal_details(signal_list, result)
+        if result is not None and len(result.content) > 0:
+            signal_list = lms.decode_signal_details(signal_list, result.content)
         else:
             if self.last_error.e_code == 85:
                 self._logger.warning("too many signals selected: %d", len(signal_list))
@@ -1889,26 +2315,23 @@ class LSV2:
         payload.extend(struct.pack("!L", interval))
 
         start = time.time()  # start timer
-        recorded_data: List[ld.ScopeReading] = []
-        content = self._send_recive(lc.CMD.R_OD, payload, lc.RSP.S_OD)
+        response = self._send_recive(lc.CMD.R_OD, payload, lc.RSP.S_OD)
 
-        if not isinstance(content, (bytearray,)) or len(content) <= 0:
+        if response is None or len(response.content) <= 0:
             self._logger.error("something went wrong while reading first data package for signals")
             raise LSV2ProtocolException("something went wrong while reading scope data")
 
-        recorded_data.append(lms.decode_scope_reading(signal_list, content))
+        yield lms.decode_scope_reading(signal_list, response.content)
         end = time.time()
         timer = end - start
         while timer < duration:
-            content = self._llcom.telegram(lc.RSP.T_OK)
-            if self._llcom.last_response in lc.RSP.S_OD:
-                recorded_data.append(lms.decode_scope_reading(signal_list, content))
-                yield recorded_data[0]
+            response = self._telegram(lc.RSP.T_OK)
+            if response.response in lc.RSP.S_OD:
+                yield lms.decode_scope_reading(signal_list, response.content)
             else:
                 self._logger.warning("something went wrong during periodically reading scope data, abort reading")
                 break
             end = time.time()
             timer = end - start
-            recorded_data = []
 
         self._logger.debug("finished reading scope data")
@@ -9,9 +9,9 @@ after migration to python 3.7+ these will be changed to @dataclass!
 from datetime import datetime
 import struct
 import re
-from typing import List
+from typing import Dict, List, Union
 
-from .const import ControlType, LSV2StatusCode, ChannelType
+from .const import ControlType, LSV2StatusCode, ChannelType, ExecState, PgmState
 from .err import LSV2DataException
 
 
@@ -784,6 +784,92 @@ class StackState:
         self._current_pgm = value
 
 
+class MachineSnapshot:
+    """data class for the state of a machine read with one batch of queries"""
+
+    def __init__(self):
+        """init with default values, values which could not be read stay at their default"""
+        self.timestamp = datetime.now()
+        self.program_status = PgmState.UNDEFINED
+        self.execution_state = ExecState.UNDEFINED
+        self.program_stack = None
+        self.override_state = None
+        self.spindle_tool = None
+        self.axes_location = None
+
+    def __str__(self) -> str:
+        return "%s program: %s execution: %s stack: %s override: %s" % (
+            self.timestamp.isoformat(),
+            self.program_status.name,
+            self.execution_state.name,
+            self.program_stack,
+            self.override_state,
+        )
+
+    @property
+    def timestamp(self) -> datetime:
+        """local time at which the snapshot was read"""
+        return self._timestamp
+
+    @timestamp.setter
+    def timestamp(self, value: datetime):
+        self._timestamp = value
+
+    @property
+    def program_status(self) -> PgmState:
+        """status of the selected program"""
+        return self._program_status
+
+    @program_status.setter
+    def program_status(self, value: PgmState):
+        self._program_status = value
+
+    @property
+    def execution_state(self) -> ExecState:
+        """current execution mode"""
+        return self._execution_state
+
+    @execution_state.setter
+    def execution_state(self, value: ExecState):
+        self._execution_state = value
+
+    @property
+    def program_stack(self) -> Union[StackState, None]:
+        """active programs and current line number"""
+        return self._program_stack
+
+    @program_stack.setter
+    def program_stack(self, value: Union[StackState, None]):
+        self._program_stack = value
+
+    @property
+    def override_state(self) -> Union[OverrideState, None]:
+        """values of the override potentiometers"""
+        return self._override_state
+
+    @override_state.setter
+    def override_state(self, value: Union[OverrideState, None]):
+        self._override_state = value
+
+    @property
+    def spindle_tool(self) -> Union[ToolInformation, None]:
+        """tool in the spindle, not available on all control types"""
+        return self._spindle_tool
+
+    @spindle_tool.setter
+    def spindle_tool(self, value: Union[ToolInformation, None]):
+        self._spindle_tool = value
+
+    @property
+    def axes_location(self) -> Union[Dict[str, float], None]:
+        """position of the axes with key = axis name, value = position"""
+        return self._axes_location
+
+    @axes_location.setter
+    def axes_location(self, value: Union[Dict[str, float], None]):
+        self._axes_location = value
+
+
 class FileEntry:
     """data class for file information"""
 
@@ -1238,6 +1324,12 @@ class ScopeSignalData:
         """data unit"""
         return self._unit
 
+    def scaled_data(self) -> List[float]:
+        """raw values converted with factor and offset of the signal"""
+        factor = self._factor
+        offset = self._offset
+        return [value * factor + offset for value in self.data]
+
     # @property
     # def header(self) -> bytearray:
     #    """signal header"""
@@ -1263,3 +1355,212 @@ class ScopeReading:
 
     def get_data(self):
         return self._signal_data
+
+
+class ScopeSignalStatistics:
+    """data class for the statistics of one signal over a window of scope readings"""
+
+    def __init__(self, channel: int, signal: int, unit: str, minimum: float, maximum: float, mean: float, rms: float):
+        self._channel = channel
+        self._signal = signal
+        self._unit = unit
+        self._minimum = minimum
+        self._maximum = maximum
+        self._mean = mean
+        self._rms = rms
+
+    def __str__(self) -> str:
+        return "Channel/Signal: {:02d}/{:02d} min {:f} max {:f} mean {:f} rms {:f} {:s}".format(
+            self.channel, self.signal, self.minimum, self.maximum, self.mean, self.rms, self.unit
+        )
+
+    @property
+    def channel(self) -> int:
+        """number of channel"""
+        return self._channel
+
+    @property
+    def signal(self) -> int:
+        """number of signal"""
+        return self._signal
+
+    @property
+    def unit(self) -> str:
+        """data unit"""
+        return self._unit
+
+    @property
+    def minimum(self) -> float:
+        """smallest scaled value in the window"""
+        return self._minimum
+
+    @property
+    def maximum(self) -> float:
+        """largest scaled value in the window"""
+        return self._maximum
+
+    @property
+    def mean(self) -> float:
+        """arithmetic mean of the scaled values in the window"""
+        return self._mean
+
+    @property
+    def rms(self) -> float:
+        """root mean square of the scaled values in the window"""
+        return self._rms
+
+
+class ScopeWindowStatistics:
+    """data class for the statistics of all signals over a window of scope readings"""
+
+    def __init__(self, first_sample: int, sample_count: int):
+        self._first_sample = first_sample
+        self._sample_count = sample_count
+        self._signal_statistics: List[ScopeSignalStatistics] = []
+
+    @property
+    def first_sample(self) -> int:
+        """index of the first sample in the window, counted from the start of the recording"""
+        return self._first_sample
+
+    @property
+    def sample_count(self) -> int:
+        """number of samples per signal in the window"""
+        return self._sample_count
+
+    def add_statistics(self, statistics: ScopeSignalStatistics):
+        self._signal_statistics.append(statistics)
+
+    def get_data(self) -> List[ScopeSignalStatistics]:
+        return self._signal_statistics
+
+
+class ScopeTriggerEvent:
+    """data class for a trigger condition found in scope readings"""
+
+    def __init__(self, sample: int, signal_index: int, value: float, rising: bool):
+        self._sample = sample
+        self._signal_index = signal_index
+        self._value = value
+        self._rising = rising
+
+    def __str__(self) -> str:
+        return "Trigger on signal %d at sample %d with value %f (%s)" % (
+            self.signal_index,
+            self.sample,
+            self.value,
+            "rising" if self.rising else "falling",
+        )
+
+    @property
+    def sample(self) -> int:
+        """index of the sample which fulfilled the condition, counted from the start of the recording"""
+        return self._sample
+
+    @property
+    def signal_index(self) -> int:
+        """position of the signal in the list of recorded signals"""
+        return self._signal_index
+
+    @property
+    def value(self) -> float:
+        """scaled value of the signal at the trigger point"""
+        return self._value
+
+    @property
+    def rising(self) -> bool:
+        """``True`` if the value increased at the trigger point"""
+        return self._rising
+
+
+class ScopeTriggerWindow:
+    """data class for the scope readings recorded around a trigger event"""
+
+    def __init__(self, event: ScopeTriggerEvent, first_sample: int, reading: ScopeReading):
+        self._event = event
+        self._first_sample = first_sample
+        self._reading = reading
+
+    def __str__(self) -> str:
+        return "Window starting at sample %d with %d samples for %s" % (self.first_sample, self.sample_count(), self.event)
+
+    @property
+    def event(self) -> ScopeTriggerEvent:
+        """the trigger event which caused the recording of this window"""
+        return self._event
+
+    @property
+    def first_sample(self) -> int:
+        """index of the first sample in the window, counted from the start of the recording"""
+        return self._first_sample
+
+    @property
+    def reading(self) -> ScopeReading:
+        """the scope data recorded before and after the trigger event"""
+        return self._reading
+
+    def sample_count(self) -> int:
+        """number of samples per signal in this window"""
+        signal_data = self._reading.get_data()
+        if len(signal_data) == 0:
+            return 0
+        return len(signal_data[0].data)
+
+
+class SyncedScopeReading:
+    """data class for a block of scope readings recorded as part of a synchronised capture on several controls"""
+
+    def __init__(self, source: str, timestamp: float, interval: int, reading: ScopeReading, clock_offset: float = 0.0):
+        """
+        :param source: name of the connection the reading was recorded on
+        :param timestamp: time of the first sample in seconds on the shared timebase of the capture
+        :param interval: interval in µs between samples
+        :param reading: the decoded block of scope data
+        :param clock_offset: coarse offset in seconds between the clock of the control and the local clock
+        """
+        self._source = source
+        self._timestamp = timestamp
+        self._interval = interval
+        self._reading = reading
+        self._clock_offset = clock_offset
+
+    def __str__(self) -> str:
+        return "Source '%s' at %.6f s with %d samples" % (self.source, self.timestamp, self.sample_count())
+
+    @property
+    def source(self) -> str:
+        """name of the connection the reading was recorded on"""
+        return self._source
+
+    @property
+    def timestamp(self) -> float:
+        """time of the first sample in seconds on the shared timebase of the capture"""
+        return self._timestamp
+
+    @property
+    def interval(self) -> int:
+        """interval in µs between samples"""
+        return self._interval
+
+    @property
+    def reading(self) -> ScopeReading:
+        """the decoded block of scope data"""
+        return self._reading
+
+    @property
+    def clock_offset(self) -> float:
+        """coarse offset in seconds between the clock of the control and the local clock. Only for information,
+        it is not applied to :py:attr:`timestamp` since the timestamps are based on the local clock"""
+        return self._clock_offset
+
+    def sample_count(self) -> int:
+        """number of samples per signal in this block"""
+        signal_data = self._reading.get_data()
+        if len(signal_data) == 0:
+            return 0
+        return len(signal_data[0].data)
+
+    def sample_times(self) -> List[float]:
+        """timestamp of each sample in this block on the shared timebase of the capture"""
+        step = self._interval / 1000000
+        return [self._timestamp + i * step for i in range(self.sample_count())]
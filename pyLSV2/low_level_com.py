@@ -2,78 +2,407 @@
 # -*- coding: utf-8 -*-
 """low level communication functions for LSV2"""
 
+import errno
+import functools
 import logging
+import os
+import selectors
 import socket
 import struct
-from typing import Union
+import threading
+import time
+from typing import Dict, List, Protocol, Sequence, Tuple, Union
 
 from .const import CMD, RSP
 from .dat_cls import LSV2Error
 from .err import LSV2StateException, LSV2ProtocolException
 
+_TELEGRAM_HEADER = struct.Struct("!L4s")
+# L -> unsigned long -> 32 bit payload length followed by the 4 characters of the command
 
-class LSV2TCP:
-    """Implementation of the low level communication functions for sending and
-    receiving LSV2 telegrams via TCP"""
+_CACHED_PAYLOAD_LENGTH = 8
+# read requests with a payload up to this length are treated as fixed telegrams and their encoding is cached
 
-    DEFAULT_PORT = 19000
-    # Default port for LSV2 on control side
 
-    DEFAULT_BUFFER_SIZE = 256
-    # Default size of send and receive buffer
+@functools.lru_cache(maxsize=256)
+def _encode_fixed_telegram(command: str, payload: bytes) -> bytes:
+    """encode a telegram without or with a short fixed payload. status polling sends the same few
+    telegrams over and over again, so the encoded telegrams are cached"""
+    return _TELEGRAM_HEADER.pack(len(payload), command.encode("ascii")) + payload
 
-    def __init__(self, hostname: str, port: int = 19000, timeout: float = 15.0):
-        """Set connection parameters
 
-        :param hostname: ip or hostname of control.
-        :param port: port number, defaults to 19000.
-        :param timeout: number of seconds for time out of connection.
+def _encode_telegram(command: str, payload) -> Sequence:
+    """encode a telegram as a list of buffers which are sent one after the other. variable payloads
+    are not copied into the telegram but sent as they are after the header"""
+    if len(payload) == 0:
+        return (_encode_fixed_telegram(command, b""),)
+    if len(payload) <= _CACHED_PAYLOAD_LENGTH and command.startswith("R_"):
+        return (_encode_fixed_telegram(command, bytes(payload)),)
+    return (_TELEGRAM_HEADER.pack(len(payload), command.encode("ascii")), payload)
 
-        :raises socket.gaierror: Hostname could not be resolved
-        :raises socket.error: could not create socket
+
+ADDRESS_CACHE_TTL = 300.0
+# seconds for which resolved host names are kept, getaddrinfo does not return the ttl of the dns record
+
+_address_cache: Dict[Tuple[str, int], Tuple[float, List[Tuple[int, tuple]]]] = {}
+_address_cache_lock = threading.Lock()
+
+
+def resolve_address(hostname: str, port: int) -> List[Tuple[int, tuple]]:
+    """
+    Resolve a host name to the list of address family and socket address for each of its addresses in
+    the order of preference. The results are cached for :py:data:`ADDRESS_CACHE_TTL` seconds and shared
+    between all connections.
+
+    :param hostname: ip or hostname, IPv4 and IPv6 are supported
+    :param port: port number
+
+    :raises socket.gaierror: Hostname could not be resolved
+    """
+    key = (hostname, port)
+    with _address_cache_lock:
+        entry = _address_cache.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+
+    addresses = [(info[0], info[4]) for info in socket.getaddrinfo(hostname, port, type=socket.SOCK_STREAM)]
+    with _address_cache_lock:
+        _address_cache[key] = (time.monotonic() + ADDRESS_CACHE_TTL, addresses)
+    return addresses
+
+
+def clear_address_cache():
+    """remove all resolved host names from the cache, for example after the address of a control changed"""
+    with _address_cache_lock:
+        _address_cache.clear()
+
+
+def _interleave_families(addresses: List[Tuple[int, tuple]]) -> List[Tuple[int, tuple]]:
+    """alternate between the address families while keeping the order of preference (RFC 8305)"""
+    first_family = addresses[0][0]
+    preferred = [a for a in addresses if a[0] == first_family]
+    others = [a for a in addresses if a[0] != first_family]
+    interleaved = []
+    for i in range(max(len(preferred), len(others))):
+        interleaved.extend(preferred[i : i + 1])
+        interleaved.extend(others[i : i + 1])
+    return interleaved
+
+
+def _command_class(command: Union[CMD, RSP]) -> str:
+    """group telegrams by the time the control usually needs to answer them"""
+    if command is CMD.C_CC:
+        return "system"
+    if command in (CMD.R_FL, CMD.C_FL) or isinstance(command, RSP):
+        # responses are only sent by the client during block transfers
+        return "transfer"
+    return "status"
+
+
+class RTTEstimator:
+    """Estimation of the round trip time and the resulting timeout for receiving a response,
+    calculated the same way as the retransmission timeout of TCP (RFC 6298)"""
+
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+    K = 4
+
+    def __init__(self, initial_timeout: float, min_timeout: float, max_timeout: float):
+        """
+        :param initial_timeout: timeout used until the first round trip was measured
+        :param min_timeout: lower limit of the timeout
+        :param max_timeout: upper limit of the timeout, also used as limit for the backoff
         """
-        self._logger = logging.getLogger("LSV2 TCP")
+        self._initial_timeout = initial_timeout
+        self._min_timeout = min_timeout
+        self._max_timeout = max_timeout
+        self._srtt = 0.0
+        self._rttvar = 0.0
+        self._samples = 0
+        self._timeout = initial_timeout
 
-        try:
-            self._host_ip = socket.gethostbyname(hostname)
-        except socket.gaierror:
-            logging.error("there was an error getting the IP for the hostname %s", hostname)
-            raise
+    def __str__(self) -> str:
+        return "SRTT: %.4f s RTTVAR: %.4f s timeout: %.3f s samples: %d" % (self._srtt, self._rttvar, self._timeout, self._samples)
 
-        self._port = self.DEFAULT_PORT
-        if port > 0:
-            self._port = port
+    @property
+    def srtt(self) -> float:
+        """smoothed round trip time in seconds"""
+        return self._srtt
 
-        self.buffer_size = LSV2TCP.DEFAULT_BUFFER_SIZE
+    @property
+    def rttvar(self) -> float:
+        """variation of the round trip time in seconds"""
+        return self._rttvar
 
-        try:
-            self._tcpsock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self._tcpsock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self._tcpsock.settimeout(timeout)
-        except socket.error as err:
-            self._logger.error("socket creation failed with error %s", err)
-            raise
+    @property
+    def timeout(self) -> float:
+        """current timeout in seconds for receiving a response"""
+        return self._timeout
 
-        self._is_connected = False
-        self._last_lsv2_response = RSP.NONE
-        self._last_error = LSV2Error()
+    @property
+    def samples(self) -> int:
+        """number of measured round trips"""
+        return self._samples
 
-        self._logger.debug(
-            "Socket successfully created, host %s was resolved to IP %s",
-            hostname,
-            self._host_ip,
-        )
+    def add_sample(self, rtt: float):
+        """update the estimation with a measured round trip time
+
+        :param rtt: time in seconds between sending the telegram and receiving the complete response
+        """
+        if self._samples == 0:
+            self._srtt = rtt
+            self._rttvar = rtt / 2
+        else:
+            self._rttvar = (1 - self.BETA) * self._rttvar + self.BETA * abs(self._srtt - rtt)
+            self._srtt = (1 - self.ALPHA) * self._srtt + self.ALPHA * rtt
+        self._samples += 1
+        self._timeout = min(max(self._srtt + self.K * self._rttvar, self._min_timeout), self._max_timeout)
+
+    def backoff(self):
+        """double the timeout after a response was not received in time"""
+        self._timeout = min(self._timeout * 2, self._max_timeout)
+
+
+class TCPOptions:
+    """Socket options used by :py:class:`~pyLSV2.low_level_com.LSV2TCP`. The defaults are chosen for
+    low latency with the many small telegrams of LSV2"""
+
+    def __init__(
+        self,
+        no_delay: bool = True,
+        keep_alive: bool = True,
+        keep_alive_idle: int = 30,
+        keep_alive_interval: int = 10,
+        keep_alive_count: int = 3,
+        buffer_factor: int = 4,
+        receive_buffer_size: Union[int, None] = None,
+        send_buffer_size: Union[int, None] = None,
+        source_address: Union[Tuple[str, int], None] = None,
+    ):
+        """
+        :param no_delay: disable Nagle's algorithm so telegrams are sent immediately
+        :param keep_alive: send keep alive probes to detect broken connections while idle
+        :param keep_alive_idle: seconds without data before the first keep alive probe is sent
+        :param keep_alive_interval: seconds between keep alive probes
+        :param keep_alive_count: number of unanswered probes before the connection is considered broken
+        :param buffer_factor: the socket buffers are enlarged to hold at least this many telegrams of the
+                              negotiated buffer size, smaller buffers of the operating system are never reduced
+        :param receive_buffer_size: fixed size of the socket receive buffer, overrides ``buffer_factor``
+        :param send_buffer_size: fixed size of the socket send buffer, overrides ``buffer_factor``
+        :param source_address: local address and port to bind to before connecting, port 0 selects any port
+        """
+        self.no_delay = no_delay
+        self.keep_alive = keep_alive
+        self.keep_alive_idle = keep_alive_idle
+        self.keep_alive_interval = keep_alive_interval
+        self.keep_alive_count = keep_alive_count
+        self.buffer_factor = buffer_factor
+        self.receive_buffer_size = receive_buffer_size
+        self.send_buffer_size = send_buffer_size
+        self.source_address = source_address
+
+    def apply(self, tcpsock: socket.socket):
+        """set the options on a socket which is not yet connected"""
+        if self.no_delay:
+            tcpsock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.keep_alive:
+            tcpsock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            # the names of the keep alive options differ between the platforms
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                tcpsock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, self.keep_alive_idle)
+            elif hasattr(socket, "TCP_KEEPALIVE"):
+                tcpsock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, self.keep_alive_idle)
+            if hasattr(socket, "TCP_KEEPINTVL"):
+                tcpsock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, self.keep_alive_interval)
+            if hasattr(socket, "TCP_KEEPCNT"):
+                tcpsock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, self.keep_alive_count)
+        if self.receive_buffer_size is not None:
+            tcpsock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.receive_buffer_size)
+        if self.send_buffer_size is not None:
+            tcpsock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer_size)
+        if self.source_address is not None:
+            tcpsock.bind(self.source_address)
+
+    def apply_buffer_size(self, tcpsock: socket.socket, buffer_size: int):
+        """enlarge the socket buffers to fit the telegram size negotiated with the control"""
+        minimal_size = self.buffer_factor * buffer_size
+        for option, fixed_size in ((socket.SO_RCVBUF, self.receive_buffer_size), (socket.SO_SNDBUF, self.send_buffer_size)):
+            if fixed_size is None and tcpsock.getsockopt(socket.SOL_SOCKET, option) < minimal_size:
+                tcpsock.setsockopt(socket.SOL_SOCKET, option, minimal_size)
+
+
+class LSV2Response:
+    """Immutable response of the control to a telegram, combines the response code with the payload
+    and the error so they don't have to be read from the transport afterwards"""
+
+    __slots__ = ("_response", "_content", "_error")
+
+    def __init__(self, response: RSP, content: bytes = b"", error: Union[LSV2Error, None] = None):
+        """
+        :param response: response telegram received from the control
+        :param content: payload of the response
+        :param error: error if the response is ``T_ER`` or ``T_BD``
+        """
+        self._response = response
+        self._content = content
+        self._error = LSV2Error() if error is None else error
+
+    def __repr__(self) -> str:
+        return "LSV2Response(%s, %d bytes)" % (self._response.value, len(self._content))
+
+    @property
+    def response(self) -> RSP:
+        """response telegram received from the control"""
+        return self._response
+
+    @property
+    def content(self) -> bytes:
+        """payload of the response"""
+        return self._content
+
+    @property
+    def payload(self) -> memoryview:
+        """payload of the response as memoryview, slicing it does not copy the data"""
+        return memoryview(self._content)
+
+    @property
+    def error(self) -> LSV2Error:
+        """error if the response is ``T_ER`` or ``T_BD``"""
+        return self._error
+
+    def is_error(self) -> bool:
+        """``True`` if the control answered with an error"""
+        return self._response in (RSP.T_ER, RSP.T_BD)
+
+
+class LSV2Transport(Protocol):
+    """Interface of the transports used by :py:class:`~pyLSV2.LSV2` to exchange telegrams with the control.
+    Any object with these members can be passed to :py:class:`~pyLSV2.LSV2` via the parameter ``transport``"""
+
+    buffer_size: int
+    """size of the buffer used for sending and receiving data, has to be negotiated with the control"""
 
     @property
     def last_response(self) -> RSP:
         """get the response to the last telegram"""
-        return self._last_lsv2_response
+        ...
 
     @property
     def last_error(self) -> LSV2Error:
         """get the error if the last telegram failed"""
+        ...
+
+    def connect(self):
+        """Establish connection to control"""
+        ...
+
+    def disconnect(self):
+        """Close connection"""
+        ...
+
+    def telegram(
+        self,
+        command: Union[CMD, RSP],
+        payload: bytearray = bytearray(),
+        wait_for_response: bool = True,
+    ) -> bytearray:
+        """Send LSV2 telegram and receive response if necessary"""
+        ...
+
+    def request(
+        self,
+        command: Union[CMD, RSP],
+        payload: Union[bytes, bytearray, None] = None,
+        wait_for_response: bool = True,
+    ) -> LSV2Response:
+        """Send LSV2 telegram and return the response"""
+        ...
+
+
+class LSV2StreamTransport:
+    """Base class for transports which exchange LSV2 telegrams over a byte stream. Handles framing of
+    telegrams and decoding of responses, subclasses implement ``connect``, ``disconnect``, ``_write``
+    and ``_read``"""
+
+    DEFAULT_BUFFER_SIZE = 256
+    # Default size of send and receive buffer
+
+    MIN_ADAPTIVE_TIMEOUT = 1.0
+    # Lower limit for adaptive timeouts, same as the minimal retransmission timeout of TCP
+
+    LATE_RESPONSE_WAIT = 0.05
+    # seconds to wait for responses which did not arrive in time before the next telegram is sent
+
+    def __init__(self, logger_name: str, timeout: float = 15.0, adaptive_timeout: bool = False):
+        """
+        :param logger_name: name of the logger used by the transport
+        :param timeout: number of seconds to wait for a response
+        :param adaptive_timeout: adjust the timeout for each response to the measured round trip times,
+                                 the value of ``timeout`` is used as upper limit
+        """
+        self._logger = logging.getLogger(logger_name)
+        self._timeout = timeout
+        self._adaptive_timeout = adaptive_timeout
+        self._rtt_stats: Dict[str, RTTEstimator] = {}
+        self._read_timeout = timeout
+        self._is_connected = False
+        self.buffer_size = self.DEFAULT_BUFFER_SIZE
+        # response and error are stored per thread so threads sharing the connection only see their own results
+        self._results = threading.local()
+        self._pending = bytearray()
+        self._late_responses = 0
+        self._discarding = False
+        self.close_on_timeout = False
+
+    @property
+    def last_response(self) -> RSP:
+        """get the response to the last telegram sent by the current thread"""
+        return self._last_lsv2_response
+
+    @property
+    def last_error(self) -> LSV2Error:
+        """get the error if the last telegram sent by the current thread failed"""
         return self._last_error
 
+    @property
+    def _last_lsv2_response(self) -> RSP:
+        return getattr(self._results, "response", RSP.NONE)
+
+    @_last_lsv2_response.setter
+    def _last_lsv2_response(self, value: RSP):
+        self._results.response = value
+
+    @property
+    def _last_error(self) -> LSV2Error:
+        if not hasattr(self._results, "error"):
+            self._results.error = LSV2Error()
+        return self._results.error
+
+    @_last_error.setter
+    def _last_error(self, value: LSV2Error):
+        self._results.error = value
+
+    @property
+    def is_connected(self) -> bool:
+        """``True`` while the connection is open, is also reset if the connection was closed by the control"""
+        return self._is_connected
+
+    @property
+    def rtt_stats(self) -> Dict[str, RTTEstimator]:
+        """round trip time estimation for each class of telegrams: ``status``, ``transfer`` and ``system``"""
+        return self._rtt_stats
+
+    @property
+    def adaptive_timeout(self) -> bool:
+        """if ``True`` the timeout for each response is adjusted to the measured round trip times"""
+        return self._adaptive_timeout
+
+    @adaptive_timeout.setter
+    def adaptive_timeout(self, value: bool):
+        self._adaptive_timeout = value
+        if not value:
+            self._apply_read_timeout(self._timeout)
+
     @property
     def buffer_size(self) -> int:
         """size of the buffer used for sending and receiving data.
@@ -94,50 +423,89 @@ class LSV2TCP:
     def connect(self):
         """
         Establish connection to control
-
-        :raise socket.timeout: Exception if connection times out.
         """
-        try:
-            self._tcpsock.connect((self._host_ip, self._port))
-        except socket.timeout:
-            self._logger.error(
-                "could not connect to address '%s' on port %d",
-                self._host_ip,
-                self._port,
-            )
-            raise
-        except ConnectionRefusedError:
-            self._logger.error(
-                "connection to address '%s' on port %d was refused",
-                self._host_ip,
-                self._port,
-            )
-            raise
-
-        self._is_connected = True
-        self._last_lsv2_response = RSP.NONE
-        self._last_error = LSV2Error()
-
-        self._logger.debug("Connected to host %s at port %s", self._host_ip, self._port)
+        raise NotImplementedError()
 
     def disconnect(self):
         """
         Close connection
+        """
+        raise NotImplementedError()
 
-        :raise socket.timeout: Exception if connection times out.
+    def _write(self, data: bytes):
+        """send data to the control"""
+        raise NotImplementedError()
+
+    def _set_read_timeout(self, timeout: float):
+        """change the time to wait for data from the control"""
+        raise NotImplementedError()
+
+    def _apply_read_timeout(self, timeout: float):
+        """change the read timeout only if necessary since this might require a system call"""
+        if timeout != self._read_timeout and self._is_connected:
+            self._set_read_timeout(timeout)
+            self._read_timeout = timeout
+
+    def _on_timeout(self, partial: bool):
+        """handle a response which did not arrive in time. If part of the response was already read the
+        stream is out of sync and the connection is closed. Otherwise the connection is only closed if
+        ``close_on_timeout`` is set, else the response is expected to arrive late and is discarded
+        before the next telegram is sent
+
+        :param partial: ``True`` if part of the response was already read
         """
+        if not partial and self._discarding:
+            return
+        if partial or self.close_on_timeout:
+            self._logger.warning("no complete response within %s seconds, close the connection", self._read_timeout)
+            try:
+                self.disconnect()
+            except OSError:
+                pass
+            self._is_connected = False
+            self._pending = bytearray()
+            self._late_responses = 0
+        else:
+            self._logger.warning("no response within %s seconds, a late response will be discarded", self._read_timeout)
+            self._late_responses += 1
+
+    def _discard_late_responses(self):
+        """read and drop responses which arrived after their telegram timed out, so they are not
+        mistaken for the response to the next telegram"""
+        read_timeout = self._read_timeout
+        self._apply_read_timeout(self.LATE_RESPONSE_WAIT)
+        self._discarding = True
         try:
-            if self._tcpsock is not None:
-                self._tcpsock.close()
-        except socket.timeout:
-            self._logger.error("error while closing socket")
-            raise
+            while self._late_responses > 0 and self._is_connected:
+                response = self._receive()
+                self._late_responses -= 1
+                self._logger.info("discarded late response %s", response.response)
+        except (socket.timeout, TimeoutError):
+            self._logger.warning("%d late responses did not arrive, they might be mistaken for later responses", self._late_responses)
+            self._late_responses = 0
+        finally:
+            self._discarding = False
+            self._apply_read_timeout(read_timeout)
 
-        self._is_connected = False
-        self._last_lsv2_response = RSP.NONE
-        self._last_error = LSV2Error()
+    def _get_rtt_estimator(self, command: Union[CMD, RSP]) -> RTTEstimator:
+        """get the round trip time estimation for the class of the command"""
+        command_class = _command_class(command)
+        if command_class not in self._rtt_stats:
+            self._rtt_stats[command_class] = RTTEstimator(self._timeout, min(self.MIN_ADAPTIVE_TIMEOUT, self._timeout), self._timeout)
+        return self._rtt_stats[command_class]
 
-        self._logger.debug("Connection to %s closed", self._host_ip)
+    def _write_parts(self, parts: Sequence):
+        """send the buffers of one telegram to the control, subclasses can override this to avoid
+        joining the buffers"""
+        if len(parts) == 1:
+            self._write(parts[0])
+        else:
+            self._write(b"".join(parts))
+
+    def _read(self, size: int) -> bytes:
+        """wait for data from the control and return at least one and at most ``size`` bytes,
+        an empty result means the connection was closed"""
+        raise NotImplementedError()
 
     def telegram(
         self,
@@ -146,7 +514,8 @@ class LSV2TCP:
         wait_for_response: bool = True,
     ) -> bytearray:
         """
-        Send LSV2 telegram and receive response if necessary.
+        Send LSV2 telegram and receive response if necessary. Response and error are available via
+        :py:attr:`last_response` and :py:attr:`last_error`, see :py:meth:`request` to get them together.
 
         :param command: command string
         :param payload: command payload
@@ -156,44 +525,143 @@ class LSV2TCP:
         :raise LSV2ProtocolException: if the reviced response is too short for a minimal telegram
         :raise Exception:
         """
+        return bytearray(self.request(command, payload, wait_for_response).content)
+
+    def request(
+        self,
+        command: Union[CMD, RSP],
+        payload: Union[bytes, bytearray, None] = None,
+        wait_for_response: bool = True,
+    ) -> LSV2Response:
+        """
+        Send LSV2 telegram and return the response of the control. If no response is expected,
+        the returned response is ``RSP.NONE``.
+
+        :param command: command string
+        :param payload: command payload
+        :param wait_for_response: switch for waiting for response from control.
+        :raise LSV2StateException: if connection is not already open or error during transmission.
+        :raise OverflowError: if payload is to long for current buffer size
+        :raise LSV2ProtocolException: if the reviced response is too short for a minimal telegram
+        :raise Exception:
+        """
+        if self._late_responses > 0:
+            self._discard_late_responses()
         if self._is_connected is False:
             raise LSV2StateException("connection is not open!")
 
-        if payload is None or len(payload) == 0:
-            payload = bytearray()
-            payload_length = 0
-        else:
-            payload_length = len(payload)
+        telegram = self._encode(command, payload)
+        estimator = self._get_rtt_estimator(command)
+        if self._adaptive_timeout:
+            self._apply_read_timeout(estimator.timeout)
+
+        self._last_lsv2_response = RSP.NONE
+        self._pending = bytearray()
+
+        start = time.monotonic()
+        try:
+            # send bytes to control
+            self._write_parts(telegram)
+        except Exception as ex:
+            self._logger.error(
+                "something went wrong while sending data, buffer was set to %d",
+                self.buffer_size,
+            )
+            if isinstance(ex, ConnectionError):
+                self._is_connected = False
+            raise
+
+        if not wait_for_response:
+            self._last_error = LSV2Error()
+            return LSV2Response(RSP.NONE)
+
+        try:
+            response = self._receive()
+        except (socket.timeout, TimeoutError):
+            estimator.backoff()
+            raise
+        estimator.add_sample(time.monotonic() - start)
+        return response
+
+    def telegrams(self, requests: Sequence[Tuple[Union[CMD, RSP], bytearray]]) -> List[LSV2Response]:
+        """
+        Send several LSV2 telegrams back to back and read the responses afterwards. This saves the
+        round trip for each telegram but requires that the control accepts new telegrams before
+        the response to the previous one was read.
+
+        :param requests: list of command and payload for each telegram
+        :raise LSV2StateException: if connection is not already open or error during transmission.
+        :raise OverflowError: if a payload is to long for current buffer size
+        :raise LSV2ProtocolException: if a reviced response is too short for a minimal telegram
+        """
+        if self._late_responses > 0:
+            self._discard_late_responses()
+        if self._is_connected is False:
+            raise LSV2StateException("connection is not open!")
+
+        telegrams = [part for command, payload in requests for part in self._encode(command, payload)]
 
         self._last_lsv2_response = RSP.NONE
+        self._pending = bytearray()
+
+        try:
+            self._write_parts(telegrams)
+        except Exception as ex:
+            self._logger.error(
+                "something went wrong while sending data, buffer was set to %d",
+                self.buffer_size,
+            )
+            if isinstance(ex, ConnectionError):
+                self._is_connected = False
+            raise
+
+        results = []
+        for command, _ in requests:
+            if self._adaptive_timeout:
+                self._apply_read_timeout(self._get_rtt_estimator(command).timeout)
+            results.append(self._receive())
+        return results
 
-        telegram = bytearray()
-        # L -> unsigned long -> 32 bit
-        telegram.extend(struct.pack("!L", payload_length))
-        telegram.extend(map(ord, command))
+    def _encode(self, command: Union[CMD, RSP], payload: Union[bytearray, None]) -> Sequence:
+        """encode one telegram and check if it fits into the buffer"""
+        if payload is None:
+            payload = b""
+        payload_length = len(payload)
 
-        if len(payload) > 0:
-            telegram.extend(payload)
+        telegram = _encode_telegram(command, payload)
         self._logger.debug(
             "telegram to transmit: command %s payload length %d bytes data: %s",
             command,
             payload_length,
             telegram,
         )
-        if len(telegram) >= self.buffer_size:
-            raise OverflowError("telegram to long for set current buffer size: %d >= %d" % (len(telegram), self.buffer_size))
+        if payload_length + 8 >= self.buffer_size:
+            raise OverflowError("telegram to long for set current buffer size: %d >= %d" % (payload_length + 8, self.buffer_size))
+        return telegram
 
-        data_recived = bytearray()
+    def _receive(self) -> LSV2Response:
+        """read the next response from the stream, data which already belongs to the
+        following response is kept for the next call"""
+        data_recived = self._pending
+        self._pending = bytearray()
         try:
-            # send bytes to control
-            self._tcpsock.send(bytes(telegram))
-            if wait_for_response:
-                data_recived = self._tcpsock.recv(self.buffer_size)
-        except Exception:
+            if len(data_recived) == 0:
+                data_recived = bytearray(self._read(self.buffer_size))
+            while 0 < len(data_recived) < 8:
+                # the header was split, wait for the rest of it
+                more_data = self._read(8 - len(data_recived))
+                if len(more_data) == 0:
+                    break
+                data_recived.extend(more_data)
+        except Exception as ex:
             self._logger.error(
                 "something went wrong while waiting for new data to arrive, buffer was set to %d",
                 self.buffer_size,
             )
+            if isinstance(ex, ConnectionError):
+                self._is_connected = False
+            elif isinstance(ex, (socket.timeout, TimeoutError)):
+                self._on_timeout(len(data_recived) > 0)
             raise
 
         if len(data_recived) > 0:
@@ -208,28 +676,39 @@ class LSV2TCP:
                 # response is less than 8 bytes long which is not enough space for package length and response message!
                 raise LSV2ProtocolException("response to short, less than 8 bytes: %s" % data_recived)
         else:
+            self._logger.warning("connection was closed by the control")
+            self._is_connected = False
             response_length = 0
             self._last_lsv2_response = RSP.NONE
 
-        if response_length > 0:
-            response_content = bytearray(data_recived[8:])
-            while len(response_content) < response_length:
-                self._logger.debug(
-                    "waiting for more data to arrive, %d bytes missing",
-                    len(response_content) < response_length,
+        response_content = data_recived[8 : 8 + response_length]
+        self._pending = data_recived[8 + response_length :]
+        while len(response_content) < response_length:
+            self._logger.debug(
+                "waiting for more data to arrive, %d bytes missing",
+                response_length - len(response_content),
+            )
+            try:
+                more_data = self._read(response_length - len(response_content))
+            except Exception as ex:
+                self._logger.error(
+                    "something went wrong while waiting for more data to arrive. expected %d, received %d, content so far: %s",
+                    response_length,
+                    len(response_content),
+                    response_content,
                 )
-                try:
-                    response_content.extend(self._tcpsock.recv(response_length - len(data_recived[8:])))
-                except Exception:
-                    self._logger.error(
-                        "something went wrong while waiting for more data to arrive. expected %d, received %d, content so far: %s",
-                        response_length,
-                        len(data_recived),
-                        data_recived,
-                    )
-                    raise
-        else:
-            response_content = bytearray()
+                if isinstance(ex, ConnectionError):
+                    self._is_connected = False
+                elif isinstance(ex, (socket.timeout, TimeoutError)):
+                    self._on_timeout(True)
+                raise
+            if len(more_data) == 0:
+                self._is_connected = False
+                raise LSV2ProtocolException(
+                    "connection closed before the response was complete, expected %d bytes but received %d"
+                    % (response_length, len(response_content))
+                )
+            response_content.extend(more_data)
 
         self._last_error = LSV2Error()
         if self._last_lsv2_response in [RSP.T_ER, RSP.T_BD]:
@@ -240,76 +719,434 @@ class LSV2TCP:
             else:
                 raise Exception(response_content)
 
-        return response_content
+        return LSV2Response(self._last_lsv2_response, bytes(response_content), self._last_error)
 
 
-class LSV2RS232:
-    """placeholder implementation of the low level communication functions for sending and
-    receiving LSV2 telegrams via RS232"""
+class LSV2TCP(LSV2StreamTransport):
+    """Implementation of the low level communication functions for sending and
+    receiving LSV2 telegrams via TCP"""
 
-    DEFAULT_BUFFER_SIZE = 256
-    # Default size of send and receive buffer
+    DEFAULT_PORT = 19000
+    # Default port for LSV2 on control side
 
-    def __init__(self, port: str, speed: int, timeout: float = 15.0):
-        self._logger = logging.getLogger("LSV2 RS232")
-        self.buffer_size = LSV2RS232.DEFAULT_BUFFER_SIZE
+    CONNECTION_ATTEMPT_DELAY = 0.25
+    # seconds to wait for a connection before the next address of the host is tried in parallel
 
-        self._is_connected = False
-        self._last_lsv2_response = RSP.NONE
-        self._last_error = LSV2Error()
-        raise NotImplementedError()
-        # import serial
+    def __init__(
+        self,
+        hostname: str,
+        port: int = 19000,
+        timeout: float = 15.0,
+        connect_timeout: Union[float, None] = None,
+        adaptive_timeout: bool = False,
+        options: Union[TCPOptions, None] = None,
+    ):
+        """Set connection parameters
 
-    @property
-    def last_response(self) -> RSP:
-        """get the response to the last telegram"""
-        return self._last_lsv2_response
+        :param hostname: ip or hostname of control, IPv4 and IPv6 are supported.
+        :param port: port number, defaults to 19000.
+        :param timeout: number of seconds for time out of connection.
+        :param connect_timeout: number of seconds to wait while establishing the connection, defaults to ``timeout``.
+                                A short value allows to detect machines which are switched off quickly
+        :param adaptive_timeout: adjust the timeout for each response to the measured round trip times
+        :param options: socket options for the connection, defaults to :py:class:`~pyLSV2.low_level_com.TCPOptions`
 
-    @property
-    def last_error(self) -> LSV2Error:
-        """get the error if the last telegram failed"""
-        return self._last_error
+        :raises socket.gaierror: Hostname could not be resolved
+        """
+        self._options = TCPOptions() if options is None else options
+        super().__init__("LSV2 TCP", timeout, adaptive_timeout)
+        self._connect_timeout = timeout if connect_timeout is None else connect_timeout
+
+        self._hostname = hostname
+        self._port = self.DEFAULT_PORT
+        if port > 0:
+            self._port = port
+
+        try:
+            addresses = resolve_address(hostname, self._port)
+        except socket.gaierror:
+            logging.error("there was an error getting the IP for the hostname %s", hostname)
+            raise
+        self._host_ip = addresses[0][1][0]
+        self._tcpsock: Union[socket.socket, None] = None
+
+        self._logger.debug(
+            "host %s was resolved to IP %s",
+            hostname,
+            ", ".join(a[1][0] for a in addresses),
+        )
 
     @property
     def buffer_size(self) -> int:
         """size of the buffer used for sending and receiving data.
-        has to be negotiated with the control"""
+        has to be negotiated with the control, the socket buffers are adjusted accordingly"""
         return self._buffer_size
 
     @buffer_size.setter
     def buffer_size(self, value: int):
-        if value < 8:
-            self._buffer_size = self.DEFAULT_BUFFER_SIZE
-            self._logger.warning(
-                "size of receive buffer to small, set to default of %d bytes",
-                self._buffer_size,
+        LSV2StreamTransport.buffer_size.fset(self, value)
+        if self._is_connected:
+            self._options.apply_buffer_size(self._tcpsock, self._buffer_size)
+
+    def _create_socket(self, family: int) -> socket.socket:
+        """create a new socket for the connection
+
+        :raises socket.error: could not create socket
+        """
+        try:
+            tcpsock = socket.socket(family, socket.SOCK_STREAM)
+        except socket.error as err:
+            self._logger.error("socket creation failed with error %s", err)
+            raise
+        try:
+            tcpsock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            tcpsock.settimeout(self._timeout)
+            self._options.apply(tcpsock)
+        except socket.error as err:
+            self._logger.error("socket creation failed with error %s", err)
+            tcpsock.close()
+            raise
+        return tcpsock
+
+    def _connect_any(self, addresses: List[Tuple[int, tuple]]) -> socket.socket:
+        """
+        Connect to the first address which answers. A new attempt is started every
+        :py:attr:`CONNECTION_ATTEMPT_DELAY` seconds while the previous attempts are still running (RFC 8305)
+
+        :raise socket.timeout: if no connection was established within the connect timeout
+        :raise OSError: error of the last attempt if all attempts failed
+        """
+        deadline = time.monotonic() + self._connect_timeout
+        remaining = _interleave_families(addresses)
+        last_error: OSError = socket.timeout("timed out")
+        next_attempt = 0.0
+        selector = selectors.DefaultSelector()
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= deadline:
+                    raise socket.timeout("timed out")
+                if len(remaining) > 0 and (len(selector.get_map()) == 0 or now >= next_attempt):
+                    family, address = remaining.pop(0)
+                    try:
+                        tcpsock = self._create_socket(family)
+                    except OSError as ex:
+                        # for example the source address does not fit the address family, try the next address
+                        last_error = ex
+                        continue
+                    tcpsock.setblocking(False)
+                    result = tcpsock.connect_ex(address)
+                    if result == 0:
+                        return tcpsock
+                    if result in (errno.EINPROGRESS, errno.EWOULDBLOCK, getattr(errno, "WSAEWOULDBLOCK", errno.EWOULDBLOCK)):
+                        selector.register(tcpsock, selectors.EVENT_WRITE, address)
+                        next_attempt = now + self.CONNECTION_ATTEMPT_DELAY
+                    else:
+                        last_error = OSError(result, "%s: %s" % (os.strerror(result), address[0]))
+                        tcpsock.close()
+                    continue
+
+                if len(selector.get_map()) == 0:
+                    raise last_error
+
+                wait = deadline - now
+                if len(remaining) > 0:
+                    wait = min(wait, next_attempt - now)
+                for key, _ in selector.select(max(wait, 0.0)):
+                    tcpsock = key.fileobj
+                    selector.unregister(tcpsock)
+                    result = tcpsock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    if result == 0:
+                        return tcpsock
+                    last_error = OSError(result, "%s: %s" % (os.strerror(result), key.data[0]))
+                    tcpsock.close()
+        finally:
+            # close the attempts which lost the race
+            for key in list(selector.get_map().values()):
+                key.fileobj.close()
+            selector.close()
+
+    def connect(self):
+        """
+        Establish connection to control, a closed connection can be opened again.
+        If the host name resolves to several addresses, they are tried in parallel with a short delay
+
+        :raise socket.timeout: Exception if connection times out.
+        :raises socket.gaierror: Hostname could not be resolved
+        """
+        addresses = resolve_address(self._hostname, self._port)
+        try:
+            if len(addresses) == 1:
+                self._host_ip = addresses[0][1][0]
+                self._tcpsock = self._create_socket(addresses[0][0])
+                try:
+                    self._tcpsock.settimeout(self._connect_timeout)
+                    self._tcpsock.connect(addresses[0][1])
+                except OSError:
+                    self._tcpsock.close()
+                    raise
+            else:
+                self._tcpsock = self._connect_any(addresses)
+                self._host_ip = self._tcpsock.getpeername()[0]
+            self._tcpsock.settimeout(self._timeout)
+        except socket.timeout:
+            self._logger.error(
+                "could not connect to address '%s' on port %d",
+                self._host_ip,
+                self._port,
+            )
+            raise
+        except ConnectionRefusedError:
+            self._logger.error(
+                "connection to address '%s' on port %d was refused",
+                self._host_ip,
+                self._port,
             )
+            raise
+
+        self._is_connected = True
+        self._read_timeout = self._timeout
+        self._late_responses = 0
+        self._options.apply_buffer_size(self._tcpsock, self.buffer_size)
+        self._last_lsv2_response = RSP.NONE
+        self._last_error = LSV2Error()
+
+        self._logger.debug("Connected to host %s at port %s", self._host_ip, self._port)
+
+    def disconnect(self):
+        """
+        Close connection
+
+        :raise socket.timeout: Exception if connection times out.
+        """
+        try:
+            if self._tcpsock is not None:
+                self._tcpsock.close()
+        except socket.timeout:
+            self._logger.error("error while closing socket")
+            raise
+
+        self._is_connected = False
+        self._last_lsv2_response = RSP.NONE
+        self._last_error = LSV2Error()
+
+        self._logger.debug("Connection to %s closed", self._host_ip)
+
+    def _write(self, data: bytes):
+        self._tcpsock.sendall(data)
+
+    def _write_parts(self, parts: Sequence):
+        if len(parts) == 1:
+            self._tcpsock.sendall(parts[0])
+        elif not hasattr(self._tcpsock, "sendmsg"):
+            # scatter/gather is not available on all platforms
+            self._tcpsock.sendall(b"".join(parts))
         else:
-            self._buffer_size = value
+            # send header and payload with one call without copying the payload
+            buffers = [memoryview(part) for part in parts]
+            while len(buffers) > 0:
+                sent = self._tcpsock.sendmsg(buffers)
+                while sent > 0:
+                    if sent >= len(buffers[0]):
+                        sent -= len(buffers.pop(0))
+                    else:
+                        buffers[0] = buffers[0][sent:]
+                        sent = 0
+
+    def _read(self, size: int) -> bytes:
+        return self._tcpsock.recv(size)
+
+    def _set_read_timeout(self, timeout: float):
+        self._tcpsock.settimeout(timeout)
+
+
+class LSV2SerialGateway(LSV2StreamTransport):
+    """Implementation of the low level communication functions for sending and receiving LSV2 telegrams
+    via a serial port to a gateway, requires the library pyserial.
+
+    The telegrams are exchanged with the same framing as via TCP. This only works with serial to ethernet
+    gateways and devices which pass the telegram stream through transparently, it can not talk to the
+    serial LSV2 interface of a control directly since the ISO 1745 block protocol is not implemented."""
+
+    def __init__(self, port: str, speed: int = 115200, timeout: float = 15.0, adaptive_timeout: bool = False):
+        """Set connection parameters
+
+        :param port: name of the serial port, for example ``/dev/ttyUSB0`` or ``COM1``
+        :param speed: baud rate of the serial connection
+        :param timeout: number of seconds to wait for a response
+        :param adaptive_timeout: adjust the timeout for each response to the measured round trip times
+        """
+        super().__init__("LSV2 Serial Gateway", timeout, adaptive_timeout)
+        self._port = port
+        self._speed = speed
+        self._serial = None
 
     def connect(self):
         """
-        Establish connection to control
+        Open the serial port
+
+        :raise ImportError: if pyserial is not installed
         """
-        raise NotImplementedError()
+        try:
+            import serial
+        except ImportError:
+            self._logger.error("the serial gateway transport requires the library pyserial")
+            raise
+
+        self._serial = serial.Serial(port=self._port, baudrate=self._speed, timeout=self._timeout)
+        self._is_connected = True
+        self._read_timeout = self._timeout
+        self._late_responses = 0
+        self._last_lsv2_response = RSP.NONE
+        self._last_error = LSV2Error()
+
+        self._logger.debug("Opened serial port %s with %d baud", self._port, self._speed)
 
     def disconnect(self):
         """
-        Close connection
+        Close the serial port
         """
-        raise NotImplementedError()
+        if self._serial is not None:
+            self._serial.close()
+            self._serial = None
 
-    def telegram(
+        self._is_connected = False
+        self._last_lsv2_response = RSP.NONE
+        self._last_error = LSV2Error()
+
+        self._logger.debug("Serial port %s closed", self._port)
+
+    def _write(self, data: bytes):
+        self._serial.write(data)
+        self._serial.flush()
+
+    def _read(self, size: int) -> bytes:
+        # wait for the first byte, then take whatever else already arrived
+        data = self._serial.read(1)
+        if len(data) == 0:
+            raise TimeoutError("no response from control within %s seconds" % self._read_timeout)
+        if size > 1 and self._serial.in_waiting > 0:
+            data += self._serial.read(min(self._serial.in_waiting, size - 1))
+        return data
+
+    def _set_read_timeout(self, timeout: float):
+        self._serial.timeout = timeout
+
+
+class LSV2SSH(LSV2StreamTransport):
+    """Implementation of the low level communication functions for sending and receiving LSV2 telegrams
+    through a ssh channel, requires the library paramiko.
+
+    The telegrams are sent directly through a ``direct-tcpip`` channel of the ssh connection, no local
+    port forwarding is necessary. SSH has to be enabled on the control and the public key of the
+    user has to be added to the control."""
+
+    def __init__(
         self,
-        command: Union[CMD, RSP],
-        payload: bytearray = bytearray(),
-        wait_for_response: bool = True,
-    ) -> bytearray:
+        hostname: str,
+        port: int = 19000,
+        timeout: float = 15.0,
+        username: str = "user",
+        password: Union[str, None] = None,
+        key_filename: Union[str, None] = None,
+        ssh_port: int = 22,
+        ssh_client=None,
+        adaptive_timeout: bool = False,
+        host_key_policy=None,
+    ):
+        """Set connection parameters
+
+        :param hostname: ip or hostname of control.
+        :param port: port of the LSV2 server on the control, defaults to 19000.
+        :param timeout: number of seconds for time out of connection.
+        :param username: name of the user on the control
+        :param password: password of the user or for the private key file
+        :param key_filename: path of the private key file
+        :param ssh_port: port of the ssh server on the control
+        :param ssh_client: already configured instance of ``paramiko.SSHClient``, for example with a custom
+                           policy for unknown host keys. If set, the connection parameters for ssh are not used
+        :param adaptive_timeout: adjust the timeout for each response to the measured round trip times
+        :param host_key_policy: instance of ``paramiko.MissingHostKeyPolicy`` used for hosts which are not
+                                in the known hosts file, defaults to ``paramiko.RejectPolicy``.
+                                Use ``paramiko.WarningPolicy`` to accept unknown hosts like sshtunnel does
         """
-        Send LSV2 telegram and receive response if necessary.
+        super().__init__("LSV2 SSH", timeout, adaptive_timeout)
+        self._host_key_policy = host_key_policy
+        self._hostname = hostname
+        self._port = port if port > 0 else LSV2TCP.DEFAULT_PORT
+        self._username = username
+        self._password = password
+        self._key_filename = key_filename
+        self._ssh_port = ssh_port
+        self._ssh_client = ssh_client
+        self._own_client = ssh_client is None
+        self._channel = None
 
-        :param command: command string
-        :param payload: command payload
-        :param wait_for_response: switch for waiting for response from control.
+    def connect(self):
         """
-        raise NotImplementedError()
+        Establish the ssh connection and open a channel to the LSV2 server of the control
+
+        :raise ImportError: if paramiko is not installed
+        """
+        if self._ssh_client is None:
+            try:
+                import paramiko
+            except ImportError:
+                self._logger.error("the ssh transport requires the library paramiko")
+                raise
+            self._ssh_client = paramiko.SSHClient()
+            self._ssh_client.load_system_host_keys()
+            if self._host_key_policy is not None:
+                self._ssh_client.set_missing_host_key_policy(self._host_key_policy)
+
+        if self._ssh_client.get_transport() is None or not self._ssh_client.get_transport().is_active():
+            self._ssh_client.connect(
+                self._hostname,
+                port=self._ssh_port,
+                username=self._username,
+                password=self._password,
+                key_filename=self._key_filename,
+                timeout=self._timeout,
+            )
+
+        self._channel = self._ssh_client.get_transport().open_channel(
+            "direct-tcpip",
+            ("127.0.0.1", self._port),
+            ("127.0.0.1", 0),
+            timeout=self._timeout,
+        )
+        self._channel.settimeout(self._timeout)
+
+        self._is_connected = True
+        self._read_timeout = self._timeout
+        self._late_responses = 0
+        self._last_lsv2_response = RSP.NONE
+        self._last_error = LSV2Error()
+
+        self._logger.debug("Opened ssh channel to %s port %d", self._hostname, self._port)
+
+    def disconnect(self):
+        """
+        Close the channel and the ssh connection if it was opened by this transport
+        """
+        if self._channel is not None:
+            self._channel.close()
+            self._channel = None
+        if self._own_client and self._ssh_client is not None:
+            self._ssh_client.close()
+            self._ssh_client = None
+
+        self._is_connected = False
+        self._last_lsv2_response = RSP.NONE
+        self._last_error = LSV2Error()
+
+        self._logger.debug("ssh channel to %s closed", self._hostname)
+
+    def _write(self, data: bytes):
+        self._channel.sendall(data)
+
+    def _read(self, size: int) -> bytes:
+        return self._channel.recv(size)
+
+    def _set_read_timeout(self, timeout: float):
+        self._channel.settimeout(timeout)
@@ -3,7 +3,7 @@
 """misc helper functions for the scope part of pyLSV2"""
 
 import struct
-from typing import List
+from typing import BinaryIO, Iterator, List, Tuple
 import logging
 
 from . import const as lc
@@ -13,6 +13,19 @@ from .err import LSV2DataException
 
 logger = logging.getLogger("LSV2 Client Scope")
 
+#: magic bytes at the start of a binary scope stream
+SCOPE_STREAM_MAGIC = b"LSV2SCOP"
+
+#: version of the binary scope stream layout
+SCOPE_STREAM_VERSION = 1
+
+# magic, version, interval in µs, number of signals
+_STREAM_HEADER = struct.Struct("!8sHLH")
+# channel, signal, offset, factor, unit, length of name
+_STREAM_SIGNAL = struct.Struct("!Hhld10sB")
+# sequence number, number of samples per signal
+_STREAM_BLOCK = struct.Struct("!LH")
+
 
 def decode_signal_description(data_set: bytearray) -> List[ld.ScopeSignal]:
     """
@@ -183,3 +196,142 @@ def decode_scope_reading(
 
     logger.debug("finished decoding data for %s signals", len(signal_list))
     return reading
+
+
+def encode_scope_stream_header(signal_list: List[ld.ScopeSignal], interval: int) -> bytearray:
+    """
+    Create the header of a binary scope stream. The layout of the stream is, all values in network byte order:
+
+    header:
+      - 8 bytes magic ``LSV2SCOP``
+      - uint16 version of the layout, currently 1
+      - uint32 interval between samples in µs
+      - uint16 number of signals
+
+    followed by one description per signal:
+      - uint16 channel number
+      - int16 signal number
+      - int32 offset
+      - float64 factor
+      - 10 bytes unit, latin1 padded with zeros
+      - uint8 length of the name followed by the normalized name of the signal in latin1
+
+    followed by any number of data blocks, see :py:func:`encode_scope_block`.
+    The scaled value of a sample is ``raw * factor + offset``.
+
+    :param signal_list: list of the recorded signals, factor, offset and unit have to be set already
+    :param interval: interval in µs between samples
+    """
+    data = bytearray(_STREAM_HEADER.pack(SCOPE_STREAM_MAGIC, SCOPE_STREAM_VERSION, interval, len(signal_list)))
+    for signal in signal_list:
+        name = signal.normalized_name().encode("latin1", "replace")[:255]
+        data.extend(
+            _STREAM_SIGNAL.pack(
+                signal.channel,
+                signal.signal,
+                signal.offset,
+                signal.factor,
+                signal.unit.encode("latin1", "replace")[:10],
+                len(name),
+            )
+        )
+        data.extend(name)
+    return data
+
+
+def encode_scope_block(reading: ld.ScopeReading) -> bytearray:
+    """
+    Encode a block of scope readings for a binary scope stream:
+      - uint32 sequence number
+      - uint16 number of samples per signal
+      - int32 raw values, all samples of the first signal followed by all samples of the next signal
+
+    :param reading: decoded block of scope readings
+    """
+    signal_data = reading.get_data()
+    samples = len(signal_data[0].data) if len(signal_data) > 0 else 0
+    data = bytearray(_STREAM_BLOCK.pack(reading.seqence_nr(), samples))
+    values_format = struct.Struct("!%dl" % samples)
+    for sig_data in signal_data:
+        data.extend(values_format.pack(*sig_data.data))
+    return data
+
+
+def _read_exactly(stream: BinaryIO, length: int) -> bytes:
+    """read a fixed number of bytes from a stream, returns less only if the stream ended"""
+    data = stream.read(length)
+    while 0 < len(data) < length:
+        more = stream.read(length - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+
+def read_scope_stream_header(stream: BinaryIO) -> Tuple[int, List[ld.ScopeSignal]]:
+    """
+    Read the header of a binary scope stream, see :py:func:`encode_scope_stream_header`.
+    Returns the interval in µs and the list of signals
+
+    :param stream: readable binary stream or file
+
+    :raises LSV2DataException: if the stream does not start with a valid header
+    """
+    data = _read_exactly(stream, _STREAM_HEADER.size)
+    if len(data) != _STREAM_HEADER.size:
+        raise LSV2DataException("stream ended before header was complete")
+    magic, version, interval, signal_count = _STREAM_HEADER.unpack(data)
+    if magic != SCOPE_STREAM_MAGIC:
+        raise LSV2DataException("stream does not contain scope data")
+    if version != SCOPE_STREAM_VERSION:
+        raise LSV2DataException("unsupported version %d of scope stream" % version)
+
+    signals: List[ld.ScopeSignal] = []
+    for _ in range(signal_count):
+        data = _read_exactly(stream, _STREAM_SIGNAL.size)
+        if len(data) != _STREAM_SIGNAL.size:
+            raise LSV2DataException("stream ended before signal description was complete")
+        channel, signal_number, offset, factor, unit, name_length = _STREAM_SIGNAL.unpack(data)
+        signal = ld.ScopeSignal()
+        signal.channel = channel
+        signal.signal = signal_number
+        signal.offset = offset
+        signal.factor = factor
+        signal.unit = lm.ba_to_ustr(unit)
+        signal.channel_name = _read_exactly(stream, name_length).decode("latin1")
+        signals.append(signal)
+    return interval, signals
+
+
+def read_scope_blocks(stream: BinaryIO, signal_list: List[ld.ScopeSignal]) -> Iterator[ld.ScopeReading]:
+    """
+    Read the data blocks of a binary scope stream until the stream ends, see :py:func:`encode_scope_block`
+
+    :param stream: readable binary stream or file positioned after the header
+    :param signal_list: list of signals as returned by :py:func:`read_scope_stream_header`
+
+    :raises LSV2DataException: if the stream ends in the middle of a block
+    """
+    while True:
+        data = _read_exactly(stream, _STREAM_BLOCK.size)
+        if len(data) == 0:
+            return
+        if len(data) != _STREAM_BLOCK.size:
+            raise LSV2DataException("stream ended in the middle of a block header")
+        sequence_number, samples = _STREAM_BLOCK.unpack(data)
+        values_format = struct.Struct("!%dl" % samples)
+        data = _read_exactly(stream, values_format.size * len(signal_list))
+        if len(data) != values_format.size * len(signal_list):
+            raise LSV2DataException("stream ended in the middle of a block")
+        reading = ld.ScopeReading(sequence_number)
+        for i, signal in enumerate(signal_list):
+            sig_data = ld.ScopeSignalData(
+                channel=signal.channel,
+                signal=signal.signal,
+                offset=signal.offset,
+                factor=signal.factor,
+                unit=signal.unit,
+            )
+            sig_data.data.extend(values_format.unpack_from(data, i * values_format.size))
+            reading.add_dataset(sig_data)
+        yield reading
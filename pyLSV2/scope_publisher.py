@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""fan out scope readings to other local processes while they are recorded
+
+The data is sent in the binary scope stream format described in
+:py:func:`pyLSV2.misc_scope.encode_scope_stream_header`: every subscriber first receives the stream header
+followed by one block per reading.
+
+.. code-block:: python
+
+    with ScopePublisher("/tmp/lsv2_scope.sock", signals, interval=600) as publisher:
+        for reading in publisher.publish_readings(con.real_time_readings(signals, 60, 600)):
+            pass
+
+    # in another process
+    subscriber = ScopeSubscriber("/tmp/lsv2_scope.sock")
+    for reading in subscriber.readings():
+        print(reading.get_data()[0].scaled_data())
+"""
+
+import logging
+import os
+import queue
+import socket
+import threading
+from typing import Iterable, Iterator, List, Tuple, Union
+
+from . import dat_cls as ld
+from . import misc_scope as lms
+from .err import LSV2StateException
+
+logger = logging.getLogger("LSV2 Scope Publisher")
+
+
+def _unix_sockets_available() -> bool:
+    """check if the platform supports unix domain sockets"""
+    return hasattr(socket, "AF_UNIX")
+
+
+def _create_socket(address: Union[str, Tuple[str, int]]) -> socket.socket:
+    """create a unix domain socket for a path or a tcp socket for a tuple of host and port"""
+    if isinstance(address, (str,)):
+        return socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    return socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+
+
+def _read_fallback_address(path: str) -> Tuple[str, int]:
+    """read host and port of the tcp socket which the publisher uses instead of the unix domain socket at path"""
+    try:
+        with open(path, "r", encoding="ascii") as address_file:
+            host, port = address_file.read().split()
+    except (OSError, ValueError) as ex:
+        raise LSV2StateException("no publisher found at %s" % path) from ex
+    return host, int(port)
+
+
+class _Subscriber:
+    """connection to one subscriber with its own queue and sending thread"""
+
+    def __init__(self, connection: socket.socket, queue_size: int):
+        self.connection = connection
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.active = True
+        self.thread = threading.Thread(target=self._send_loop, name="scope_subscriber", daemon=True)
+
+    def _send_loop(self):
+        while True:
+            data = self.queue.get()
+            if data is None:
+                break
+            try:
+                self.connection.sendall(data)
+            except OSError as ex:
+                logger.info("subscriber disconnected: %s", ex)
+                break
+        self.active = False
+        self.connection.close()
+
+    def stop(self):
+        """stop the sending thread after all queued data was sent"""
+        self.active = False
+        try:
+            self.queue.put_nowait(None)
+        except queue.Full:
+            # the thread is stuck on a slow subscriber, only shutting down the socket reliably wakes up a
+            # blocking sendall, closing it alone does not
+            try:
+                self.connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.connection.close()
+
+
+class ScopePublisher:
+    """Publish scope readings to any number of local subscribers via a unix domain socket or a tcp socket
+    on the loopback interface. On platforms without unix domain sockets a path is replaced by a tcp socket
+    on the loopback interface whose port is written to the file at the path. Each subscriber has a bounded
+    queue, if a subscriber can not keep up and its queue runs full it is disconnected instead of slowing
+    down the acquisition."""
+
+    def __init__(
+        self,
+        address: Union[str, Tuple[str, int]],
+        signal_list: List[ld.ScopeSignal],
+        interval: int,
+        queue_size: int = 256,
+    ):
+        """
+        :param address: path of the unix domain socket or tuple of host and port for a tcp socket
+        :param signal_list: list of the recorded signals
+        :param interval: interval in µs between readings
+        :param queue_size: number of blocks that can be queued for each subscriber before it is dropped
+        """
+        self._address = address
+        self._signal_list = signal_list
+        self._interval = interval
+        self._queue_size = queue_size
+        self._header: Union[bytes, None] = None
+        self._subscribers: List[_Subscriber] = []
+        self._lock = threading.Lock()
+        self._server: Union[socket.socket, None] = None
+        self._accept_thread: Union[threading.Thread, None] = None
+        self._dropped = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        """number of currently connected subscribers"""
+        with self._lock:
+            return len([s for s in self._subscribers if s.active])
+
+    @property
+    def dropped_subscribers(self) -> int:
+        """number of subscribers which were disconnected because they could not keep up"""
+        return self._dropped
+
+    @property
+    def address(self) -> Union[str, Tuple[str, int]]:
+        """address the publisher is listening on"""
+        if self._server is not None and not isinstance(self._address, (str,)):
+            return self._server.getsockname()
+        return self._address
+
+    def start(self):
+        """open the socket and start accepting subscribers. If unix domain sockets are not available, a tcp
+        socket on the loopback interface is opened instead and its port is written to the file at the path"""
+        if isinstance(self._address, (str,)) and os.path.exists(self._address):
+            os.unlink(self._address)
+        if isinstance(self._address, (str,)) and not _unix_sockets_available():
+            self._server = _create_socket(("127.0.0.1", 0))
+            self._server.bind(("127.0.0.1", 0))
+            with open(self._address, "w", encoding="ascii") as address_file:
+                address_file.write("%s %d" % self._server.getsockname()[:2])
+            logger.info("unix domain sockets are not supported, use tcp port %d instead", self._server.getsockname()[1])
+        else:
+            self._server = _create_socket(self._address)
+            self._server.bind(self._address)
+        self._server.listen()
+        self._accept_thread = threading.Thread(target=self._accept_loop, name="scope_publisher", daemon=True)
+        self._accept_thread.start()
+        logger.debug("publisher is listening on %s", self.address)
+
+    def close(self):
+        """disconnect all subscribers and close the socket"""
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        with self._lock:
+            subscribers = self._subscribers
+            self._subscribers = []
+        for subscriber in subscribers:
+            subscriber.stop()
+        for subscriber in subscribers:
+            subscriber.thread.join(timeout=1.0)
+        if isinstance(self._address, (str,)) and os.path.exists(self._address):
+            os.unlink(self._address)
+        logger.debug("publisher closed")
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        self.close()
+
+    def _accept_loop(self):
+        while self._server is not None:
+            try:
+                connection, _ = self._server.accept()
+            except OSError:
+                break
+            subscriber = _Subscriber(connection, self._queue_size)
+            with self._lock:
+                if self._header is not None:
+                    subscriber.queue.put_nowait(self._header)
+                self._subscribers.append(subscriber)
+            subscriber.thread.start()
+            logger.info("new subscriber connected")
+
+    def _distribute(self, data: bytes):
+        """put data in the queue of every subscriber and drop those that can not keep up,
+        has to be called while holding the lock"""
+        for subscriber in self._subscribers:
+            if not subscriber.active:
+                continue
+            try:
+                subscriber.queue.put_nowait(data)
+            except queue.Full:
+                logger.warning("subscriber is too slow, drop connection")
+                self._dropped += 1
+                subscriber.stop()
+        self._subscribers = [s for s in self._subscribers if s.active]
+
+    def publish(self, reading: ld.ScopeReading):
+        """
+        Send a block of scope readings to all subscribers. Never blocks on slow subscribers.
+
+        :param reading: decoded block of scope readings
+        """
+        block = bytes(lms.encode_scope_block(reading))
+        with self._lock:
+            if self._header is None:
+                # factor, offset and unit of the signals are only known after the first reading was received.
+                # new subscribers get the header when they are accepted, so it is queued for the current
+                # subscribers without releasing the lock in between
+                self._header = bytes(lms.encode_scope_stream_header(self._signal_list, self._interval))
+                self._distribute(self._header)
+            self._distribute(block)
+
+    def publish_readings(self, readings: Iterable[ld.ScopeReading]) -> Iterator[ld.ScopeReading]:
+        """
+        Publish every reading and pass it on, so the publisher can be placed in an existing processing loop
+
+        :param readings: iterable of scope readings, for example from :py:func:`~pyLSV2.LSV2.real_time_readings`
+        """
+        for reading in readings:
+            self.publish(reading)
+            yield reading
+
+
+class ScopeSubscriber:
+    """receive scope readings from a :py:class:`ScopePublisher`"""
+
+    def __init__(self, address: Union[str, Tuple[str, int]], timeout: Union[float, None] = None):
+        """
+        :param address: path of the unix domain socket or tuple of host and port of the publisher
+        :param timeout: number of seconds to wait for new data, ``None`` waits forever
+        """
+        if isinstance(address, (str,)) and not _unix_sockets_available():
+            address = _read_fallback_address(address)
+        self._socket = _create_socket(address)
+        self._socket.settimeout(timeout)
+        self._socket.connect(address)
+        self._stream = self._socket.makefile("rb")
+        self._interval = -1
+        self._signal_list: List[ld.ScopeSignal] = []
+
+    @property
+    def interval(self) -> int:
+        """interval in µs between readings, available after the first reading was received"""
+        return self._interval
+
+    @property
+    def signals(self) -> List[ld.ScopeSignal]:
+        """list of the published signals, available after the first reading was received"""
+        return self._signal_list
+
+    def readings(self) -> Iterator[ld.ScopeReading]:
+        """yield the published readings until the publisher closes the connection"""
+        self._interval, self._signal_list = lms.read_scope_stream_header(self._stream)
+        yield from lms.read_scope_blocks(self._stream, self._signal_list)
+
+    def close(self):
+        """close the connection to the publisher"""
+        self._stream.close()
+        self._socket.close()
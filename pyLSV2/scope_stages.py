@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""streaming processing stages for scope readings
+
+The stages work on whole blocks of decoded :py:class:`~pyLSV2.dat_cls.ScopeReading` and use
+slicing and the built-in aggregate functions instead of per sample python code where possible.
+Stages can be chained with :py:func:`process_readings`:
+
+.. code-block:: python
+
+    readings = con.real_time_readings(signals, duration=60, interval=600)
+    for window in process_readings(readings, Decimator(10), WindowStatistics(100)):
+        print(window.get_data())
+
+To only keep the data around rare events, use :py:class:`TriggeredCapture` with one of the triggers:
+
+.. code-block:: python
+
+    trigger = ThresholdTrigger(signal_index=0, level=250.0)
+    capture = TriggeredCapture(trigger, pre_trigger=0.5, post_trigger=2.0, interval=600)
+    for window in process_readings(con.real_time_readings(signals, duration=3600, interval=600), capture):
+        save(window.reading)
+"""
+
+import logging
+import math
+import operator
+from collections import deque
+from typing import Any, Deque, Iterable, Iterator, List, Union
+
+from . import dat_cls as ld
+from .err import LSV2InputException
+
+logger = logging.getLogger("LSV2 Scope Stages")
+
+
+class ScopeStage:
+    """base class for a streaming processing stage.
+    Every call of :py:meth:`process` can return any number of results, :py:meth:`flush` is called
+    once the input is exhausted to return data that is still buffered"""
+
+    def process(self, reading: ld.ScopeReading) -> Iterable[Any]:
+        """process one block of scope readings and return the results"""
+        raise NotImplementedError()
+
+    def flush(self) -> Iterable[Any]:
+        """return results for data which is still buffered at the end of the input"""
+        return []
+
+
+def process_readings(readings: Iterable[ld.ScopeReading], *stages: ScopeStage) -> Iterator[Any]:
+    """
+    Run scope readings through a chain of stages. The results of each stage are used as input of the next one,
+    therefore only the last stage may return something else than :py:class:`~pyLSV2.dat_cls.ScopeReading`.
+
+    :param readings: iterable of scope readings, for example from :py:func:`~pyLSV2.LSV2.real_time_readings`
+    :param stages: stages to run the readings through
+    """
+
+    def run_chain(items: Iterable[Any], first_stage: int) -> Iterator[Any]:
+        for item in items:
+            if first_stage == len(stages):
+                yield item
+            else:
+                yield from run_chain(stages[first_stage].process(item), first_stage + 1)
+
+    yield from run_chain(readings, 0)
+    for i, stage in enumerate(stages):
+        yield from run_chain(stage.flush(), i + 1)
+
+
+def _copy_signal_data(signal_data: ld.ScopeSignalData, values: List[float]) -> ld.ScopeSignalData:
+    """create a new signal data object with the same signal description but different values"""
+    new_data = ld.ScopeSignalData(
+        channel=signal_data.channel,
+        signal=signal_data.signal,
+        offset=signal_data.offset,
+        factor=signal_data.factor,
+        unit=signal_data.unit,
+    )
+    new_data.data = values
+    return new_data
+
+
+class Decimator(ScopeStage):
+    """keep only every n-th sample of each signal. The phase is kept across block boundaries"""
+
+    def __init__(self, factor: int):
+        """
+        :param factor: only every n-th sample is kept
+
+        :raises LSV2InputException: if factor is smaller than 1
+        """
+        if factor < 1:
+            raise LSV2InputException("decimation factor has to be at least 1")
+        self._factor = factor
+        self._skip = 0
+
+    def process(self, reading: ld.ScopeReading) -> Iterable[ld.ScopeReading]:
+        signal_data = reading.get_data()
+        if len(signal_data) == 0:
+            return []
+        samples = len(signal_data[0].data)
+        start = self._skip
+        self._skip = (start - samples) % self._factor
+
+        if start >= samples:
+            return []
+
+        new_reading = ld.ScopeReading(reading.seqence_nr())
+        for data in signal_data:
+            new_reading.add_dataset(_copy_signal_data(data, data.data[start :: self._factor]))
+        return [new_reading]
+
+
+class WindowStatistics(ScopeStage):
+    """calculate minimum, maximum, mean and root mean square of all signals over windows of a fixed number of samples"""
+
+    def __init__(self, window: int):
+        """
+        :param window: number of samples per window
+
+        :raises LSV2InputException: if window is smaller than 1
+        """
+        if window < 1:
+            raise LSV2InputException("window has to contain at least one sample")
+        self._window = window
+        self._buffers: List[List[float]] = []
+        self._signals: List[ld.ScopeSignalData] = []
+        self._window_start = 0
+
+    def process(self, reading: ld.ScopeReading) -> Iterable[ld.ScopeWindowStatistics]:
+        signal_data = reading.get_data()
+        if len(self._buffers) == 0:
+            self._buffers = [[] for _ in signal_data]
+            self._signals = list(signal_data)
+        elif len(self._buffers) != len(signal_data):
+            raise LSV2InputException("number of signals changed between readings")
+
+        for buffer, data in zip(self._buffers, signal_data):
+            buffer.extend(data.data)
+
+        results = []
+        while len(self._buffers[0]) >= self._window:
+            results.append(self._window_statistics(self._window))
+        return results
+
+    def flush(self) -> Iterable[ld.ScopeWindowStatistics]:
+        if len(self._buffers) > 0 and len(self._buffers[0]) > 0:
+            return [self._window_statistics(len(self._buffers[0]))]
+        return []
+
+    def _window_statistics(self, count: int) -> ld.ScopeWindowStatistics:
+        """calculate the statistics for the first count samples of each buffer and remove them"""
+        window = ld.ScopeWindowStatistics(self._window_start, count)
+        for buffer, signal in zip(self._buffers, self._signals):
+            values = buffer[:count]
+            del buffer[:count]
+            # work on the raw values and scale the results afterwards
+            factor = signal.factor
+            offset = signal.offset
+            raw_min = min(values)
+            raw_max = max(values)
+            raw_mean = math.fsum(values) / count
+            raw_mean_square = math.fsum(map(operator.mul, values, values)) / count
+            mean_square = factor * factor * raw_mean_square + 2 * factor * offset * raw_mean + offset * offset
+            if factor >= 0:
+                minimum, maximum = raw_min * factor + offset, raw_max * factor + offset
+            else:
+                minimum, maximum = raw_max * factor + offset, raw_min * factor + offset
+            window.add_statistics(
+                ld.ScopeSignalStatistics(
+                    channel=signal.channel,
+                    signal=signal.signal,
+                    unit=signal.unit,
+                    minimum=minimum,
+                    maximum=maximum,
+                    mean=raw_mean * factor + offset,
+                    rms=math.sqrt(max(mean_square, 0.0)),
+                )
+            )
+        self._window_start += count
+        return window
+
+
+class ThresholdTrigger(ScopeStage):
+    """report each crossing of a threshold by one of the signals"""
+
+    def __init__(self, signal_index: int, level: float, rising: bool = True, falling: bool = False):
+        """
+        :param signal_index: position of the signal in the list of recorded signals
+        :param level: threshold in scaled units of the signal
+        :param rising: report crossings from below to above the level
+        :param falling: report crossings from above to below the level
+
+        :raises LSV2InputException: if neither rising nor falling crossings should be reported
+        """
+        if not (rising or falling):
+            raise LSV2InputException("at least one direction has to be selected for the trigger")
+        self._signal_index = signal_index
+        self._level = level
+        self._rising = rising
+        self._falling = falling
+        self._last_value = None
+        self._sample_counter = 0
+
+    @property
+    def signal_index(self) -> int:
+        """position of the signal in the list of recorded signals"""
+        return self._signal_index
+
+    def process(self, reading: ld.ScopeReading) -> Iterable[ld.ScopeTriggerEvent]:
+        signal_data = reading.get_data()
+        if self._signal_index >= len(signal_data):
+            raise LSV2InputException("trigger signal %d is not part of the reading" % self._signal_index)
+
+        values = signal_data[self._signal_index].scaled_data()
+        first_sample = self._sample_counter
+        self._sample_counter += len(values)
+        if len(values) == 0:
+            return []
+
+        if self._last_value is None:
+            previous = values[:1] + values[:-1]
+        else:
+            previous = [self._last_value] + values[:-1]
+        self._last_value = values[-1]
+
+        level = self._level
+        events = []
+        if self._rising:
+            events.extend(
+                ld.ScopeTriggerEvent(first_sample + i, self._signal_index, new, True)
+                for i, (old, new) in enumerate(zip(previous, values))
+                if old < level <= new
+            )
+        if self._falling:
+            events.extend(
+                ld.ScopeTriggerEvent(first_sample + i, self._signal_index, new, False)
+                for i, (old, new) in enumerate(zip(previous, values))
+                if old >= level > new
+            )
+        events.sort(key=lambda event: event.sample)
+        return events
+
+
+class ChangeTrigger(ScopeStage):
+    """report each change of the value of a signal. Meant for signals of PLC memory like markers which were
+    added to the scope recording, see :py:meth:`~pyLSV2.dat_cls.ScopeSignal.needs_parameter`"""
+
+    def __init__(self, signal_index: int):
+        """
+        :param signal_index: position of the signal in the list of recorded signals
+        """
+        self._signal_index = signal_index
+        self._last_value = None
+        self._sample_counter = 0
+
+    @property
+    def signal_index(self) -> int:
+        """position of the signal in the list of recorded signals"""
+        return self._signal_index
+
+    def process(self, reading: ld.ScopeReading) -> Iterable[ld.ScopeTriggerEvent]:
+        signal_data = reading.get_data()
+        if self._signal_index >= len(signal_data):
+            raise LSV2InputException("trigger signal %d is not part of the reading" % self._signal_index)
+
+        values = signal_data[self._signal_index].scaled_data()
+        first_sample = self._sample_counter
+        self._sample_counter += len(values)
+        if len(values) == 0:
+            return []
+
+        if self._last_value is None:
+            previous = values[:1] + values[:-1]
+        else:
+            previous = [self._last_value] + values[:-1]
+        self._last_value = values[-1]
+
+        return [
+            ld.ScopeTriggerEvent(first_sample + i, self._signal_index, new, new > old)
+            for i, (old, new) in enumerate(zip(previous, values))
+            if old != new
+        ]
+
+
+class TriggeredCapture(ScopeStage):
+    """keep a bounded ring buffer of the most recent samples and only return a window of data around each
+    trigger event. Trigger events which occur while a window is still being recorded are part of that window
+    and do not open a new one."""
+
+    def __init__(
+        self,
+        trigger: Union[ThresholdTrigger, ChangeTrigger],
+        pre_trigger: float,
+        post_trigger: float,
+        interval: int,
+    ):
+        """
+        :param trigger: stage which detects the trigger events
+        :param pre_trigger: number of seconds of data to keep before the trigger event
+        :param post_trigger: number of seconds of data to keep after the trigger event, including the trigger sample
+        :param interval: interval in µs between readings, has to match the interval used for recording
+
+        :raises LSV2InputException: if the durations or the interval are invalid
+        """
+        if pre_trigger < 0 or post_trigger < 0:
+            raise LSV2InputException("pre and post trigger durations can not be negative")
+        if interval <= 0:
+            raise LSV2InputException("interval has to be greater than 0")
+        self._trigger = trigger
+        self._pre_samples = int(round(pre_trigger * 1000000 / interval))
+        self._post_samples = max(1, int(round(post_trigger * 1000000 / interval)))
+        self._ring: List[Deque[float]] = []
+        self._signals: List[ld.ScopeSignalData] = []
+        self._sample_counter = 0
+        self._sequence_nr = 0
+
+        self._open_event: Union[ld.ScopeTriggerEvent, None] = None
+        self._open_start = 0
+        self._open_end = 0
+        self._open_data: List[List[float]] = []
+
+    @property
+    def pre_samples(self) -> int:
+        """number of samples kept before the trigger event"""
+        return self._pre_samples
+
+    @property
+    def post_samples(self) -> int:
+        """number of samples kept after the trigger event, including the trigger sample"""
+        return self._post_samples
+
+    def process(self, reading: ld.ScopeReading) -> Iterable[ld.ScopeTriggerWindow]:
+        signal_data = reading.get_data()
+        if len(self._ring) == 0:
+            self._ring = [deque(maxlen=self._pre_samples) for _ in signal_data]
+            self._signals = list(signal_data)
+        elif len(self._ring) != len(signal_data):
+            raise LSV2InputException("number of signals changed between readings")
+
+        block_start = self._sample_counter
+        block_length = len(signal_data[0].data) if len(signal_data) > 0 else 0
+        windows = []
+        position = 0
+
+        events = list(self._trigger.process(reading))
+        while True:
+            if self._open_event is not None:
+                stop = min(self._open_end - block_start, block_length)
+                for collected, data in zip(self._open_data, signal_data):
+                    collected.extend(data.data[position:stop])
+                position = max(position, stop)
+                if block_start + position < self._open_end:
+                    # window is still incomplete, continue with the next block
+                    break
+                windows.append(self._close_window())
+
+            events = [e for e in events if e.sample >= block_start + position]
+            if len(events) == 0:
+                break
+
+            event = events.pop(0)
+            offset = event.sample - block_start
+            self._open_event = event
+            self._open_data = []
+            for ring, data in zip(self._ring, signal_data):
+                history = list(ring) + data.data[:offset]
+                if self._pre_samples > 0:
+                    self._open_data.append(history[-self._pre_samples :])
+                else:
+                    self._open_data.append([])
+            self._open_start = event.sample - len(self._open_data[0])
+            self._open_end = event.sample + self._post_samples
+            position = offset
+            logger.debug("trigger event at sample %d, open window", event.sample)
+
+        for ring, data in zip(self._ring, signal_data):
+            ring.extend(data.data)
+        self._sample_counter += block_length
+        return windows
+
+    def flush(self) -> Iterable[ld.ScopeTriggerWindow]:
+        if self._open_event is not None:
+            logger.debug("recording ended before window was complete")
+            return [self._close_window()]
+        return []
+
+    def _close_window(self) -> ld.ScopeTriggerWindow:
+        """create the result object for the window that is currently open"""
+        new_reading = ld.ScopeReading(self._sequence_nr)
+        self._sequence_nr += 1
+        for signal, collected in zip(self._signals, self._open_data):
+            new_reading.add_dataset(_copy_signal_data(signal, collected))
+        window = ld.ScopeTriggerWindow(self._open_event, self._open_start, new_reading)
+        self._open_event = None
+        self._open_data = []
+        return window
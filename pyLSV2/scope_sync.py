@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""synchronised recording of scope signals on several controls at once"""
+
+import heapq
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple, Union
+
+from . import dat_cls as ld
+from .client import LSV2
+from .err import LSV2StateException
+
+logger = logging.getLogger("LSV2 Scope Sync")
+
+
+class SyncedScopeCapture:
+    """Record scope signals on several controls in parallel and merge the readings into one time ordered stream.
+
+    Each connection is read by its own thread via :py:func:`~pyLSV2.LSV2.real_time_readings`. The blocks
+    are placed on a shared monotonic timebase which starts with the capture. The timestamp of a block is derived
+    from the local arrival time of the first block and the number of samples received since, this way jitter
+    in the network does not show up in the sample times.
+
+    The data of the controls is not time aligned beyond that: the recordings are started at the same moment,
+    but the error of the timestamps is the network latency plus the length of one block and the sample clocks
+    of the controls may drift apart during long recordings. The offset of the clock on each control is read via
+    :py:func:`~pyLSV2.LSV2.get_remote_datetime` and attached to every reading for information only. It is not
+    applied to the timestamps since the control only reports full seconds.
+
+    If the iteration is stopped early, the recording threads are stopped as well. Each source has a bounded
+    queue, a source which is far ahead of the others waits until the blocks were consumed.
+
+    .. code-block:: python
+
+        with pyLSV2.LSV2("machine_a", safe_mode=False) as con_a, pyLSV2.LSV2("machine_b", safe_mode=False) as con_b:
+            capture = SyncedScopeCapture({"a": con_a, "b": con_b}, {"a": signals_a, "b": signals_b}, 10, 3000)
+            for synced_reading in capture.readings():
+                print(synced_reading)
+    """
+
+    QUEUE_SIZE = 64
+    # number of blocks buffered for each source
+
+    def __init__(
+        self,
+        connections: Dict[str, LSV2],
+        signals: Dict[str, List[ld.ScopeSignal]],
+        duration: int,
+        interval: int,
+    ):
+        """
+        :param connections: dictionary of connected :py:class:`~pyLSV2.LSV2` objects, key is used as name of the source
+        :param signals: dictionary with the list of :py:class:`~pyLSV2.dat_cls.ScopeSignal` to record for each source
+        :param duration: number of seconds for which data should be read
+        :param interval: interval in µs between readings
+
+        :raises LSV2StateException: if the signal selection does not match the connections
+        """
+        if len(connections) == 0:
+            raise LSV2StateException("at least one connection is required")
+        if set(connections.keys()) != set(signals.keys()):
+            raise LSV2StateException("signal selection does not match the list of connections")
+
+        self._connections = connections
+        self._signals = signals
+        self._duration = duration
+        self._interval = interval
+        self._clock_offsets: Dict[str, float] = {}
+        self._start_time = 0.0
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def clock_offsets(self) -> Dict[str, float]:
+        """coarse offset in seconds between the clock of each control and the local clock.
+        Only available after the capture was started, it is not applied to the timestamps"""
+        return dict(self._clock_offsets)
+
+    @property
+    def start_time(self) -> datetime:
+        """local time at which the shared timebase starts"""
+        return datetime.fromtimestamp(self._start_time)
+
+    def _measure_clock_offsets(self):
+        """read the time of each control and compare it to the local clock"""
+        for name, con in self._connections.items():
+            local_before = time.time()
+            remote_time = con.get_remote_datetime()
+            local_after = time.time()
+            if remote_time.timestamp() == 0:
+                logger.warning("could not read time of control '%s', assume clocks are in sync", name)
+                self._clock_offsets[name] = 0.0
+            else:
+                self._clock_offsets[name] = remote_time.timestamp() - (local_before + local_after) / 2
+            logger.debug("clock offset of control '%s' is %.1f s", name, self._clock_offsets[name])
+
+    def _put(self, out_queue: queue.Queue, item) -> bool:
+        """put an item in a bounded queue, gives up if the capture was stopped"""
+        while not self._stop.is_set():
+            try:
+                out_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _record(self, name: str, barrier: threading.Barrier, start: float, out_queue: queue.Queue):
+        """worker function which reads the scope data of one connection and pushes timestamped blocks to the queue"""
+        step = self._interval / 1000000
+        try:
+            barrier.wait()
+            sample_counter = 0
+            first_sample = None
+            for reading in self._connections[name].real_time_readings(self._signals[name], self._duration, self._interval):
+                signal_data = reading.get_data()
+                samples_in_block = len(signal_data[0].data) if len(signal_data) > 0 else 0
+                if first_sample is None:
+                    # the first block arrives once it is full, so its first sample was taken one block length earlier
+                    first_sample = time.monotonic() - start - samples_in_block * step
+                if not self._put(out_queue, (first_sample + sample_counter * step, reading)):
+                    logger.debug("recording of scope data on '%s' was stopped", name)
+                    break
+                sample_counter += samples_in_block
+        except Exception as ex:
+            logger.error("recording of scope data on '%s' failed: %s", name, ex)
+            self._put(out_queue, ex)
+        finally:
+            self._put(out_queue, None)
+
+    def close(self):
+        """stop the recording threads, called automatically if the iteration over :py:meth:`readings` ends"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def readings(self) -> Iterator[ld.SyncedScopeReading]:
+        """
+        Start recording on all connections and yield the readings of all sources ordered by their timestamp.
+        A block is only released once every other active source has delivered a block that is at least as new,
+        so the output is strictly time ordered even if one of the controls lags behind.
+
+        :raises Exception: the first exception raised while recording on any of the connections
+        """
+        self._measure_clock_offsets()
+
+        queues: Dict[str, queue.Queue] = {name: queue.Queue(maxsize=self.QUEUE_SIZE) for name in self._connections}
+        barrier = threading.Barrier(len(self._connections) + 1)
+        self._stop.clear()
+        self._start_time = time.time()
+        start = time.monotonic()
+
+        for name in self._connections:
+            thread = threading.Thread(
+                target=self._record,
+                args=(name, barrier, start, queues[name]),
+                name="scope_%s" % name,
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+        barrier.wait()
+
+        heap: List[Tuple[float, int, str, ld.ScopeReading]] = []
+        order = 0
+        error: Union[Exception, None] = None
+
+        def fetch(source: str) -> bool:
+            nonlocal order, error
+            item = queues[source].get()
+            if item is None:
+                return False
+            if isinstance(item, Exception):
+                if error is None:
+                    error = item
+                # drain until the end marker of this source
+                while queues[source].get() is not None:
+                    pass
+                return False
+            heapq.heappush(heap, (item[0], order, source, item[1]))
+            order += 1
+            return True
+
+        try:
+            for name in self._connections:
+                fetch(name)
+
+            while len(heap) > 0:
+                timestamp, _, source, reading = heapq.heappop(heap)
+                yield ld.SyncedScopeReading(source, timestamp, self._interval, reading, self._clock_offsets[source])
+                # refill from the source that was just consumed to keep one block per active source in the heap
+                fetch(source)
+        finally:
+            self.close()
+
+        logger.debug("finished synchronised recording of scope data")
+        if error is not None:
+            raise error
@@ -6,6 +6,7 @@ the command line.
 
 import os
 import sys
+import getpass
 import logging
 import argparse
 import re
@@ -64,6 +65,12 @@ def main():
         action="store_true",
         default=False,
     )
+    parser.add_argument(
+        "--accept-unknown-host",
+        help="connect via ssh even if the host key of the control is not in the known hosts file",
+        action="store_true",
+        default=False,
+    )
     args = parser.parse_args()
 
     logging.basicConfig(level=args.loglevel)
@@ -135,17 +142,26 @@ def main():
         dest_path = args.destination
         logger.info("Destination path %s is local", os.path.abspath(dest_path))
 
+    transport = None
     if use_ssh:
-        import sshtunnel
-
-        ssh_forwarder = sshtunnel.SSHTunnelForwarder(host_machine, remote_bind_address=("127.0.0.1", host_port))
-        ssh_forwarder.start()
-        host_machine = "127.0.0.1"
-        host_port = ssh_forwarder.local_bind_port
-        logger.info("SSH tunnel established. local port is %d", host_port)
+        # telegrams are sent through a ssh channel directly, the keys are taken from the ssh agent or ~/.ssh.
+        # the host key has to be in the known hosts file unless unknown hosts are accepted explicitly
+        host_key_policy = None
+        if args.accept_unknown_host:
+            import paramiko
+
+            host_key_policy = paramiko.WarningPolicy()
+        transport = pyLSV2.LSV2SSH(
+            host_machine,
+            port=host_port,
+            timeout=args.timeout,
+            username=getpass.getuser(),
+            host_key_policy=host_key_policy,
+        )
+        logger.info("Use SSH channel to %s", host_machine)
 
     try:
-        con = pyLSV2.LSV2(hostname=host_machine, port=host_port, timeout=args.timeout)
+        con = pyLSV2.LSV2(hostname=host_machine, port=host_port, timeout=args.timeout, transport=transport)
         con.connect()
     except socket.gaierror as ex:
         logger.error("An Exception occurred: '%s'", ex)
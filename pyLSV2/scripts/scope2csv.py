@@ -1,20 +1,166 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-"""With this script you can read scope values from a iTNC control and save the data as a csv file"""
+"""With this script you can read scope values from a iTNC control and save the data as a csv file
+or one of the other supported formats"""
 
 import sys
+import time
 import logging
 import argparse
+from collections import Counter
 from csv import writer as csv_writer
 from pathlib import Path
+from typing import List
 
 import pyLSV2
+from pyLSV2 import misc_scope as lms
 
 __author__ = "Md-aliy7 & drunsinn"
 __license__ = "MIT"
-__version__ = "1.0"
+__version__ = "1.1"
 __email__ = "dr.unsinn@googlemail.com"
 
+#: number of blocks collected before they are written to the output file
+CHUNK_SIZE = 64
+
+#: size of the write buffer for output files
+WRITE_BUFFER = 1024 * 1024
+
+FILE_SUFFIXES = {
+    ".csv": "csv",
+    ".bin": "bin",
+    ".lsv2scope": "bin",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".h5": "hdf5",
+    ".hdf5": "hdf5",
+}
+
+
+class CsvExporter:
+    """write scaled values as csv file, one row per sample"""
+
+    def __init__(self, path: Path, signals: List[pyLSV2.ScopeSignal], interval: int):
+        self.path = path
+        self._fp = open(path, "w", encoding="utf8", buffering=WRITE_BUFFER)
+        self._csv = csv_writer(self._fp, dialect="excel", lineterminator="\n")
+        self._csv.writerow([s.normalized_name() for s in signals])
+
+    def write(self, readings: List[pyLSV2.ScopeReading]):
+        for reading in readings:
+            self._csv.writerows(zip(*[signal.scaled_data() for signal in reading.get_data()]))
+
+    def close(self):
+        self._fp.close()
+
+
+class BinaryExporter:
+    """write raw values in the binary scope stream format of pyLSV2, see :py:func:`pyLSV2.misc_scope.encode_scope_stream_header`"""
+
+    def __init__(self, path: Path, signals: List[pyLSV2.ScopeSignal], interval: int):
+        self.path = path
+        self._fp = open(path, "wb", buffering=WRITE_BUFFER)
+        self._fp.write(lms.encode_scope_stream_header(signals, interval))
+
+    def write(self, readings: List[pyLSV2.ScopeReading]):
+        self._fp.write(b"".join(lms.encode_scope_block(reading) for reading in readings))
+
+    def close(self):
+        self._fp.close()
+
+
+class ArrowExporter:
+    """write scaled values as parquet or arrow file, requires pyarrow"""
+
+    def __init__(self, path: Path, signals: List[pyLSV2.ScopeSignal], interval: int, parquet: bool = True):
+        import pyarrow
+
+        self.path = path
+        self._pa = pyarrow
+        self._names = [s.normalized_name() for s in signals]
+        self._schema = pyarrow.schema([(name, pyarrow.float64()) for name in self._names])
+        if parquet:
+            import pyarrow.parquet
+
+            self._writer = pyarrow.parquet.ParquetWriter(str(path), self._schema)
+        else:
+            import pyarrow.ipc
+
+            self._writer = pyarrow.ipc.new_file(str(path), self._schema)
+
+    def write(self, readings: List[pyLSV2.ScopeReading]):
+        columns: List[List[float]] = [[] for _ in self._names]
+        for reading in readings:
+            for column, signal in zip(columns, reading.get_data()):
+                column.extend(signal.scaled_data())
+        self._writer.write_table(self._pa.table(columns, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+class Hdf5Exporter:
+    """write scaled values as one dataset per signal to a hdf5 file, requires h5py"""
+
+    def __init__(self, path: Path, signals: List[pyLSV2.ScopeSignal], interval: int):
+        import h5py
+
+        self.path = path
+        self._file = h5py.File(str(path), "w")
+        self._file.attrs["interval_us"] = interval
+        self._datasets = []
+        for signal in signals:
+            dataset = self._file.create_dataset(signal.normalized_name(), shape=(0,), maxshape=(None,), dtype="f8", chunks=True)
+            dataset.attrs["unit"] = signal.unit
+            self._datasets.append(dataset)
+
+    def write(self, readings: List[pyLSV2.ScopeReading]):
+        for i, dataset in enumerate(self._datasets):
+            values: List[float] = []
+            for reading in readings:
+                values.extend(reading.get_data()[i].scaled_data())
+            start = dataset.shape[0]
+            dataset.resize((start + len(values),))
+            dataset[start:] = values
+
+    def close(self):
+        self._file.close()
+
+
+def count_dropped_packages(sequence_steps: Counter) -> int:
+    """estimate the number of dropped packages from the differences between consecutive sequence numbers.
+    The control does not report by how much the sequence number increases per package, so the most common
+    difference is taken as the regular step and every larger difference counts as dropped packages"""
+    if len(sequence_steps) == 0:
+        return 0
+    regular_step = max(sequence_steps.most_common(1)[0][0], 1)
+    irregular = [step for step in sequence_steps if step % regular_step != 0 or step <= 0]
+    if len(irregular) > 0:
+        logging.warning(
+            "sequence numbers did not increase by a multiple of %d for all packages (%s), the number of dropped packages might be wrong",
+            regular_step,
+            ", ".join(str(step) for step in sorted(irregular)),
+        )
+    return sum((step // regular_step - 1) * count for step, count in sequence_steps.items() if step > regular_step)
+
+
+def create_exporter(file_format: str, path: Path, signals: List[pyLSV2.ScopeSignal], interval: int):
+    """create the exporter for the selected format, falls back to csv if the necessary library is not installed"""
+    try:
+        if file_format == "bin":
+            return BinaryExporter(path, signals, interval)
+        if file_format == "parquet":
+            return ArrowExporter(path, signals, interval, parquet=True)
+        if file_format == "arrow":
+            return ArrowExporter(path, signals, interval, parquet=False)
+        if file_format == "hdf5":
+            return Hdf5Exporter(path, signals, interval)
+    except ImportError as ex:
+        path = path.with_suffix(".csv")
+        logging.warning("format %s is not available (%s), write csv file %s instead", file_format, ex, path)
+    return CsvExporter(path, signals, interval)
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -25,7 +171,7 @@ def main():
 
     parser.add_argument("host", help="ip or hostname of control", type=str)
 
-    parser.add_argument("output", help="path of the csv file the data should be written to", type=Path)
+    parser.add_argument("output", help="path of the file the data should be written to", type=Path)
 
     parser.add_argument(
         "signals",
@@ -44,6 +190,15 @@ def main():
         default=21000,
     )
 
+    parser.add_argument(
+        "-f",
+        "--format",
+        help="format of the output file, default is derived from the file suffix and falls back to csv",
+        choices=sorted(set(FILE_SUFFIXES.values())),
+        dest="file_format",
+        default=None,
+    )
+
     parser.add_argument(
         "-d",
         "--debug",
@@ -105,6 +260,10 @@ def main():
         logging.error("the selected interval has to be at least greater than 0: %d", args.interval)
         sys.exit(-3)
 
+    file_format = args.file_format
+    if file_format is None:
+        file_format = FILE_SUFFIXES.get(args.output.suffix.lower(), "csv")
+
     with pyLSV2.LSV2(args.host, port=19000, timeout=args.timeout, safe_mode=False) as con:
         availible_signals = con.read_scope_signals()
 
@@ -126,29 +285,44 @@ def main():
             )
             scope_signals.append(new_signal)
 
-        with open(args.output, "w", encoding="utf8") as csv_fp:
-            csv = csv_writer(csv_fp, dialect="excel", lineterminator="\n")
-            csv.writerow(list(map(lambda x: x.normalized_name(), scope_signals)))
-            readings_counter = 0
+        exporter = None
+        chunk: List[pyLSV2.ScopeReading] = []
+        readings_counter = 0
+        packages_counter = 0
+        last_sequence_nr = None
+        sequence_steps: Counter = Counter()
 
+        start = time.time()
+        try:
             for package in con.real_time_readings(scope_signals, args.duration, args.interval):
-                signal_readings = package.get_data()
-                readings_per_signal = len(signal_readings[0].data)
-                logging.debug(
-                    "successfulle read %d signals with %d values each",
-                    len(signal_readings),
-                    readings_per_signal,
-                )
-
-                for i in range(readings_per_signal):
-                    row = []
-                    for signal in signal_readings:
-                        value = (signal.data[i] * signal.factor) + signal.offset
-                        row.append(value)
-                    csv.writerow(row)
-                    readings_counter += 1
-
-        logging.info("finished reading data, data was saved to %s", args.output.absolute())
+                if exporter is None:
+                    # factor, offset and unit of the signals are only known after the recording was started
+                    exporter = create_exporter(file_format, args.output, scope_signals, args.interval)
+
+                sequence_nr = package.seqence_nr()
+                if last_sequence_nr is not None:
+                    sequence_steps[sequence_nr - last_sequence_nr] += 1
+                last_sequence_nr = sequence_nr
+
+                packages_counter += 1
+                readings_counter += len(package.get_data()[0].data)
+                chunk.append(package)
+                if len(chunk) >= CHUNK_SIZE:
+                    exporter.write(chunk)
+                    chunk = []
+
+            if exporter is None:
+                # no package was received, still write a file with the header
+                exporter = create_exporter(file_format, args.output, scope_signals, args.interval)
+            elif len(chunk) > 0:
+                exporter.write(chunk)
+        finally:
+            if exporter is not None:
+                exporter.close()
+        elapsed = time.time() - start
+        dropped_packages = count_dropped_packages(sequence_steps)
+
+        logging.info("finished reading data, data was saved to %s", exporter.path.absolute())
         logging.debug("number of recorded data points %d", readings_counter)
 
         for s in scope_signals:
@@ -158,6 +332,19 @@ def main():
                 s.unit,
             )
 
+    expected_rate = 1000000 / args.interval
+    achieved_rate = readings_counter / elapsed if elapsed > 0 else 0.0
+    logging.info(
+        "recorded %d samples in %d packages during %.1f s: %.1f samples/s of %.1f expected",
+        readings_counter,
+        packages_counter,
+        elapsed,
+        achieved_rate,
+        expected_rate,
+    )
+    if dropped_packages > 0:
+        logging.warning("%d packages were dropped during the recording", dropped_packages)
+
     sys.exit(0)
 
 
@@ -3,18 +3,125 @@
 """script to convert table files to csv"""
 
 import argparse
+import glob
 import logging
+import os
 import pathlib
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Tuple, Union
 
 from pyLSV2 import NCTable
 
 
+def is_table_file(path: pathlib.Path) -> bool:
+    """check if the file starts with the header used by table files"""
+    try:
+        with path.open("rb") as tfp:
+            return tfp.read(6) == b"BEGIN "
+    except OSError:
+        return False
+
+
+def collect_sources(sources: List[str], recursive: bool) -> Tuple[List[pathlib.Path], List[str]]:
+    """resolve files, directories and glob patterns to a list of table files.
+    Returns the list of table files and the list of sources which did not match anything"""
+    table_files = []
+    missing = []
+    for source in sources:
+        source_path = pathlib.Path(source)
+        if source_path.is_file():
+            candidates = [source_path]
+        elif source_path.is_dir():
+            pattern = "**/*" if recursive else "*"
+            candidates = [p for p in sorted(source_path.glob(pattern)) if p.is_file() and is_table_file(p)]
+        else:
+            candidates = [pathlib.Path(p) for p in sorted(glob.glob(source, recursive=recursive))]
+            candidates = [p for p in candidates if p.is_file() and is_table_file(p)]
+        if len(candidates) == 0:
+            missing.append(source)
+        table_files.extend(candidates)
+    return list(dict.fromkeys(table_files)), missing
+
+
+def csv_targets(table_files: List[pathlib.Path], output: Union[pathlib.Path, None]) -> List[pathlib.Path]:
+    """determine the csv file for each table file. The suffix of the table is replaced by .csv, if several
+    tables would be written to the same file, for example TOOL.T and TOOL.TCH, the suffix is kept in the name
+    of those files. If an output directory is given, the directory structure below the common parent of all
+    table files is rebuilt there"""
+    base = None
+    if output is not None:
+        try:
+            base = pathlib.Path(os.path.commonpath([p.parent.resolve() for p in table_files]))
+        except ValueError:
+            # no common parent, for example files on different drives
+            base = None
+
+    def target(table_file: pathlib.Path, csv_name: str) -> pathlib.Path:
+        if output is None:
+            return table_file.with_name(csv_name)
+        if base is None:
+            return output.joinpath(csv_name)
+        return output.joinpath(table_file.parent.resolve().relative_to(base), csv_name)
+
+    targets = [target(p, p.with_suffix(".csv").name) for p in table_files]
+    keys = [os.path.normcase(str(t.resolve())) for t in targets]
+    for i, table_file in enumerate(table_files):
+        if keys.count(keys[i]) > 1:
+            targets[i] = target(table_file, table_file.name.replace(".", "_") + ".csv")
+    return targets
+
+
+def find_collisions(table_files: List[pathlib.Path], targets: List[pathlib.Path]) -> List[Tuple[pathlib.Path, pathlib.Path]]:
+    """find table files which would be written to the same csv file as a previous table file"""
+    used = {}
+    collisions = []
+    for table_file, target in zip(table_files, targets):
+        key = os.path.normcase(str(target.resolve()))
+        if key in used:
+            collisions.append((used[key], table_file))
+        else:
+            used[key] = table_file
+    return collisions
+
+
+def convert_table(source: pathlib.Path, target: pathlib.Path, decimal_char: str) -> Tuple[pathlib.Path, int, Union[str, None], str]:
+    """convert one table file, returns the source, the number of rows, an error message if the conversion failed
+    and a description of the table"""
+    try:
+        with source.open("rb") as tfp:
+            table_head = NCTable._read_table_head(tfp)[0]
+        if table_head.has_unit:
+            unit = "metric" if table_head.is_metric else "imperial"
+        else:
+            unit = "no apparent unit system"
+        description = "columns %s, %s" % (table_head.column_names, unit)
+        return source, NCTable.convert_to_csv(source, target, decimal_char), None, description
+    except Exception as ex:  # report the error but keep converting the remaining files
+        return source, 0, "%s: %s" % (type(ex).__name__, ex), ""
+
+
 def main():
-    """console application to convert a tnc table file to a csv file"""
+    """console application to convert tnc table files to csv files"""
     parser = argparse.ArgumentParser(description="command line script parsing table files")
-    parser.add_argument("source", help="table file to parse", type=pathlib.Path)
+    parser.add_argument("source", help="table files, directories or glob patterns to parse", nargs="+", type=str)
     parser.add_argument("--decimal_char", help="override local decimal char", type=str, default=",")
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="directory for the csv files, default is next to the table file. Subdirectories are kept",
+        type=pathlib.Path,
+        default=None,
+    )
+    parser.add_argument("-r", "--recursive", help="search directories and glob patterns recursively", action="store_true")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="number of parallel processes, default is the number of cpus",
+        type=int,
+        default=os.cpu_count() or 1,
+    )
     log_group = parser.add_mutually_exclusive_group()
     log_group.add_argument(
         "-d",
@@ -33,33 +140,60 @@ def main():
         dest="loglevel",
         const=logging.INFO,
     )
-    args = parser.parse_args()
+    args = parser.parse_intermixed_args()
 
     logging.basicConfig(level=args.loglevel)
     logging.debug('Start logging with level "%s"', logging.getLevelName(args.loglevel))
 
-    if args.source.is_file():
-        nc_table = NCTable.parse_table(args.source)
-        print("number of rows in table: %d" % len(nc_table))
-        print("columns in table %s" % nc_table.column_names)
-        if nc_table.has_unit:
-            print("table file specifies unit system")
-            if nc_table.is_metric:
-                print("values are metric")
-            else:
-                print("values are imperial")
-        else:
-            print("table has no apparent unit system")
+    table_files, missing = collect_sources(args.source, args.recursive)
+    for source in missing:
+        print("table file does not exits %s" % source)
+    if len(table_files) == 0:
+        sys.exit(-1)
+
+    targets = csv_targets(table_files, args.output)
+    collisions = find_collisions(table_files, targets)
+    for first, second in collisions:
+        print("%s and %s would be written to the same csv file" % (first, second))
+    if len(collisions) > 0:
+        sys.exit(-1)
+
+    jobs = []
+    for table_file, csv_file_name in zip(table_files, targets):
+        csv_file_name.parent.mkdir(parents=True, exist_ok=True)
+        logging.info("write table %s to file %s", table_file, csv_file_name)
+        jobs.append((table_file, csv_file_name, args.decimal_char))
 
-        csv_file_name = args.source.with_suffix(".csv")
-        print("write table to file %s" % csv_file_name)
-        nc_table.dump_csv(csv_file_name, args.decimal_char)
-        print("csv export finished")
+    total_rows = 0
+    failed = 0
+    start = time.time()
 
+    if args.jobs <= 1 or len(jobs) == 1:
+        results = (convert_table(*job) for job in jobs)
+        executor = None
     else:
-        print("table file does not exits %s" % args.source)
-        sys.exit(-1)
+        executor = ProcessPoolExecutor(max_workers=min(args.jobs, len(jobs)))
+        results = (future.result() for future in as_completed([executor.submit(convert_table, *job) for job in jobs]))
 
+    try:
+        for source, row_count, error, description in results:
+            if error is None:
+                total_rows += row_count
+                print("%s: %d rows" % (source, row_count))
+                logging.info("%s: %s", source, description)
+            else:
+                failed += 1
+                print("%s: conversion failed, %s" % (source, error))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    elapsed = time.time() - start
+    rate = total_rows / elapsed if elapsed > 0 else 0.0
+    print("converted %d of %d files with %d rows in %.2f s, %.0f rows/s" % (len(jobs) - failed, len(jobs), total_rows, elapsed, rate))
+
+    if failed > 0 or len(missing) > 0:
+        sys.exit(-1)
     sys.exit(0)
 
 
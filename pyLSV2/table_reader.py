@@ -2,12 +2,158 @@
 # -*- coding: utf-8 -*-
 """module with reader and writer for TNC tables"""
 
+import bisect
 import csv
 import json
 import logging
+import math
 import pathlib
 import re
-from typing import Union, Dict, Any
+import struct
+import sys
+from array import array
+from collections.abc import MutableMapping
+from typing import Union, Dict, Any, Iterable, Iterator, BinaryIO, Callable, List, Tuple
+
+#: pattern for finding the column names and their position in the column definition line
+_COLUMN_PATTERN = re.compile(r"([A-Za-z-\d_:\.]+)(?:\s+)")
+
+#: number of rows which are collected before they are added to the table while parsing
+_PARSE_CHUNK_SIZE = 1024
+
+#: number of rows which are formatted before they are written to the file
+_WRITE_CHUNK_SIZE = 1024
+
+#: size of the write buffer for csv files
+_CSV_WRITE_BUFFER = 1024 * 1024
+
+#: cell values which are treated as empty when columns are converted to numbers
+_NULL_VALUES = frozenset(["", "-"])
+
+#: pattern for cell values with decimal places which are localized in csv files
+_FLOAT_PATTERN = re.compile(r"^[+-]?\d+\.\d+$")
+
+
+def _decode_line(line: bytes) -> str:
+    """decode a line of a table file and normalize the line ending"""
+    line = line.decode("latin1")
+    if line.endswith("\r\n"):
+        return line[:-2] + "\n"
+    return line
+
+
+def _intern(value):
+    """intern strings so repeated cell values share one object"""
+    if isinstance(value, (str,)):
+        return sys.intern(value)
+    return value
+
+
+class NCTableRow(MutableMapping):
+    """view on one row of a :py:class:`NCTable` with columnar storage. Behaves like the dictionary used for
+    rows in the default storage mode, changes are written directly to the table"""
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "NCTable", index: int):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key: str) -> str:
+        value = self._table._column_data[key][self._index]
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: str):
+        if key not in self._table._column_data:
+            raise KeyError("column %s is not part of this table" % key)
+        self._table._column_data[key][self._index] = _intern(value)
+        self._table.clear_indexes()
+
+    def __delitem__(self, key: str):
+        self._table._column_data[key][self._index] = None
+        self._table.clear_indexes()
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self._table.column_names:
+            if self._table._column_data[name][self._index] is not None:
+                yield name
+
+    def __len__(self) -> int:
+        return len(list(iter(self)))
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class NCTableDiff:
+    """differences between two versions of a :py:class:`NCTable`, rows are matched by the value of a key column.
+    Created by :py:meth:`NCTable.diff` and applied with :py:meth:`NCTable.patch`"""
+
+    def __init__(self, key_column: str):
+        self._key_column = key_column
+        self._added_rows: Dict[str, Dict[str, str]] = {}
+        self._removed_rows: Dict[str, Dict[str, str]] = {}
+        self._changed_cells: Dict[str, Dict[str, Tuple[Union[str, None], Union[str, None]]]] = {}
+        self._added_columns: Dict[str, dict] = {}
+        self._removed_columns: List[str] = []
+
+    @property
+    def key_column(self) -> str:
+        """name of the column used to match the rows of both tables"""
+        return self._key_column
+
+    @property
+    def added_rows(self) -> Dict[str, Dict[str, str]]:
+        """rows which only exist in the new table, key is the value of the key column"""
+        return self._added_rows
+
+    @property
+    def removed_rows(self) -> Dict[str, Dict[str, str]]:
+        """rows which only exist in the old table, key is the value of the key column"""
+        return self._removed_rows
+
+    @property
+    def changed_cells(self) -> Dict[str, Dict[str, Tuple[Union[str, None], Union[str, None]]]]:
+        """changed cells of rows which exist in both tables. Key is the value of the key column, value is a
+        dictionary of column name and a tuple of old and new value. Missing cells are ``None``"""
+        return self._changed_cells
+
+    @property
+    def added_columns(self) -> List[str]:
+        """columns which only exist in the new table"""
+        return list(self._added_columns.keys())
+
+    @property
+    def removed_columns(self) -> List[str]:
+        """columns which only exist in the old table"""
+        return self._removed_columns
+
+    def is_empty(self) -> bool:
+        """``True`` if both tables have the same content"""
+        return (
+            len(self._added_rows) == 0
+            and len(self._removed_rows) == 0
+            and len(self._changed_cells) == 0
+            and len(self._added_columns) == 0
+            and len(self._removed_columns) == 0
+        )
+
+    def __str__(self) -> str:
+        lines = []
+        for name in self._added_columns:
+            lines.append("+ column %s" % name)
+        for name in self._removed_columns:
+            lines.append("- column %s" % name)
+        for key in self._removed_rows:
+            lines.append("- %s %s" % (self._key_column, key))
+        for key in self._added_rows:
+            lines.append("+ %s %s" % (self._key_column, key))
+        for key, cells in self._changed_cells.items():
+            for name, (old_value, new_value) in cells.items():
+                lines.append("~ %s %s: %s '%s' -> '%s'" % (self._key_column, key, name, old_value, new_value))
+        return "\n".join(lines)
 
 
 class NCTable:
@@ -22,20 +168,36 @@ class NCTable:
         version: str = "",
         has_unit: bool = False,
         is_metric: bool = False,
+        columnar: bool = False,
+        typed: bool = False,
     ):
-        """init object variables logging"""
+        """init object variables logging
+
+        :param columnar: store the table as one list per column instead of one dictionary per row. This reduces
+                         the memory footprint for big tables, rows are returned as :py:class:`NCTableRow` views
+        :param typed: convert all columns to native numbers once the table was parsed, see :py:meth:`get_typed_column`
+        """
         self._logger = logging.getLogger("NCTable")
         self.name = name
         self.suffix = suffix
         self.version = version
         self.has_unit = has_unit
         self.is_metric = is_metric
+        self._columnar = columnar
+        self._typed = typed
         self._content = []
+        self._column_data: Dict[str, list] = {}
+        self._row_count = 0
         self._columns = []
         self._column_format = {}
+        self._hash_indexes: Dict[str, Dict[str, List[int]]] = {}
+        self._sorted_indexes: Dict[str, Tuple[list, List[int]]] = {}
+        self._typed_columns: Dict[str, Tuple[str, Union[array, list]]] = {}
 
     def __len__(self):
         """length of table is equal to number of rows in table"""
+        if self._columnar:
+            return self._row_count
         return len(self._content)
 
     @property
@@ -86,11 +248,30 @@ class NCTable:
     def is_metric(self, value: bool):
         self._is_metric = value
 
+    @property
+    def is_columnar(self) -> bool:
+        """if true the table data is stored as one list per column"""
+        return self._columnar
+
+    @property
+    def is_typed(self) -> bool:
+        """if true all columns are converted to native numbers when the table is parsed"""
+        return self._typed
+
     @property
     def rows(self) -> list:
         """data entries in this table"""
+        if self._columnar:
+            return [NCTableRow(self, i) for i in range(self._row_count)]
         return self._content
 
+    def get_column_values(self, name: str) -> list:
+        """get the values of all rows for one column, missing values are returned as ``None``.
+        For tables with columnar storage this is the list used for storage and should not be modified"""
+        if self._columnar:
+            return self._column_data[name]
+        return [row.get(name) for row in self._content]
+
     @property
     def column_names(self) -> list:
         """list of columns used in this table"""
@@ -98,7 +279,10 @@ class NCTable:
 
     def append_column(self, name: str, start: int, end: int, width: int = 0, empty_value=None):
         """add column to the table format"""
+        self.clear_indexes()
         self._columns.append(name)
+        if self._columnar and name not in self._column_data:
+            self._column_data[name] = [None] * self._row_count
         if width == 0:
             width = end - start
         self._column_format[name] = {
@@ -116,8 +300,11 @@ class NCTable:
 
     def remove_column(self, name: str):
         """remove column by name from table format"""
+        self.clear_indexes()
         self._columns.remove(name)
         del self._column_format[name]
+        if self._columnar:
+            del self._column_data[name]
 
     def get_column_start(self, name: str):
         """get start index of column"""
@@ -173,11 +360,24 @@ class NCTable:
 
     def append_row(self, row):
         """add a data entry to the table"""
-        self._content.append(row)
+        self.clear_indexes()
+        if self._columnar:
+            for name, column in self._column_data.items():
+                column.append(_intern(row.get(name)))
+            self._row_count += 1
+        else:
+            self._content.append(row)
 
     def extend_rows(self, rows):
         """add multiple data entries at onec"""
-        self._content.extend(rows)
+        self.clear_indexes()
+        if self._columnar:
+            rows = list(rows)
+            for name, column in self._column_data.items():
+                column.extend(_intern(row.get(name)) for row in rows)
+            self._row_count += len(rows)
+        else:
+            self._content.extend(rows)
 
     def format_to_json(self) -> str:
         """return json configuration representing the table format"""
@@ -188,10 +388,30 @@ class NCTable:
         json_data["column_config"] = self._column_format
         return json.dumps(json_data, ensure_ascii=False, indent=2)
 
-    def dump_native(self, file_path: pathlib.Path, renumber_column=None):
-        """write table data to a file in the format used by the controls"""
-        row_counter = 0
-        file_name = file_path.name.upper()
+    def dump_native(
+        self,
+        file_path: Union[pathlib.Path, str, BinaryIO],
+        renumber_column: Union[str, None] = None,
+        file_name: Union[str, None] = None,
+    ):
+        """write table data to a file in the format used by the controls
+
+        :param file_path: location of the new file or a binary stream the table is written to, for example
+                          a :py:class:`io.BytesIO` which can be sent to the control without a temporary file
+        :param renumber_column: name of a column which is filled with the row number instead of the table data
+        :param file_name: name of the table written to the header, default is the name of the file or
+                          the name and suffix of the table if a stream is used
+        :raises ValueError: if the column configuration is incomplete or a value does not fit its column
+        """
+        if file_name is None:
+            if hasattr(file_path, "write"):
+                if self._suffix is None:
+                    file_name = str(self._name)
+                else:
+                    file_name = "%s.%s" % (self._name, self._suffix)
+            else:
+                file_name = pathlib.Path(file_path).name
+        file_name = file_name.upper()
 
         units_string = ""
         if self._has_unit:
@@ -203,69 +423,109 @@ class NCTable:
         if self._version is not None:
             version_string = " Version:%s" % str(self._version)
 
-        with open(file_path, "w", encoding="ascii") as tfp:
-            tfp.write("BEGIN %s%s%s\n" % (file_name, units_string, version_string))
+        for column_name in self._columns:
+            if column_name not in self._column_format:
+                raise ValueError("configuration is incomplete, missing definition for column %s" % column_name)
+        widths = [self._column_format[column_name]["width"] for column_name in self._columns]
+        empty_values = ["" if self.get_column_empty_value(c) is None else str(self.get_column_empty_value(c)) for c in self._columns]
 
-            for column_name in self._columns:
-                if column_name not in self._column_format:
-                    raise ValueError("configuration is incomplete, missing definition for column {column_name:s}")
-                fixed_width = self._column_format[column_name]["width"]
-                format_string = "{0:<%d}" % fixed_width
-                tfp.write(format_string.format(column_name))
-            tfp.write("\n")
+        line_template = "".join(["%%-%ds" % width for width in widths]) + "\n"
+        line_length = sum(widths) + 1
+        renumber_index = self._columns.index(renumber_column) if renumber_column in self._columns else None
+        missing_columns = set()
 
-            for row in self._content:
-                for column_name in self._columns:
-                    fixed_width = self._column_format[column_name]["width"]
-                    format_string = "{0:<%d}" % fixed_width
+        def encoded_lines() -> Iterator[bytes]:
+            yield ("BEGIN %s%s%s\n" % (file_name, units_string, version_string)).encode("ascii")
+            yield (line_template % tuple(self._columns)).encode("ascii")
 
-                    if column_name is renumber_column:
-                        tfp.write(format_string.format(row_counter))
-                    else:
-                        if column_name in row:
-                            tfp.write(format_string.format(row[column_name]))
-                        else:
-                            if "empty_value" in self._column_format[column_name]:
-                                logging.warning(
+            if self._columnar:
+                table_values = zip(*[self._column_data[column_name] for column_name in self._columns])
+            else:
+                table_values = ([row.get(column_name) for column_name in self._columns] for row in self._content)
+
+            chunk = []
+            for row_counter, values in enumerate(table_values):
+                if None in values:
+                    values = list(values)
+                    for i, column_name in enumerate(self._columns):
+                        if values[i] is None:
+                            if column_name not in missing_columns and column_name != renumber_column:
+                                self._logger.warning(
                                     "entry is missing optional column %s defined in output format, replace with empty value",
                                     column_name,
                                 )
-                                tfp.write(format_string.format(self._column_format[column_name]["empty_value"]))
-                            else:
-                                raise ValueError("entry is missing a value for column %s defined in the output format" % column_name)
-                tfp.write("\n")
-                row_counter += 1
-
-            tfp.write("[END]\n")
+                                missing_columns.add(column_name)
+                            values[i] = empty_values[i]
+                if renumber_index is not None:
+                    values = list(values)
+                    values[renumber_index] = row_counter
+                line = line_template % tuple(values)
+                if len(line) != line_length:
+                    for column_name, width, value in zip(self._columns, widths, values):
+                        if len(str(value)) > width:
+                            raise ValueError("value '%s' in row %d is too long for column %s" % (value, row_counter, column_name))
+                chunk.append(line)
+                if len(chunk) >= _WRITE_CHUNK_SIZE:
+                    yield "".join(chunk).encode("ascii")
+                    chunk = []
+            chunk.append("[END]\n")
+            yield "".join(chunk).encode("ascii")
+
+        # format everything before writing so the output is never left half finished by an invalid value
+        chunks = list(encoded_lines())
+
+        if hasattr(file_path, "write"):
+            file_path.writelines(chunks)
+        else:
+            with open(file_path, "wb") as tfp:
+                tfp.writelines(chunks)
 
     def dump_csv(self, file_path: pathlib.Path, decimal_char: str = "."):
         """
-        save content of table as csv file
+        save content of table as csv file, the table data is not modified
 
         :param file_path: file location for csv file
+        :param decimal_char: character used as decimal separator for values with decimal places
         """
         self._logger.debug("write table to csv, using decimal char '%s'", decimal_char)
-
-        def localize_floats(row):
-            float_pattern = re.compile(r"^[+-]?\d+\.\d+$")
-            for key in row.keys():
-                if float_pattern.match(row[key]):
-                    row[key] = row[key].replace(".", decimal_char)
-            return row
-
-        with open(file_path, "w", newline="", encoding="utf8") as csvfp:
-            csv_writer = csv.DictWriter(
-                csvfp,
-                delimiter=";",
-                quotechar='"',
-                quoting=csv.QUOTE_ALL,
-                fieldnames=self.column_names,
-            )
-            csv_writer.writeheader()
-            for row in self.rows:
-                csv_writer.writerow(localize_floats(row))
+        if self._columnar:
+            table_values = zip(*[self._column_data[column_name] for column_name in self._columns])
+        else:
+            table_values = ([row.get(column_name) for column_name in self._columns] for row in self._content)
+        NCTable._write_csv(table_values, self.column_names, file_path, decimal_char)
         self._logger.info("csv file saved successfully")
 
+    @staticmethod
+    def _write_csv(table_values: Iterable, column_names: List[str], file_path: pathlib.Path, decimal_char: str = ".") -> int:
+        """write rows given as sequences of cell values in the order of the column names to a csv file in the
+        format used by :py:meth:`dump_csv`, returns the number of rows. Missing cells are ``None``"""
+        match_float = _FLOAT_PATTERN.match
+
+        def localize_column(values: tuple) -> list:
+            return ["" if v is None else v.replace(".", decimal_char) if "." in v and match_float(v) else v for v in values]
+
+        def write_chunk(chunk: list):
+            if decimal_char == ".":
+                csv_writer.writerows([["" if v is None else v for v in values] for values in chunk])
+            else:
+                # localize one column at a time, values in a column usually share the same format
+                csv_writer.writerows(zip(*[localize_column(column) for column in zip(*chunk)]))
+
+        with open(file_path, "w", newline="", encoding="utf8", buffering=_CSV_WRITE_BUFFER) as csvfp:
+            csv_writer = csv.writer(csvfp, delimiter=";", quotechar='"', quoting=csv.QUOTE_ALL)
+            csv_writer.writerow(column_names)
+            row_count = 0
+            chunk = []
+            for values in table_values:
+                chunk.append(values)
+                if len(chunk) >= _WRITE_CHUNK_SIZE:
+                    write_chunk(chunk)
+                    row_count += len(chunk)
+                    chunk = []
+            write_chunk(chunk)
+            row_count += len(chunk)
+        return row_count
+
     def find_string(self, column_name: str, search_value: Union[str, re.Pattern]) -> list:
         """
         search for string rows by string or pattern
@@ -277,6 +537,14 @@ class NCTable:
         search_results = []
         if column_name not in self._columns:
             self._logger.error("column with name %s not part of this table", column_name)
+        elif self._columnar:
+            values = self._column_data[column_name]
+            if isinstance(search_value, (str,)):
+                search_results = [NCTableRow(self, i) for i, value in enumerate(values) if value is not None and search_value in value]
+            elif isinstance(search_value, (re.Pattern,)):
+                search_results = [
+                    NCTableRow(self, i) for i, value in enumerate(values) if value is not None and search_value.match(value) is not None
+                ]
         else:
             if isinstance(search_value, (str,)):
                 search_results = [itm for itm in self._content if search_value in itm[column_name]]
@@ -284,6 +552,272 @@ class NCTable:
                 search_results = [itm for itm in self._content if search_value.match(itm[column_name]) is not None]
         return search_results
 
+    def _convert_column(self, name: str) -> Tuple[str, Union[array, list]]:
+        """convert the values of a column to the most specific type all cells can be converted to"""
+        values = self.get_column_values(name)
+        column_format = self._column_format[name]
+        # the table description only hints at the type, the values decide
+        candidates = ["int", "float"]
+        if isinstance(column_format["min"], (float,)) or isinstance(column_format["max"], (float,)) or column_format["unit"]:
+            candidates = ["float"]
+        elif isinstance(column_format["min"], (str,)) or isinstance(column_format["max"], (str,)):
+            candidates = []
+
+        has_null = False
+        cells = []
+        for value in values:
+            if value is None or value in _NULL_VALUES:
+                has_null = True
+                cells.append(None)
+            else:
+                cells.append(value)
+
+        if "int" in candidates:
+            try:
+                if has_null:
+                    return "int", array("d", [math.nan if v is None else int(v) for v in cells])
+                return "int", array("q", [int(v) for v in cells])
+            except (ValueError, OverflowError):
+                pass
+        if "float" in candidates:
+            try:
+                return "float", array("d", [math.nan if v is None else float(v) for v in cells])
+            except ValueError:
+                pass
+        return "str", list(values)
+
+    def get_column_type(self, name: str) -> str:
+        """get the type of a column after conversion, one of ``int``, ``float`` or ``str``. Derived from the
+        table description if available, otherwise from the content of the column"""
+        if name not in self._typed_columns:
+            self._typed_columns[name] = self._convert_column(name)
+        return self._typed_columns[name][0]
+
+    def get_typed_column(self, name: str) -> Union[array, list]:
+        """
+        get the values of a column converted to native numbers. Each column is converted only once, the
+        string values of the rows are not changed.
+
+        * ``float`` columns are returned as ``array("d")``, empty cells are ``nan``
+        * ``int`` columns are returned as ``array("q")``, if the column has empty cells as ``array("d")`` with ``nan``
+        * all other columns are returned as list of strings, empty cells are ``None``
+
+        :param name: name of the column
+        :raises KeyError: if the column is not part of the table
+        """
+        if name not in self._columns:
+            raise KeyError("column %s is not part of this table" % name)
+        if name not in self._typed_columns:
+            self._typed_columns[name] = self._convert_column(name)
+        return self._typed_columns[name][1]
+
+    def convert_columns(self):
+        """convert all columns to native numbers at once, see :py:meth:`get_typed_column`"""
+        for name in self._columns:
+            self.get_typed_column(name)
+
+    def clear_indexes(self):
+        """drop all indexes used by :py:meth:`find_equal`, :py:meth:`find_range` and :py:meth:`find_prefix`
+        and the converted columns of :py:meth:`get_typed_column`. Both are rebuilt on next use. This happens
+        automatically if rows are added via :py:meth:`append_row` or :py:meth:`extend_rows`, call it after
+        changing the dictionaries returned by :py:attr:`rows` directly"""
+        self._hash_indexes = {}
+        self._sorted_indexes = {}
+        self._typed_columns = {}
+
+    def _get_rows_by_index(self, indexes: Iterable[int]) -> list:
+        """return the rows at the given positions in table order"""
+        if self._columnar:
+            return [NCTableRow(self, i) for i in sorted(indexes)]
+        return [self._content[i] for i in sorted(indexes)]
+
+    def _get_hash_index(self, column_name: str) -> Dict[str, List[int]]:
+        """get index which maps the values of a column to the positions of the rows, built on first use"""
+        if column_name not in self._hash_indexes:
+            self._logger.debug("build hash index for column %s", column_name)
+            index: Dict[str, List[int]] = {}
+            for i, value in enumerate(self.get_column_values(column_name)):
+                if value is not None:
+                    index.setdefault(value, []).append(i)
+            self._hash_indexes[column_name] = index
+        return self._hash_indexes[column_name]
+
+    def _get_sorted_index(self, column_name: str, numeric: bool) -> Tuple[list, List[int]]:
+        """get the sorted values of a column and the positions of the matching rows, built on first use.
+        Numeric indexes only contain cells which can be converted to float"""
+        key = "%s:%s" % ("numeric" if numeric else "text", column_name)
+        if key not in self._sorted_indexes:
+            self._logger.debug("build sorted index for column %s", column_name)
+            entries = []
+            for i, value in enumerate(self.get_column_values(column_name)):
+                if value is None:
+                    continue
+                if numeric:
+                    try:
+                        value = NCTable.format_entry_float(value)
+                    except ValueError:
+                        continue
+                    if value is None:
+                        continue
+                entries.append((value, i))
+            entries.sort()
+            self._sorted_indexes[key] = ([e[0] for e in entries], [e[1] for e in entries])
+        return self._sorted_indexes[key]
+
+    def find_equal(self, column_name: str, value: str) -> list:
+        """
+        search for rows where a column has exactly the given value, uses a hash index on the column
+        returns list of rows in table order
+
+        :param column_name: name of the table column which should be checked
+        :param value: the value to check for, leading and trailing spaces are ignored
+        """
+        if column_name not in self._columns:
+            self._logger.error("column with name %s not part of this table", column_name)
+            return []
+        return self._get_rows_by_index(self._get_hash_index(column_name).get(str(value).strip(), []))
+
+    def find_range(
+        self,
+        column_name: str,
+        minimum: Union[float, None] = None,
+        maximum: Union[float, None] = None,
+    ) -> list:
+        """
+        search for rows where the numeric value of a column lies between minimum and maximum, both limits
+        are included. Uses a sorted index on the column, cells that are empty or not a number never match
+        returns list of rows in table order
+
+        :param column_name: name of the table column which should be checked
+        :param minimum: lower limit, no limit if None
+        :param maximum: upper limit, no limit if None
+        """
+        if column_name not in self._columns:
+            self._logger.error("column with name %s not part of this table", column_name)
+            return []
+        values, positions = self._get_sorted_index(column_name, numeric=True)
+        first = 0 if minimum is None else bisect.bisect_left(values, minimum)
+        last = len(values) if maximum is None else bisect.bisect_right(values, maximum)
+        return self._get_rows_by_index(positions[first:last])
+
+    def find_prefix(self, column_name: str, prefix: str) -> list:
+        """
+        search for rows where the value of a column starts with the given string, uses a sorted index on the column
+        returns list of rows in table order
+
+        :param column_name: name of the table column which should be checked
+        :param prefix: the start of the value to check for
+        """
+        if column_name not in self._columns:
+            self._logger.error("column with name %s not part of this table", column_name)
+            return []
+        values, positions = self._get_sorted_index(column_name, numeric=False)
+        first = bisect.bisect_left(values, prefix)
+        last = first
+        while last < len(values) and values[last].startswith(prefix):
+            last += 1
+        return self._get_rows_by_index(positions[first:last])
+
+    def _get_rows_by_key(self, key_column: str) -> Dict[str, Any]:
+        """map the values of the key column to the rows of the table"""
+        if key_column not in self._columns:
+            raise ValueError("column %s is not part of this table" % key_column)
+        rows_by_key = {}
+        for row in self.rows:
+            key = row.get(key_column)
+            if key in rows_by_key:
+                raise ValueError("value %s of key column %s is not unique" % (key, key_column))
+            rows_by_key[key] = row
+        return rows_by_key
+
+    def diff(self, other: "NCTable", key_column: str) -> NCTableDiff:
+        """
+        compare this table with a newer version of the same table. Rows are matched by the value of the
+        key column, cells are compared as strings
+
+        :param other: the new version of the table
+        :param key_column: name of the column which identifies a row, for example ``T`` for tool tables
+
+        :raises ValueError: if the key column is missing in one of the tables or its values are not unique
+        """
+        result = NCTableDiff(key_column)
+        old_rows = self._get_rows_by_key(key_column)
+        new_rows = other._get_rows_by_key(key_column)
+
+        for name in other.column_names:
+            if name not in self._columns:
+                result._added_columns[name] = dict(other._column_format[name])
+        result._removed_columns.extend([name for name in self._columns if name not in other.column_names])
+        columns = self._columns + result.added_columns
+
+        for key, old_row in old_rows.items():
+            if key not in new_rows:
+                result._removed_rows[key] = dict(old_row)
+                continue
+            new_row = new_rows[key]
+            cells = {}
+            for name in columns:
+                if name in result._removed_columns:
+                    continue
+                old_value = old_row.get(name)
+                new_value = new_row.get(name)
+                if old_value != new_value:
+                    cells[name] = (old_value, new_value)
+            if len(cells) > 0:
+                result._changed_cells[key] = cells
+
+        for key, new_row in new_rows.items():
+            if key not in old_rows:
+                result._added_rows[key] = dict(new_row)
+
+        self._logger.debug(
+            "found %d added, %d removed and %d changed rows",
+            len(result.added_rows),
+            len(result.removed_rows),
+            len(result.changed_cells),
+        )
+        return result
+
+    def patch(self, table_diff: NCTableDiff) -> "NCTable":
+        """
+        return a new table with the changes of a diff applied to the content of this table. Unchanged rows
+        keep their position, added rows are appended at the end
+
+        :param table_diff: changes created by :py:meth:`diff`
+
+        :raises ValueError: if the key column is missing or a changed row does not exist in this table
+        """
+        rows_by_key = self._get_rows_by_key(table_diff.key_column)
+        for key in list(table_diff.changed_cells.keys()) + list(table_diff.removed_rows.keys()):
+            if key not in rows_by_key:
+                raise ValueError("row with %s %s is not part of this table" % (table_diff.key_column, key))
+
+        patched = NCTable(self._name, self._suffix, self._version, self._has_unit, self._is_metric, self._columnar, self._typed)
+        for name in self._columns:
+            if name not in table_diff.removed_columns:
+                patched.append_column(name, self.get_column_start(name), self.get_column_end(name))
+                patched._column_format[name] = dict(self._column_format[name])
+        for name, column_format in table_diff._added_columns.items():
+            patched.append_column(name, column_format["start"], column_format["end"])
+            patched._column_format[name] = dict(column_format)
+
+        new_rows = []
+        for key, row in rows_by_key.items():
+            if key in table_diff.removed_rows:
+                continue
+            new_row = {name: value for name, value in row.items() if name in patched._column_format}
+            for name, (_, new_value) in table_diff.changed_cells.get(key, {}).items():
+                if new_value is None:
+                    new_row.pop(name, None)
+                else:
+                    new_row[name] = new_value
+            new_rows.append(new_row)
+        new_rows.extend([dict(row) for row in table_diff.added_rows.values()])
+        patched.extend_rows(new_rows)
+        if patched.is_typed:
+            patched.convert_columns()
+        return patched
+
     @staticmethod
     def parse_header(header_line: str) -> Dict[str, Any]:
         """parse the first line of a table file and return the data as a dict
@@ -326,106 +860,240 @@ class NCTable:
         return header_data
 
     @staticmethod
-    def parse_table(table_path: pathlib.Path) -> "NCTable":
+    def parse_table(table_path: Union[pathlib.Path, str, BinaryIO], columnar: bool = False, typed: bool = False) -> "NCTable":
         """Parse a file of one of the common table formats
 
-        :param str or Path table_path: Path to the table file
+        :param str or Path or BinaryIO table_path: Path to the table file or a binary stream with the file content
+        :param bool columnar: store the table data as one list per column, see :py:class:`NCTable`
+        :param bool typed: convert all columns to native numbers, see :py:meth:`NCTable.get_typed_column`
 
         :returns: list of dictionaries. key is the column name, value the content of the table cell
         :rtype: NCTable
         """
+        if hasattr(table_path, "read"):
+            return NCTable._parse_stream(table_path, columnar, typed)
+
+        table_file = pathlib.Path(table_path)
+        if not table_file.is_file():
+            raise FileNotFoundError("Could not open file %s" % table_path)
+
+        with table_file.open(mode="rb") as tfp:
+            return NCTable._parse_stream(tfp, columnar, typed)
+
+    @staticmethod
+    def _parse_stream(tfp: BinaryIO, columnar: bool = False, typed: bool = False) -> "NCTable":
+        """parse a table from a binary stream, see :py:meth:`parse_table`"""
         logger = logging.getLogger("NCTable parser")
-        nctable = NCTable()
+        nctable, table_config = NCTable._read_table_head(tfp, columnar)
+        logger.debug("Found %d columns", len(nctable.column_names))
+
+        chunk = []
+        for values in NCTable._iter_table_lines(tfp, nctable._get_line_unpacker()):
+            chunk.append(values)
+            if len(chunk) >= _PARSE_CHUNK_SIZE:
+                nctable._append_raw_rows(chunk)
+                chunk = []
+        nctable._append_raw_rows(chunk)
+        logger.debug("Found %d entries", len(nctable))
+
+        if table_config is not None:
+            logger.debug("update column config from table description")
+            nctable._apply_table_description(table_config)
+
+        if typed:
+            nctable._typed = True
+            nctable.convert_columns()
+            logger.debug("converted columns to types %s", [nctable.get_column_type(c) for c in nctable.column_names])
 
-        table_config = None
+        return nctable
+
+    @staticmethod
+    def iter_rows(table_path: pathlib.Path, columns: Union[List[str], None] = None) -> Iterator[Dict[str, str]]:
+        """Read a table file row by row without loading it completely. Only the current row is kept in
+        memory, so this also works for tables which are too big for :py:meth:`parse_table`
+
+        :param str or Path table_path: Path to the table file
+        :param list columns: names of the columns which should be returned, default is all columns
 
+        :returns: iterator of dictionaries. key is the column name, value the content of the table cell
+        :raises FileNotFoundError: if the file does not exist
+        :raises ValueError: if one of the selected columns is not part of the table
+        """
         table_file = pathlib.Path(table_path)
         if not table_file.is_file():
             raise FileNotFoundError("Could not open file %s" % table_path)
 
-        try:
-            with table_file.open(mode="r", encoding="latin1") as tfp:
-                header_data = NCTable.parse_header(tfp.readline())
-                nctable.name = header_data["name"]
-                nctable.suffix = header_data["suffix"]
-                nctable.version = header_data["version"]
-                if len(header_data["name"]) < 1:
-                    nctable.has_unit = False
+        if columns is None:
+            with table_file.open(mode="rb") as tfp:
+                columns = NCTable._read_table_head(tfp)[0].column_names
+        for values in NCTable._iter_row_values(table_file, columns):
+            yield dict(zip(columns, values))
+
+    @staticmethod
+    def _iter_row_values(table_file: pathlib.Path, columns: List[str]) -> Iterator[Tuple[str, ...]]:
+        """read a table file row by row and yield the values of the selected columns as tuple"""
+        with table_file.open(mode="rb") as tfp:
+            nctable, _ = NCTable._read_table_head(tfp)
+            for column in columns:
+                if column not in nctable.column_names:
+                    raise ValueError("column %s is not part of this table" % column)
+            yield from NCTable._iter_table_lines(tfp, nctable._get_line_unpacker(columns))
+
+    @staticmethod
+    def convert_to_csv(
+        table_path: pathlib.Path,
+        csv_path: pathlib.Path,
+        decimal_char: str = ".",
+        columns: Union[List[str], None] = None,
+    ) -> int:
+        """
+        convert a table file to a csv file row by row, same output as :py:meth:`dump_csv` but works for
+        tables of any size since the table is never loaded completely
+
+        :param table_path: location of the table file
+        :param csv_path: file location for csv file
+        :param decimal_char: character used as decimal separator in the csv file
+        :param columns: names of the columns which should be written, default is all columns
+
+        :returns: number of rows written to the csv file
+        """
+        logger = logging.getLogger("NCTable parser")
+        if columns is None:
+            with pathlib.Path(table_path).open(mode="rb") as tfp:
+                columns = NCTable._read_table_head(tfp)[0].column_names
+        logger.debug("convert table to csv, using decimal char '%s'", decimal_char)
+        row_count = NCTable._write_csv(NCTable._iter_row_values(pathlib.Path(table_path), columns), columns, csv_path, decimal_char)
+        logger.info("csv file saved successfully")
+        return row_count
+
+    @staticmethod
+    def _read_table_head(tfp: BinaryIO, columnar: bool = False) -> Tuple["NCTable", Union[dict, None]]:
+        """read header, preamble and column definition from a table file opened in binary mode.
+        Returns a new table without rows and the parsed table description if the file has one"""
+        nctable = NCTable(columnar=columnar)
+        table_config = None
+
+        header_data = NCTable.parse_header(_decode_line(tfp.readline()))
+        nctable.name = header_data["name"]
+        nctable.suffix = header_data["suffix"]
+        nctable.version = header_data["version"]
+        if len(header_data["name"]) < 1:
+            nctable.has_unit = False
+        else:
+            nctable.has_unit = True
+            nctable.is_metric = False
+            if header_data["name"] == "MM":
+                nctable.is_metric = True
+
+        next_line = _decode_line(tfp.readline())
+        if "#STRUCTBEGIN" in next_line:
+            in_preamble = True
+            next_line = _decode_line(tfp.readline())
+            while in_preamble:
+                if next_line.startswith("#"):
+                    in_preamble = False
                 else:
-                    nctable.has_unit = True
-                    nctable.is_metric = False
-                    if header_data["name"] == "MM":
-                        nctable.is_metric = True
-
-                next_line = tfp.readline()
-                if "#STRUCTBEGIN" in next_line:
-                    in_preamble = True
-                    next_line = tfp.readline()
-                    while in_preamble:
-                        if next_line.startswith("#"):
-                            in_preamble = False
-                        else:
-                            next_line = tfp.readline()
-                    next_line = tfp.readline()
-                elif "TableDescription" in next_line:
-                    tab_desc = []
-                    tab_desc.append(next_line.strip())
-                    in_preamble = True
-                    next_line = tfp.readline()
-                    while in_preamble:
-                        tab_desc.append(next_line.strip())
-                        if next_line.startswith(")"):
-                            in_preamble = False
-                        else:
-                            next_line = tfp.readline()
-                    next_line = tfp.readline()
-                    table_config = NCTable.parse_table_description(tab_desc)
-
-                column_pattern = re.compile(r"([A-Za-z-\d_:\.]+)(?:\s+)")
-                for column_match in column_pattern.finditer(next_line):
-                    if column_match.group().endswith("\n"):
-                        cl_end = column_match.end() - 1
-                    else:
-                        cl_end = column_match.end()
-                    nctable.append_column(
-                        name=column_match.group().strip(),
-                        start=column_match.start(),
-                        end=cl_end,
-                    )
+                    next_line = _decode_line(tfp.readline())
+            next_line = _decode_line(tfp.readline())
+        elif "TableDescription" in next_line:
+            tab_desc = []
+            tab_desc.append(next_line.strip())
+            in_preamble = True
+            next_line = _decode_line(tfp.readline())
+            while in_preamble:
+                tab_desc.append(next_line.strip())
+                if next_line.startswith(")"):
+                    in_preamble = False
+                else:
+                    next_line = _decode_line(tfp.readline())
+            next_line = _decode_line(tfp.readline())
+            table_config = NCTable.parse_table_description(tab_desc)
 
-                logger.debug("Found %d columns", len(nctable.column_names))
-
-                for line in tfp.readlines():
-                    if line.startswith("[END]"):
-                        break
-
-                    table_entry = {}
-                    for column in nctable.column_names:
-                        table_entry[column] = line[nctable.get_column_start(column) : nctable.get_column_end(column)].strip()
-                    nctable.append_row(table_entry)
-
-                logger.debug("Found %d entries", len(nctable.rows))
-
-                if table_config is not None:
-                    logger.debug("update column config from table description")
-                    for c_d in table_config["TableDescription"]["columns"]:
-                        cfg_column_name = c_d["CfgColumnDescription"]["key"]
-                        if cfg_column_name not in nctable.column_names:
-                            raise ValueError("found unexpected column %s" % cfg_column_name)
-                        if c_d["CfgColumnDescription"]["width"] != nctable.get_column_width(cfg_column_name):
-                            raise ValueError(
-                                "found difference in column width for colmun %s: %d : %d"
-                                % (
-                                    cfg_column_name,
-                                    c_d["CfgColumnDescription"]["width"],
-                                    nctable.get_column_width(cfg_column_name),
-                                )
-                            )
-                        nctable.update_column_format(cfg_column_name, c_d["CfgColumnDescription"])
+        for column_match in _COLUMN_PATTERN.finditer(next_line):
+            if column_match.group().endswith("\n"):
+                cl_end = column_match.end() - 1
+            else:
+                cl_end = column_match.end()
+            nctable.append_column(
+                name=column_match.group().strip(),
+                start=column_match.start(),
+                end=cl_end,
+            )
+        return nctable, table_config
 
-        except UnicodeDecodeError:
-            logger.error("File has invalid utf-8 encoding")
-        return nctable
+    def _get_line_unpacker(self, columns: Union[List[str], None] = None) -> Callable[[bytes], Tuple[str, ...]]:
+        """build a function which cuts a raw table line into the stripped values of the selected columns.
+        The column boundaries are compiled into one :py:class:`struct.Struct` so each line is split with a single call
+
+        :param columns: names of the columns to extract, default is all columns of the table
+        """
+        if columns is None:
+            columns = self._columns
+        layout = ""
+        position = 0
+        for name in columns:
+            start = self.get_column_start(name)
+            end = self.get_column_end(name)
+            if start < position or end < start:
+                # overlapping or unordered columns can not be expressed as struct, fall back to slicing
+                boundaries = [slice(self.get_column_start(c), self.get_column_end(c)) for c in columns]
+
+                def unpack_slices(line: bytes) -> Tuple[str, ...]:
+                    line = line.decode("latin1")
+                    return tuple([line[boundary].strip() for boundary in boundaries])
+
+                return unpack_slices
+            if start > position:
+                layout += "%dx" % (start - position)
+            layout += "%ds" % (end - start)
+            position = end
+
+        record = struct.Struct(layout)
+        record_size = record.size
+        unpack_from = record.unpack_from
+
+        def unpack_struct(line: bytes) -> Tuple[str, ...]:
+            if len(line) < record_size:
+                line = line.ljust(record_size)
+            return tuple([value.decode("latin1").strip() for value in unpack_from(line)])
+
+        return unpack_struct
+
+    @staticmethod
+    def _iter_table_lines(tfp: BinaryIO, unpack: Callable[[bytes], Tuple[str, ...]]) -> Iterator[Tuple[str, ...]]:
+        """read the data lines of a table file line by line until the end marker is reached"""
+        for line in tfp:
+            if line.startswith(b"[END]"):
+                break
+            yield unpack(line)
+
+    def _append_raw_rows(self, rows: List[Tuple[str, ...]]):
+        """add rows given as tuples of cell values in the order of :py:attr:`column_names`"""
+        self.clear_indexes()
+        if self._columnar:
+            for name, values in zip(self._columns, zip(*rows)):
+                self._column_data[name].extend(map(sys.intern, values))
+            self._row_count += len(rows)
+        else:
+            columns = self._columns
+            self._content.extend([dict(zip(columns, values)) for values in rows])
+
+    def _apply_table_description(self, table_config: dict):
+        """update the column configuration with the values from the table description"""
+        for c_d in table_config["TableDescription"]["columns"]:
+            cfg_column_name = c_d["CfgColumnDescription"]["key"]
+            if cfg_column_name not in self.column_names:
+                raise ValueError("found unexpected column %s" % cfg_column_name)
+            if c_d["CfgColumnDescription"]["width"] != self.get_column_width(cfg_column_name):
+                raise ValueError(
+                    "found difference in column width for colmun %s: %d : %d"
+                    % (
+                        cfg_column_name,
+                        c_d["CfgColumnDescription"]["width"],
+                        self.get_column_width(cfg_column_name),
+                    )
+                )
+            self.update_column_format(cfg_column_name, c_d["CfgColumnDescription"])
 
     @staticmethod
     def parse_table_description(lines: list):
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""tests for the processing of scope data which work without a control"""
+
+import io
+import time
+from datetime import datetime
+
+import pyLSV2
+import pyLSV2.misc_scope
+import pyLSV2.scope_publisher
+from pyLSV2.scope_stages import ChangeTrigger, Decimator, ThresholdTrigger, TriggeredCapture, WindowStatistics, process_readings
+from pyLSV2.scope_publisher import ScopePublisher, ScopeSubscriber
+from pyLSV2.scope_sync import SyncedScopeCapture
+
+
+def build_reading(sequence_number: int, values: list) -> pyLSV2.ScopeReading:
+    """create a scope reading with one signal per list of raw values"""
+    reading = pyLSV2.ScopeReading(sequence_number)
+    for i, signal_values in enumerate(values):
+        signal_data = pyLSV2.ScopeSignalData(channel=1, signal=i, offset=0, factor=1.0, unit="mm")
+        signal_data.data.extend(signal_values)
+        reading.add_dataset(signal_data)
+    return reading
+
+
+class FakeScopeConnection:
+    """stand in for a connection which returns prepared scope readings"""
+
+    def __init__(self, readings: list):
+        self._readings = readings
+
+    def get_remote_datetime(self) -> datetime:
+        return datetime.now()
+
+    def real_time_readings(self, signal_list, duration, interval):
+        yield from self._readings
+
+
+def test_synced_capture_is_time_ordered():
+    """check if the readings of several sources are merged by timestamp"""
+    connections = {
+        "a": FakeScopeConnection([build_reading(i, [[i] * 32]) for i in range(5)]),
+        "b": FakeScopeConnection([build_reading(i, [[i] * 32]) for i in range(3)]),
+    }
+    capture = SyncedScopeCapture(connections, {"a": [], "b": []}, duration=1, interval=600)
+
+    results = list(capture.readings())
+    assert len(results) == 8
+    timestamps = [r.timestamp for r in results]
+    assert timestamps == sorted(timestamps)
+    assert [r.reading.seqence_nr() for r in results if r.source == "a"] == list(range(5))
+    assert abs(capture.clock_offsets["a"]) < 2.0
+    assert len(results[0].sample_times()) == 32
+
+
+def test_synced_capture_stops_early():
+    """check if the recording threads end when the iteration is stopped early"""
+    connections = {
+        "a": FakeScopeConnection([build_reading(i, [[i] * 32]) for i in range(500)]),
+        "b": FakeScopeConnection([build_reading(i, [[i] * 32]) for i in range(500)]),
+    }
+    capture = SyncedScopeCapture(connections, {"a": [], "b": []}, duration=1, interval=600)
+
+    results = capture.readings()
+    for _ in range(3):
+        next(results)
+    threads = list(capture._threads)
+    results.close()
+    assert len(threads) == 2
+    assert not any(thread.is_alive() for thread in threads)
+
+
+def test_decimation_across_blocks():
+    """check if decimation keeps the phase between blocks"""
+    readings = [build_reading(0, [list(range(0, 32))]), build_reading(1, [list(range(32, 64))])]
+    results = list(process_readings(readings, Decimator(10)))
+    values = [v for r in results for v in r.get_data()[0].data]
+    assert values == [0, 10, 20, 30, 40, 50, 60]
+
+
+def test_window_statistics():
+    """check the statistic values calculated for each window"""
+    readings = [build_reading(0, [[3, -3] * 16]), build_reading(1, [[1] * 32])]
+    results = list(process_readings(readings, WindowStatistics(32)))
+    assert len(results) == 2
+    stats = results[0].get_data()[0]
+    assert stats.minimum == -3
+    assert stats.maximum == 3
+    assert stats.mean == 0
+    assert abs(stats.rms - 3.0) < 1e-9
+    assert results[1].first_sample == 32
+    assert results[1].get_data()[0].mean == 1
+
+
+def test_threshold_trigger():
+    """check if crossings of the threshold are found across block boundaries"""
+    readings = [build_reading(0, [[0] * 31 + [10]]), build_reading(1, [[10] * 16 + [0] * 16])]
+    events = list(process_readings(readings, ThresholdTrigger(0, 5.0, rising=True, falling=True)))
+    assert [(e.sample, e.rising) for e in events] == [(31, True), (48, False)]
+
+
+def test_triggered_capture():
+    """check if only the data around a trigger event is returned"""
+    readings = [build_reading(i, [[0] * 32, list(range(i * 32, (i + 1) * 32))]) for i in range(4)]
+    readings[1].get_data()[0].data[10] = 1
+    capture = TriggeredCapture(ChangeTrigger(0), pre_trigger=0.006, post_trigger=0.0252, interval=600)
+    assert capture.pre_samples == 10
+    assert capture.post_samples == 42
+
+    windows = list(process_readings(readings, capture))
+    assert len(windows) == 1
+    assert windows[0].event.sample == 42
+    assert windows[0].first_sample == 32
+    assert windows[0].reading.get_data()[1].data == list(range(32, 84))
+
+
+def test_binary_scope_stream():
+    """check if readings survive encoding and decoding as binary scope stream"""
+    signal = pyLSV2.ScopeSignal()
+    signal.channel_name = "s ist"
+    signal.signal_name = "X"
+    signal.channel = 1
+    signal.signal = 0
+    signal.factor = 0.5
+    signal.offset = 2
+    signal.unit = "mm"
+
+    stream = io.BytesIO()
+    stream.write(pyLSV2.misc_scope.encode_scope_stream_header([signal], 600))
+    for i in range(3):
+        stream.write(pyLSV2.misc_scope.encode_scope_block(build_reading(i, [list(range(-16, 16))])))
+    stream.seek(0)
+
+    interval, signals = pyLSV2.misc_scope.read_scope_stream_header(stream)
+    assert interval == 600
+    assert signals[0].normalized_name() == "x_s_ist"
+    assert signals[0].factor == 0.5
+    assert signals[0].unit == "mm"
+
+    readings = list(pyLSV2.misc_scope.read_scope_blocks(stream, signals))
+    assert [r.seqence_nr() for r in readings] == [0, 1, 2]
+    assert readings[2].get_data()[0].data == list(range(-16, 16))
+    assert readings[0].get_data()[0].scaled_data()[0] == -6.0
+
+
+def test_scope_publisher(tmp_path):
+    """check if published readings arrive at every subscriber"""
+    signal = pyLSV2.ScopeSignal()
+    signal.channel_name = "s ist"
+    signal.channel = 1
+
+    with ScopePublisher(str(tmp_path / "scope.sock"), [signal], 600) as publisher:
+        subscribers = [ScopeSubscriber(publisher.address, timeout=5.0) for _ in range(2)]
+        deadline = time.time() + 5.0
+        while publisher.subscriber_count < 2 and time.time() < deadline:
+            time.sleep(0.01)
+
+        readings = [build_reading(i, [list(range(32))]) for i in range(3)]
+        assert len(list(publisher.publish_readings(readings))) == 3
+
+    for subscriber in subscribers:
+        received = list(subscriber.readings())
+        assert subscriber.interval == 600
+        assert [r.seqence_nr() for r in received] == [0, 1, 2]
+        subscriber.close()
+    assert publisher.dropped_subscribers == 0
+
+
+def test_scope_publisher_tcp_fallback(tmp_path, monkeypatch):
+    """check if a path is served via tcp on platforms without unix domain sockets"""
+    monkeypatch.setattr(pyLSV2.scope_publisher, "_unix_sockets_available", lambda: False)
+    signal = pyLSV2.ScopeSignal()
+    signal.channel_name = "s ist"
+    signal.channel = 1
+
+    with ScopePublisher(str(tmp_path / "scope.sock"), [signal], 600) as publisher:
+        subscriber = ScopeSubscriber(publisher.address, timeout=5.0)
+        deadline = time.time() + 5.0
+        while publisher.subscriber_count < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        publisher.publish(build_reading(0, [list(range(32))]))
+
+    assert [r.seqence_nr() for r in subscriber.readings()] == [0]
+    subscriber.close()
@@ -2,6 +2,13 @@
 # -*- coding: utf-8 -*-
 """tests if table functions work"""
 
+import io
+import math
+import pathlib
+import re
+
+import pytest
+
 import pyLSV2
 
 
@@ -86,3 +93,167 @@ def test_header_parser():
     assert data["date"] is None
     assert data["mark"] is None
     assert data["unit"] == "MM"
+
+
+def test_columnar_storage():
+    """check if columnar storage returns the same content as the default row storage"""
+    table_path = pathlib.Path(__file__).parent.joinpath("test_files", "TOOL.T")
+    row_table = pyLSV2.NCTable.parse_table(table_path)
+    col_table = pyLSV2.NCTable.parse_table(table_path, columnar=True)
+
+    assert col_table.is_columnar is True
+    assert len(col_table) == len(row_table) == 6
+    assert [dict(r) for r in col_table.rows] == row_table.rows
+    assert col_table.get_column_values("L") == [r["L"] for r in row_table.rows]
+
+    col_table.append_row({"T": "6", "NAME": "NEW"})
+    assert len(col_table) == 7
+    assert "L" not in col_table.rows[6]
+    assert col_table.rows[6]["NAME"] == "NEW"
+
+    col_table.rows[6]["L"] = "+12"
+    assert col_table.get_column_values("L")[6] == "+12"
+
+    assert [r["T"] for r in col_table.find_string("NAME", "MILL")] == ["1", "2"]
+    assert [r["T"] for r in col_table.find_string("NAME", re.compile(r"^TAP"))] == ["4"]
+
+
+def test_parse_line_endings(tmp_path):
+    """check if windows line endings and shortened lines give the same result as the original file"""
+    table_path = pathlib.Path(__file__).parent.joinpath("test_files", "TOOL.T")
+    reference = pyLSV2.NCTable.parse_table(table_path)
+
+    lines = table_path.read_bytes().split(b"\n")
+    lines[3] = lines[3].rstrip()
+    crlf_path = tmp_path.joinpath("TOOL.T")
+    crlf_path.write_bytes(b"\r\n".join(lines))
+    table = pyLSV2.NCTable.parse_table(crlf_path)
+
+    assert table.column_names == reference.column_names
+    assert table.get_column_end("DOC") == reference.get_column_end("DOC")
+    assert table.rows == reference.rows
+
+
+def test_iter_rows(tmp_path):
+    """check if reading row by row gives the same result as loading the whole table"""
+    table_path = pathlib.Path(__file__).parent.joinpath("test_files", "TOOL.T")
+    table = pyLSV2.NCTable.parse_table(table_path)
+
+    assert list(pyLSV2.NCTable.iter_rows(table_path)) == table.rows
+    assert list(pyLSV2.NCTable.iter_rows(table_path, columns=["NAME", "T"]))[1] == {"NAME": table.rows[1]["NAME"], "T": "1"}
+
+    table.dump_csv(tmp_path.joinpath("loaded.csv"), decimal_char=",")
+    assert table.rows[1]["L"] == "+50.123"
+    assert '"+50,123"' in tmp_path.joinpath("loaded.csv").read_text()
+    pyLSV2.NCTable.convert_to_csv(table_path, tmp_path.joinpath("streamed.csv"), decimal_char=",")
+    assert tmp_path.joinpath("loaded.csv").read_text() == tmp_path.joinpath("streamed.csv").read_text()
+
+
+def test_indexed_queries():
+    """check equality, range and prefix queries and the invalidation of the indexes"""
+    table_path = pathlib.Path(__file__).parent.joinpath("test_files", "TOOL.T")
+    for columnar in (False, True):
+        table = pyLSV2.NCTable.parse_table(table_path, columnar=columnar)
+
+        assert [r["T"] for r in table.find_equal("NAME", "TAP_M8")] == ["4"]
+        assert [r["T"] for r in table.find_equal("T", 3)] == ["3"]
+        assert [r["T"] for r in table.find_range("L", 50, 80.25)] == ["1", "3", "4"]
+        assert [r["T"] for r in table.find_range("R", maximum=4)] == ["0", "3", "4", "5"]
+        assert [r["T"] for r in table.find_prefix("NAME", "MILL")] == ["1", "2"]
+        assert table.find_equal("UNKNOWN", "1") == []
+
+        table.append_row({"T": "6", "NAME": "MILL_D20", "L": "+60", "R": "+10"})
+        assert [r["T"] for r in table.find_prefix("NAME", "MILL")] == ["1", "2", "6"]
+        assert [r["T"] for r in table.find_range("L", 50, 80.25)] == ["1", "3", "4", "6"]
+
+        table.rows[6]["NAME"] = "DRILL_D20"
+        table.clear_indexes()
+        assert [r["T"] for r in table.find_equal("NAME", "DRILL_D20")] == ["6"]
+
+
+def test_dump_native(tmp_path, caplog):
+    """check if a table written to a file or stream can be read again"""
+    table_path = pathlib.Path(__file__).parent.joinpath("test_files", "TOOL.T")
+    table = pyLSV2.NCTable.parse_table(table_path)
+
+    table.dump_native(tmp_path.joinpath("tool.t"))
+    assert pyLSV2.NCTable.parse_table(tmp_path.joinpath("tool.t")).rows == table.rows
+
+    stream = io.BytesIO()
+    table.append_row({"T": "6", "NAME": "NEW"})
+    table.append_row({"T": "7", "NAME": "NEWER"})
+    table.dump_native(stream, renumber_column="T")
+    lines = stream.getvalue().decode("ascii").split("\n")
+    assert lines[0].startswith("BEGIN TOOL.T ")
+    assert lines[8].startswith("6    NEW ")
+    assert len(lines[8]) == len(lines[2])
+    assert len([r for r in caplog.records if "column L " in r.getMessage()]) == 1
+
+    table.append_row({"T": "8", "NAME": "NAME_LONGER_THAN_THE_COLUMN"})
+    stream = io.BytesIO()
+    with pytest.raises(ValueError):
+        table.dump_native(stream)
+    assert stream.getvalue() == b""
+
+    table = pyLSV2.NCTable.parse_table(table_path)
+    table.suffix = None
+    stream = io.BytesIO()
+    table.dump_native(stream)
+    assert stream.getvalue().startswith(b"BEGIN TOOL ")
+
+
+def test_parse_stream():
+    """check if a table can be parsed from a stream as received from the control"""
+    table_path = pathlib.Path(__file__).parent.joinpath("test_files", "TOOL.T")
+    stream = io.BytesIO(table_path.read_bytes().replace(b"\n", b"\r\n"))
+    assert pyLSV2.NCTable.parse_table(stream).rows == pyLSV2.NCTable.parse_table(table_path).rows
+
+
+def test_table_diff():
+    """check if the differences between two versions of a table are found and can be applied"""
+    table_path = pathlib.Path(__file__).parent.joinpath("test_files", "TOOL.T")
+    old_table = pyLSV2.NCTable.parse_table(table_path)
+    new_table = pyLSV2.NCTable.parse_table(table_path, columnar=True)
+
+    assert old_table.diff(new_table, "T").is_empty() is True
+
+    new_table.rows[1]["L"] = "+50.1"
+    new_table.rows[3]["DOC"] = "new drill"
+    new_table.append_row({"T": "6", "NAME": "MILL_D20", "L": "+60"})
+    table_diff = old_table.diff(new_table, "T")
+    assert table_diff.is_empty() is False
+    assert table_diff.changed_cells == {"1": {"L": ("+50.123", "+50.1")}, "3": {"DOC": ("M8 core drill", "new drill")}}
+    assert list(table_diff.added_rows.keys()) == ["6"]
+    assert table_diff.removed_rows == {}
+
+    patched = old_table.patch(table_diff)
+    assert patched.diff(new_table, "T").is_empty() is True
+    assert old_table.rows[1]["L"] == "+50.123"
+
+    table_diff = new_table.diff(old_table, "T")
+    assert list(table_diff.removed_rows.keys()) == ["6"]
+    assert [r["T"] for r in new_table.patch(table_diff).rows] == ["0", "1", "2", "3", "4", "5"]
+
+
+def test_typed_columns():
+    """check if columns are converted to native numbers"""
+    table_path = pathlib.Path(__file__).parent.joinpath("test_files", "TOOL.T")
+    table = pyLSV2.NCTable.parse_table(table_path, columnar=True, typed=True)
+
+    assert table.is_typed is True
+    assert table.get_column_type("T") == "int"
+    assert list(table.get_typed_column("T")) == [0, 1, 2, 3, 4, 5]
+    assert table.get_column_type("L") == "float"
+    assert table.get_typed_column("L")[1] == 50.123
+    assert table.get_column_type("NAME") == "str"
+    assert table.get_column_type("RT") == "int"
+    assert math.isnan(table.get_typed_column("RT")[0])
+    assert table.get_typed_column("RT")[3] == 5
+    assert table.rows[1]["L"] == "+50.123"
+
+    table.rows[1]["L"] = "+49.9"
+    assert table.get_typed_column("L")[1] == 49.9
+
+    patched = table.patch(table.diff(pyLSV2.NCTable.parse_table(table_path), "T"))
+    assert patched.is_typed is True
+    assert patched.get_typed_column("L")[1] == 50.123
@@ -140,3 +140,23 @@ def test_recive_with_path_formating(address: str, timeout: float, port: int):
         assert lsv2.recive_file(local_path=str(local_mdi_path), remote_path=mdi_path, binary_mode=False) is True
 
     lsv2.disconnect()
+
+
+def test_table_transfer(address: str, timeout: float, port: int):
+    """test if a table can be written to and read from the control without a local file"""
+    files = importlib.resources.files(test_files)
+    table = pyLSV2.NCTable.parse_table(files.joinpath("TOOL.T"))
+
+    lsv2 = pyLSV2.LSV2(address, port=port, timeout=timeout, safe_mode=True)
+    lsv2.connect()
+
+    remote_path = pyLSV2.DriveName.TNC + pyLSV2.PATH_SEP + "pyLSV2_test.t"
+    assert lsv2.write_table(table, remote_path, override_file=True) is True
+
+    remote_table = lsv2.read_table(remote_path)
+    assert remote_table is not None
+    assert remote_table.column_names == table.column_names
+    assert remote_table.rows == table.rows
+
+    assert lsv2.delete_file(remote_path) is True
+    lsv2.disconnect()
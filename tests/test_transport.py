@@ -0,0 +1,626 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""tests for the transports which work without a control"""
+
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Union
+
+import pytest
+
+import pyLSV2
+from pyLSV2.const import CMD, RSP, ExecState, Login, LSV2StatusCode, ParRRI, PgmState
+from pyLSV2.low_level_com import _encode_telegram
+
+
+def serve_telegrams(read, write, responses: dict, received: Union[list, None] = None):
+    """answer each received telegram with the prepared response for its command until the stream is closed"""
+    while True:
+        header = b""
+        while len(header) < 8:
+            data = read(8 - len(header))
+            if len(data) == 0:
+                return
+            header += data
+        length = struct.unpack("!L", header[:4])[0]
+        payload = b""
+        while len(payload) < length:
+            payload += read(length - len(payload))
+        command = header[4:8].decode("ascii")
+        if received is not None:
+            received.append((command, payload))
+        response, payload = responses.get((command, payload), responses.get(command))
+        if response is None:
+            # simulate a control which does not answer
+            continue
+        telegram = struct.pack("!L", len(payload)) + response.encode("ascii") + payload
+        # send in small pieces to check the reassembly of split responses
+        for i in range(0, len(telegram), 5):
+            write(telegram[i : i + 5])
+
+
+def test_tcp_transport():
+    """check if telegrams are framed correctly and split responses are reassembled"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    responses = {CMD.R_VR: (RSP.S_VR, b"TNC640\x00" * 60), CMD.R_DI: (RSP.T_ER, b"\x01\x12")}
+
+    def run_server():
+        connection, _ = server.accept()
+        serve_telegrams(connection.recv, connection.sendall, responses)
+        connection.close()
+
+    thread = threading.Thread(target=run_server, daemon=True)
+    thread.start()
+
+    transport = pyLSV2.LSV2TCP("127.0.0.1", server.getsockname()[1], timeout=5.0)
+    con = pyLSV2.LSV2(transport=transport)
+    assert con._llcom is transport
+
+    transport.connect()
+    content = transport.telegram(CMD.R_VR, bytearray(b"\x01"))
+    assert transport.last_response is RSP.S_VR
+    assert content == b"TNC640\x00" * 60
+
+    transport.telegram(CMD.R_DI)
+    assert transport.last_response is RSP.T_ER
+    assert transport.last_error.e_type == 1
+    assert transport.last_error.e_code == 0x12
+
+    transport.disconnect()
+    thread.join(timeout=5.0)
+    server.close()
+
+
+def test_telegram_encoding():
+    """check if fixed telegrams are cached and variable payloads are sent without being copied"""
+    state_request = bytearray(struct.pack("!H", ParRRI.EXEC_STATE))
+    encoded = _encode_telegram(CMD.R_RI, state_request)
+    assert encoded == (b"\x00\x00\x00\x02R_RI\x00\x17",)
+    assert _encode_telegram(CMD.R_RI, state_request)[0] is encoded[0]
+    assert _encode_telegram(CMD.R_VR, bytearray()) == (b"\x00\x00\x00\x00R_VR",)
+
+    file_content = bytearray(b"BEGIN TOOL.T MM\n" * 40)
+    encoded = _encode_telegram(CMD.C_FL, file_content)
+    assert encoded[0] == struct.pack("!L", len(file_content)) + b"C_FL"
+    assert encoded[1] is file_content
+
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    received = []
+
+    def run_server():
+        connection, _ = server.accept()
+        serve_telegrams(connection.recv, connection.sendall, {CMD.C_FL: (RSP.T_OK, b""), CMD.R_RI: (RSP.S_RI, b"\x00\x03")}, received)
+        connection.close()
+
+    thread = threading.Thread(target=run_server, daemon=True)
+    thread.start()
+
+    transport = pyLSV2.LSV2TCP("127.0.0.1", server.getsockname()[1], timeout=5.0)
+    transport.buffer_size = 4096
+    transport.connect()
+    transport.telegram(CMD.C_FL, file_content)
+    assert transport.last_response is RSP.T_OK
+    assert transport.telegram(CMD.R_RI, state_request) == b"\x00\x03"
+    transport.disconnect()
+    thread.join(timeout=5.0)
+    server.close()
+
+    assert received == [(CMD.C_FL, bytes(file_content)), (CMD.R_RI, b"\x00\x17")]
+
+
+def test_read_many():
+    """check if a batch of status queries is decoded into one snapshot, with and without pipelining"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+
+    def query(parameter):
+        return (CMD.R_RI, struct.pack("!H", parameter))
+
+    responses = {
+        CMD.A_LG: (RSP.T_OK, b""),
+        query(ParRRI.PGM_STATE): (RSP.S_RI, b"\x00\x02"),
+        query(ParRRI.EXEC_STATE): (RSP.S_RI, b"\x00\x00"),
+        query(ParRRI.SELECTED_PGM): (RSP.S_RI, struct.pack("!L", 12) + b"TNC:\\main.h\x00TNC:\\sub.h\x00"),
+        query(ParRRI.OVERRIDE): (RSP.S_RI, struct.pack("!LLL", 10000, 5000, 2500)),
+        query(ParRRI.CURRENT_TOOL): (RSP.T_ER, b"\x01\x12"),
+        query(ParRRI.FIRST_ERROR): (RSP.T_ER, b"\x01\x12"),
+        query(ParRRI.AXIS_LOCATION): (RSP.S_RI, b"\x00\x02" + b"1.5\x00-2.25\x00X\x00Y\x00"),
+    }
+
+    def run_server():
+        connection, _ = server.accept()
+        serve_telegrams(connection.recv, connection.sendall, responses)
+        connection.close()
+
+    thread = threading.Thread(target=run_server, daemon=True)
+    thread.start()
+
+    transport = pyLSV2.LSV2TCP("127.0.0.1", server.getsockname()[1], timeout=5.0)
+    con = pyLSV2.LSV2(transport=transport, safe_mode=False)
+    transport.connect()
+
+    for pipelined in (False, True):
+        snapshot = con.machine_snapshot(pipelined=pipelined)
+        assert Login.DNC in con._active_logins
+        assert snapshot.program_status is PgmState.FINISHED
+        assert snapshot.execution_state is ExecState.MANUAL
+        assert snapshot.program_stack.line_no == 12
+        assert snapshot.program_stack.current == "TNC:\\sub.h"
+        assert snapshot.override_state.feed == 100.0
+        assert snapshot.override_state.rapid == 25.0
+        assert snapshot.spindle_tool is None
+        assert snapshot.axes_location == {"X": 1.5, "Y": -2.25}
+
+    values = con.read_many([ParRRI.EXEC_STATE, ParRRI.FIRST_ERROR], pipelined=True)
+    assert values == {ParRRI.EXEC_STATE: ExecState.MANUAL, ParRRI.FIRST_ERROR: None}
+
+    transport.disconnect()
+    thread.join(timeout=5.0)
+    server.close()
+
+
+def test_rtt_estimation():
+    """check the round trip time estimation against the calculation of the TCP retransmission timeout"""
+    estimator = pyLSV2.RTTEstimator(15.0, 1.0, 15.0)
+    assert estimator.timeout == 15.0
+
+    estimator.add_sample(2.0)
+    assert estimator.srtt == 2.0
+    assert estimator.rttvar == 1.0
+    assert estimator.timeout == 6.0
+
+    estimator.add_sample(4.0)
+    assert estimator.rttvar == 0.75 * 1.0 + 0.25 * 2.0
+    assert estimator.srtt == 0.875 * 2.0 + 0.125 * 4.0
+    assert estimator.timeout == estimator.srtt + 4 * estimator.rttvar
+
+    for _ in range(50):
+        estimator.add_sample(0.001)
+    assert estimator.timeout == 1.0
+    estimator.backoff()
+    assert estimator.timeout == 2.0
+    for _ in range(5):
+        estimator.backoff()
+    assert estimator.timeout == 15.0
+    assert estimator.samples == 52
+
+
+def test_adaptive_timeout():
+    """check if a control which stops answering is detected before the fixed timeout runs out"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+
+    def run_server():
+        connection, _ = server.accept()
+        serve_telegrams(connection.recv, connection.sendall, {CMD.R_VR: (RSP.S_VR, b"TNC640\x00"), CMD.R_DI: (None, b"")})
+        connection.close()
+
+    thread = threading.Thread(target=run_server, daemon=True)
+    thread.start()
+
+    transport = pyLSV2.LSV2TCP("127.0.0.1", server.getsockname()[1], timeout=30.0, connect_timeout=5.0, adaptive_timeout=True)
+    transport.connect()
+    for _ in range(5):
+        transport.telegram(CMD.R_VR, bytearray(b"\x01"))
+    stats = transport.rtt_stats["status"]
+    assert stats.samples == 5
+    assert stats.timeout == pyLSV2.LSV2StreamTransport.MIN_ADAPTIVE_TIMEOUT
+
+    start = time.monotonic()
+    with pytest.raises(socket.timeout):
+        transport.telegram(CMD.R_DI)
+    assert time.monotonic() - start < 5.0
+    assert stats.timeout == 2 * pyLSV2.LSV2StreamTransport.MIN_ADAPTIVE_TIMEOUT
+    assert transport.is_connected
+    assert transport.telegram(CMD.R_VR, bytearray(b"\x01")) == b"TNC640\x00"
+
+    transport.disconnect()
+    thread.join(timeout=5.0)
+    server.close()
+
+
+def test_late_response():
+    """check if a response which arrives after the timeout is not taken as response to the next telegram"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+
+    class LateResponses(dict):
+        """answer R_DI only after the timeout of the client ran out"""
+
+        def get(self, key, default=None):
+            if key == CMD.R_DI:
+                time.sleep(1.5)
+            return super().get(key, default)
+
+    responses = LateResponses({CMD.R_VR: (RSP.S_VR, b"TNC640\x00"), CMD.R_DI: (RSP.S_DI, b"LATE")})
+
+    def run_server():
+        for _ in range(2):
+            connection, _ = server.accept()
+            try:
+                serve_telegrams(connection.recv, connection.sendall, responses)
+            except OSError:
+                # the late response can't be sent since the client already closed the connection
+                pass
+            connection.close()
+
+    thread = threading.Thread(target=run_server, daemon=True)
+    thread.start()
+
+    transport = pyLSV2.LSV2TCP("127.0.0.1", server.getsockname()[1], timeout=1.0)
+    transport.connect()
+    with pytest.raises(socket.timeout):
+        transport.telegram(CMD.R_DI)
+    assert transport.is_connected
+    time.sleep(1.0)
+    assert transport.telegram(CMD.R_VR, bytearray(b"\x01")) == b"TNC640\x00"
+    assert transport.last_response is RSP.S_VR
+
+    transport.close_on_timeout = True
+    with pytest.raises(socket.timeout):
+        transport.telegram(CMD.R_DI)
+    assert not transport.is_connected
+    with pytest.raises(pyLSV2.LSV2StateException):
+        transport.telegram(CMD.R_VR, bytearray(b"\x01"))
+
+    transport.connect()
+    assert transport.telegram(CMD.R_VR, bytearray(b"\x01")) == b"TNC640\x00"
+    assert transport.last_response is RSP.S_VR
+
+    transport.disconnect()
+    thread.join(timeout=5.0)
+    server.close()
+
+
+def test_auto_reconnect():
+    """check if a lost connection is restored with its logins and an interrupted read is repeated"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    responses = {
+        CMD.A_LG: (RSP.T_OK, b""),
+        CMD.A_LO: (RSP.T_OK, b""),
+        CMD.C_CC: (RSP.T_OK, b""),
+        CMD.R_RI: (RSP.S_RI, b"\x00\x00"),
+    }
+    received = []
+
+    def run_server():
+        # drop the first connection after the first status query was answered
+        connection, _ = server.accept()
+
+        def read(size):
+            return b"" if len(received) >= 5 else connection.recv(size)
+
+        serve_telegrams(read, connection.sendall, responses, received)
+        connection.close()
+
+        connection, _ = server.accept()
+        serve_telegrams(connection.recv, connection.sendall, responses, received)
+        connection.close()
+
+    thread = threading.Thread(target=run_server, daemon=True)
+    thread.start()
+
+    transport = pyLSV2.LSV2TCP("127.0.0.1", server.getsockname()[1], timeout=5.0)
+    con = pyLSV2.LSV2(transport=transport, safe_mode=False, auto_reconnect=True)
+    # skip reading version and parameters while configuring the connection
+    con._versions.control = "TNC640"
+    con._sys_par.lsv2_version = 1
+    con._sys_par.max_block_length = 256
+    con.connect()
+
+    assert con.execution_state() is ExecState.MANUAL
+    assert con.execution_state() is ExecState.MANUAL
+    assert transport.is_connected
+    configure = [CMD.A_LG, CMD.C_CC, CMD.A_LG]
+    assert [command for command, _ in received] == configure + [CMD.A_LG, CMD.R_RI] + configure + [CMD.A_LG, CMD.R_RI]
+    assert received[8] == received[3]
+    assert con._active_logins == [Login.INSPECT, Login.FILETRANSFER, Login.DNC]
+
+    con.disconnect()
+    thread.join(timeout=5.0)
+    server.close()
+
+
+def test_thread_safe_client():
+    """check if several threads can share one connection and only see their own results"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+
+    def query(parameter):
+        return (CMD.R_RI, struct.pack("!H", parameter))
+
+    responses = {
+        CMD.A_LG: (RSP.T_OK, b""),
+        query(ParRRI.PGM_STATE): (RSP.S_RI, b"\x00\x02"),
+        query(ParRRI.EXEC_STATE): (RSP.S_RI, b"\x00\x03"),
+        query(ParRRI.CURRENT_TOOL): (RSP.T_ER, b"\x01\x12"),
+    }
+
+    def run_server():
+        connection, _ = server.accept()
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        serve_telegrams(connection.recv, connection.sendall, responses)
+        connection.close()
+
+    thread = threading.Thread(target=run_server, daemon=True)
+    thread.start()
+
+    transport = pyLSV2.LSV2TCP("127.0.0.1", server.getsockname()[1], timeout=5.0)
+    con = pyLSV2.LSV2(transport=transport, safe_mode=False, thread_safe=True)
+    transport.connect()
+    failures = []
+
+    def poll(index):
+        for _ in range(50):
+            if index % 3 == 0:
+                result = con.program_status() is PgmState.FINISHED and con.last_error.e_code is LSV2StatusCode.T_ER_NON
+            elif index % 3 == 1:
+                result = con.execution_state() is ExecState.SINGLE_STEP and con.last_error.e_code is LSV2StatusCode.T_ER_NON
+            else:
+                result = con.spindle_tool_status() is None and con.last_error.e_code == 0x12
+            if not result:
+                failures.append(index)
+
+    threads = [threading.Thread(target=poll, args=(i,)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=30.0)
+
+    assert failures == []
+    assert con._active_logins == [Login.DNC]
+
+    transport.disconnect()
+    thread.join(timeout=5.0)
+    server.close()
+
+
+def test_tcp_options():
+    """check if the socket options are applied and the socket buffers follow the negotiated buffer size"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+
+    options = pyLSV2.TCPOptions(keep_alive_idle=20, buffer_factor=16, source_address=("127.0.0.1", 0))
+    transport = pyLSV2.LSV2TCP("127.0.0.1", server.getsockname()[1], timeout=5.0, options=options)
+    transport.connect()
+    connection, address = server.accept()
+
+    tcpsock = transport._tcpsock
+    assert tcpsock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY) != 0
+    assert tcpsock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE) != 0
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        assert tcpsock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE) == 20
+    assert address == tcpsock.getsockname()
+
+    transport.buffer_size = 4096
+    assert tcpsock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF) >= 16 * 4096
+    assert tcpsock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF) >= 16 * 4096
+
+    transport.disconnect()
+    connection.close()
+    server.close()
+
+
+def test_address_cache(monkeypatch):
+    """check if resolved host names are shared between connections until the ttl runs out"""
+    calls = []
+    getaddrinfo = socket.getaddrinfo
+
+    def counting_getaddrinfo(*args, **kwargs):
+        calls.append(args[0])
+        return getaddrinfo(*args, **kwargs)
+
+    monkeypatch.setattr(socket, "getaddrinfo", counting_getaddrinfo)
+    pyLSV2.clear_address_cache()
+    for _ in range(3):
+        pyLSV2.LSV2TCP("127.0.0.1", 19000)
+    assert calls == ["127.0.0.1"]
+
+    monkeypatch.setattr(pyLSV2.low_level_com, "ADDRESS_CACHE_TTL", 0.0)
+    pyLSV2.clear_address_cache()
+    for _ in range(2):
+        pyLSV2.LSV2TCP("127.0.0.1", 19000)
+    assert len(calls) == 3
+    pyLSV2.clear_address_cache()
+
+
+def test_ipv6_transport():
+    """check if a control can be reached via IPv6"""
+    if not socket.has_ipv6:
+        pytest.skip("IPv6 is not available on this platform")
+    server = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+    try:
+        server.bind(("::1", 0))
+    except OSError:
+        server.close()
+        pytest.skip("IPv6 loopback address is not available")
+    server.listen(1)
+
+    def run_server():
+        connection, _ = server.accept()
+        serve_telegrams(connection.recv, connection.sendall, {CMD.R_VR: (RSP.S_VR, b"TNC640\x00")})
+        connection.close()
+
+    thread = threading.Thread(target=run_server, daemon=True)
+    thread.start()
+
+    transport = pyLSV2.LSV2TCP("::1", server.getsockname()[1], timeout=5.0)
+    transport.connect()
+    assert transport.telegram(CMD.R_VR, bytearray(b"\x01")) == b"TNC640\x00"
+    transport.disconnect()
+    thread.join(timeout=5.0)
+    server.close()
+
+
+def test_connection_racing(monkeypatch):
+    """check if the next address is tried while the connection attempt to the first one does not finish"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    port = server.getsockname()[1]
+
+    # the first address is reserved for documentation and never answers, the second one is the actual control
+    addresses = [
+        (socket.AF_INET, ("192.0.2.1", port)),
+        (socket.AF_INET, ("127.0.0.1", port)),
+    ]
+    monkeypatch.setattr(pyLSV2.low_level_com, "resolve_address", lambda hostname, port: addresses)
+
+    transport = pyLSV2.LSV2TCP("machine", port, timeout=5.0)
+    start = time.monotonic()
+    transport.connect()
+    assert time.monotonic() - start < 2.0
+    assert transport._tcpsock.getpeername() == ("127.0.0.1", port)
+    connection, _ = server.accept()
+
+    transport.disconnect()
+    connection.close()
+    server.close()
+
+
+def test_connection_source_address(monkeypatch):
+    """check if addresses which don't fit the family of the source address are skipped"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    port = server.getsockname()[1]
+
+    addresses = [
+        (socket.AF_INET6, ("::1", port, 0, 0)),
+        (socket.AF_INET, ("127.0.0.1", port)),
+    ]
+    monkeypatch.setattr(pyLSV2.low_level_com, "resolve_address", lambda hostname, port: addresses)
+
+    transport = pyLSV2.LSV2TCP("machine", port, timeout=5.0, options=pyLSV2.TCPOptions(source_address=("127.0.0.1", 0)))
+    transport.connect()
+    assert transport._tcpsock.getpeername() == ("127.0.0.1", port)
+    connection, _ = server.accept()
+
+    transport.disconnect()
+    connection.close()
+    server.close()
+
+
+def test_serial_gateway_transport():
+    """check the serial gateway transport with a pseudo terminal instead of a serial port"""
+    pytest.importorskip("serial")
+    if not hasattr(os, "openpty"):
+        pytest.skip("pseudo terminals are not available on this platform")
+
+    main_fd, sub_fd = os.openpty()
+    responses = {CMD.R_VR: (RSP.S_VR, b"TNC640\x00")}
+
+    def read(size):
+        try:
+            return os.read(main_fd, size)
+        except OSError:
+            return b""
+
+    thread = threading.Thread(target=serve_telegrams, args=(read, lambda data: os.write(main_fd, data), responses), daemon=True)
+    thread.start()
+
+    transport = pyLSV2.LSV2SerialGateway(os.ttyname(sub_fd), 115200, timeout=5.0)
+    transport.connect()
+    assert transport.telegram(CMD.R_VR, bytearray(b"\x01")) == b"TNC640\x00"
+    assert transport.last_response is RSP.S_VR
+    transport.disconnect()
+
+    os.close(sub_fd)
+    os.close(main_fd)
+
+
+def test_structured_response():
+    """check if response code, payload and error are returned together with each response"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+
+    def run_server():
+        connection, _ = server.accept()
+        responses = {
+            CMD.R_VR: (RSP.S_VR, b"TNC640\x00"),
+            CMD.R_DI: (RSP.T_ER, b"\x01\x12"),
+        }
+        serve_telegrams(connection.recv, connection.sendall, responses)
+        connection.close()
+
+    thread = threading.Thread(target=run_server, daemon=True)
+    thread.start()
+
+    transport = pyLSV2.LSV2TCP("127.0.0.1", server.getsockname()[1], timeout=5.0)
+    transport.connect()
+    version = transport.request(CMD.R_VR, bytearray(b"\x01"))
+    error = transport.request(CMD.R_DI)
+    assert version.response is RSP.S_VR
+    assert not version.is_error()
+    assert bytes(version.payload[0:6]) == b"TNC640"
+    assert error.is_error()
+    assert error.error.e_code == 0x12
+    # the first response is not changed by the following telegram
+    assert version.content == b"TNC640\x00"
+    assert transport.request(CMD.R_VR, wait_for_response=False).response is RSP.NONE
+    transport.disconnect()
+    thread.join(timeout=5.0)
+    server.close()
+
+
+def test_directory_blocks():
+    """check if directory entries are available before the transfer is finished and if stopping early keeps the connection usable"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    entries = [(RSP.S_DR, struct.pack("!LLL", i, 0, 0) + b"FILE%d.H\x00" % i) for i in range(5)]
+
+    class BlockResponses(dict):
+        """answer the first R_DR and each following T_OK with the next directory entry"""
+
+        def get(self, key, default=None):
+            if key == CMD.R_DR:
+                self.remaining = list(entries)
+            if key in (CMD.R_DR, RSP.T_OK):
+                return self.remaining.pop(0) if len(self.remaining) > 0 else (RSP.T_FD, b"")
+            return super().get(key, default)
+
+    responses = BlockResponses({CMD.A_LG: (RSP.T_OK, b""), CMD.R_VR: (RSP.S_VR, b"TNC640\x00")})
+    received = []
+
+    def run_server():
+        connection, _ = server.accept()
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        serve_telegrams(connection.recv, connection.sendall, responses, received)
+        connection.close()
+
+    thread = threading.Thread(target=run_server, daemon=True)
+    thread.start()
+
+    transport = pyLSV2.LSV2TCP("127.0.0.1", server.getsockname()[1], timeout=5.0)
+    con = pyLSV2.LSV2(transport=transport, safe_mode=False)
+    transport.connect()
+
+    entry_iterator = con.iter_directory_content()
+    first_entry = next(entry_iterator)
+    assert first_entry.name == "FILE0.H"
+    # only the first block was requested so far
+    assert [command for command, _ in received] == ["A_LG", "R_DR"]
+    entry_iterator.close()
+    assert transport.telegram(CMD.R_VR) == b"TNC640\x00"
+
+    assert [entry.size for entry in con.directory_content()] == [0, 1, 2, 3, 4]
+
+    transport.disconnect()
+    thread.join(timeout=5.0)
+    server.close()